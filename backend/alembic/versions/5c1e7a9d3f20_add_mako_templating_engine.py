@@ -0,0 +1,28 @@
+"""add mako templating engine
+
+Revision ID: 5c1e7a9d3f20
+Revises: 2837108e7cf7
+Create Date: 2026-10-18 14:21:40.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d3f20'
+down_revision = '2837108e7cf7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SQLite stores the enum as plain VARCHAR; only native enum types need the new value
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE templatingengineenum ADD VALUE IF NOT EXISTS 'MAKO'")
+
+
+def downgrade() -> None:
+    # Enum values can't be dropped from a native type; existing Mako templates fall back to HTML
+    op.execute(sa.text("UPDATE templates SET engine = 'HTML' WHERE engine = 'MAKO'"))
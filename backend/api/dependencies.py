@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 from datetime import datetime
 
 import models
+from core.api_key_cache import CachedApiKey, api_key_cache
 from core.database import get_db
 
 bearer_scheme = HTTPBearer()
@@ -18,15 +19,23 @@ async def get_user_from_api_key(
 ) -> models.User:
     """
     Authenticates a user based on an API key provided in the Authorization header.
-    Updates the last_used timestamp of the API key.
+    Records a use of the API key; last_used is written in batches.
     """
     api_key_value = credentials.credentials
 
+    cached = api_key_cache.get(api_key_value)
+    if cached is not None and not cached.expired:
+        api_key_cache.touch(cached.api_key_id)
+        return cached.user
+
+    generation = api_key_cache.generation
+    # The key and its user in one round trip
     result = await db.execute(
-        select(models.ApiKey)
+        select(models.ApiKey, models.User)
+        .outerjoin(models.User, models.User.id == models.ApiKey.user_id)
         .where(models.ApiKey.key == api_key_value, models.ApiKey.is_active == True)
     )
-    api_key = result.scalars().first()
+    api_key, user = result.first() or (None, None)
 
     if not api_key:
         raise HTTPException(
@@ -44,17 +53,6 @@ async def get_user_from_api_key(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last_used timestamp
-    api_key.last_used = datetime.now()
-    await db.commit()
-    await db.refresh(api_key)
-
-    # Fetch the associated user
-    user_result = await db.execute(
-        select(models.User).where(models.User.id == api_key.user_id)
-    )
-    user = user_result.scalars().first()
-
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,4 +60,6 @@ async def get_user_from_api_key(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    api_key_cache.touch(api_key.id)
+    api_key_cache.set(api_key_value, CachedApiKey(api_key.id, api_key.expires_at, user), generation)
     return user
@@ -0,0 +1,37 @@
+"""
+Streaming response helpers
+"""
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+async def streaming_pdf_response(
+    stream: AsyncIterator[bytes],
+    filename: str,
+    media_type: str = "application/pdf"
+) -> StreamingResponse:
+    """
+    Wrap a PDF (or ZIP of PDFs) chunk stream in a StreamingResponse.
+
+    The first chunk is awaited before responding, so render failures still
+    surface as regular HTTP errors instead of a truncated download.
+    """
+    try:
+        first_chunk = await stream.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -11,6 +11,7 @@ import schemas
 from core.database import get_db
 from core.auth import current_active_user
 from core.security import generate_api_key
+from core.api_key_cache import api_key_cache
 
 router = APIRouter()
 
@@ -133,6 +134,7 @@ async def update_api_key(
     
     await db.commit()
     await db.refresh(api_key)
+    api_key_cache.revoke_key(api_key.key)
     
     return schemas.ApiKeyRead(
         id=api_key.id,
@@ -168,5 +170,6 @@ async def delete_api_key(
     
     await db.delete(api_key)
     await db.commit()
+    api_key_cache.revoke_key(api_key.key)
     
     return None
@@ -2,7 +2,6 @@
 External API Routes - PDF Generation using API Keys
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import Optional
@@ -10,8 +9,13 @@ import models
 import schemas
 from core.database import get_db
 from api.dependencies import get_user_from_api_key
-from features.pdf_generation.services.playwright_manager import PlaywrightManager
-import io
+from api.streaming import streaming_pdf_response
+from api.v1.jobs import submit_job, get_job, job_result_response
+from features.pdf_generation.services.admission import RenderOverloaded
+from features.pdf_generation.services.playwright_manager import PlaywrightManager, PDFTooLarge
+from features.pdf_generation.services.tailwind_compiler import compiled_css_for
+from features.pdf_generation.services.template_analysis import TemplateDataMissing, check_template_data, compiled_template_for
+from features.pdf_generation.services.template_cache import template_cache
 
 router = APIRouter()
 
@@ -29,12 +33,7 @@ async def generate_pdf_external(
         # Get the template if template_id is provided
         template = None
         if pdf_request.template_id:
-            result = await db.execute(
-                select(models.Template)
-                .where(models.Template.id == pdf_request.template_id)
-                .where(models.Template.user_id == user.id)
-            )
-            template = result.scalars().first()
+            template = await template_cache.get(db, user.id, pdf_request.template_id)
             
             if not template:
                 raise HTTPException(
@@ -56,30 +55,32 @@ async def generate_pdf_external(
             engine = "jsx"
         elif pdf_request.is_vue:
             engine = "vue"
+        elif pdf_request.is_mako:
+            engine = "mako"
+        
+        # Use provided data if any, otherwise the template's own data
+        data = pdf_request.data if pdf_request.data else (template.data if template else None)
         
-        # Use template data if available, otherwise use provided data
-        data = template.data if template else pdf_request.data
+        # The stored analysis only describes the template rendered with its own engine
+        use_analysis = template is not None and engine == template.engine
+        if use_analysis:
+            check_template_data(template, data)
         
-        # Generate PDF using Playwright
+        # Generate PDF using Playwright, streaming it out as Chromium produces it
         playwright_manager = await PlaywrightManager.get_instance()
-        pdf_bytes = await playwright_manager.generate_pdf(
+        pdf_stream = playwright_manager.generate_pdf_stream(
             content=content,
             engine=engine,
-            data=data
+            data=data,
+            compiled_css=compiled_css_for(template, data) if template else None,
+            cache_namespace=template.id if template else None,
+            compiled_template=compiled_template_for(template) if use_analysis else None
         )
         
-        # Create a streaming response
-        pdf_stream = io.BytesIO(pdf_bytes)
-        
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=generated.pdf",
-                "Content-Length": str(len(pdf_bytes))
-            }
-        )
+        return await streaming_pdf_response(pdf_stream, "generated.pdf")
         
+    except (HTTPException, RenderOverloaded, TemplateDataMissing, PDFTooLarge):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -126,3 +127,36 @@ async def get_template_external(
         )
     
     return schemas.Template.model_validate(template)
+
+@router.post("/jobs", response_model=schemas.RenderJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_job_external(
+    pdf_request: schemas.PDFRequest,
+    user: models.User = Depends(get_user_from_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a PDF render via API key; poll the returned job for its status
+    """
+    return await submit_job(pdf_request, user, db)
+
+@router.get("/jobs/{job_id}", response_model=schemas.RenderJobRead)
+async def get_job_status_external(
+    job_id: str,
+    user: models.User = Depends(get_user_from_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the status of a render job via API key
+    """
+    return await get_job(job_id, user, db)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result_external(
+    job_id: str,
+    user: models.User = Depends(get_user_from_api_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download the PDF of a finished render job via API key
+    """
+    return job_result_response(await get_job(job_id, user, db))
@@ -0,0 +1,132 @@
+"""
+Asynchronous render job routes - submit, poll status, fetch the PDF
+"""
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+import models
+import schemas
+from core.database import get_db
+from core.auth import current_active_user
+from features.pdf_generation.services.tailwind_compiler import compiled_css_for
+from features.pdf_generation.services.template_analysis import check_template_data, compiled_template_for
+from features.pdf_generation.services.template_cache import template_cache
+
+router = APIRouter()
+
+
+async def submit_job(pdf_request: schemas.PDFRequest, user: models.User, db: AsyncSession) -> models.RenderJob:
+    """Queue a render, snapshotting the template so later edits don't affect it"""
+    template = None
+    if pdf_request.template_id:
+        template = await template_cache.get(db, user.id, pdf_request.template_id)
+
+        if not template:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template not found"
+            )
+
+    content = template.content if template else pdf_request.content
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No content provided for PDF generation"
+        )
+
+    # Determine the engine type
+    engine = template.engine if template else "html"
+    if pdf_request.is_jsx:
+        engine = "jsx"
+    elif pdf_request.is_vue:
+        engine = "vue"
+    elif pdf_request.is_mako:
+        engine = "mako"
+
+    data = pdf_request.data if pdf_request.data else (template.data if template else None)
+    # The stored analysis only describes the template rendered with its own engine
+    use_analysis = template is not None and engine == template.engine
+    if use_analysis:
+        check_template_data(template, data)
+
+    job = models.RenderJob(
+        template_id=template.id if template else None,
+        engine=getattr(engine, "value", engine),
+        content=content,
+        data=data,
+        compiled_css=compiled_css_for(template, data) if template else None,
+        compiled_template=compiled_template_for(template) if use_analysis else None,
+        user_id=user.id
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    return job
+
+
+async def get_job(job_id: str, user: models.User, db: AsyncSession) -> models.RenderJob:
+    result = await db.execute(
+        select(models.RenderJob)
+        .where(models.RenderJob.id == job_id)
+        .where(models.RenderJob.user_id == user.id)
+    )
+    job = result.scalars().first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job
+
+
+def job_result_response(job: models.RenderJob) -> FileResponse:
+    if job.status != models.RenderJobStatusEnum.DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status.value}"
+        )
+    if not job.result_path or not Path(job.result_path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Job result is no longer available"
+        )
+
+    return FileResponse(
+        job.result_path,
+        media_type="application/pdf",
+        filename=f"{job.id}.pdf"
+    )
+
+
+@router.post("/jobs", response_model=schemas.RenderJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    pdf_request: schemas.PDFRequest,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(current_active_user)
+):
+    """Queue a PDF render; poll the returned job for its status"""
+    return await submit_job(pdf_request, user, db)
+
+@router.get("/jobs/{job_id}", response_model=schemas.RenderJobRead)
+async def get_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(current_active_user)
+):
+    """Get the status of a render job"""
+    return await get_job(job_id, user, db)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(current_active_user)
+):
+    """Download the PDF of a finished render job"""
+    return job_result_response(await get_job(job_id, user, db))
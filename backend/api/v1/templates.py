@@ -10,13 +10,38 @@ import models
 import schemas
 from core.database import get_db
 from core.auth import current_active_user, get_user_manager
+from api.streaming import streaming_pdf_response
 from pydantic import BaseModel
 from features.pdf_generation.services.playwright_manager import PlaywrightManager
+from features.pdf_generation.services.pdf_cache import pdf_cache
+from features.pdf_generation.services.zip_stream import stream_zip
+from features.pdf_generation.services.tailwind_compiler import compiled_css_for, tailwind_source_hash
+from features.pdf_generation.services.template_analysis import analyze_template, check_template_data, compiled_template_for
+from features.pdf_generation.services.template_cache import template_cache
 from nanoid import generate
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter()
 
+
+async def _compile_template_css(template: models.Template):
+    """Precompile the template's Tailwind stylesheet; renders fall back to the in-page JIT on failure"""
+    try:
+        playwright_manager = await PlaywrightManager.get_instance()
+        template.compiled_css = await playwright_manager.compile_tailwind_css(
+            content=template.content,
+            engine=template.engine,
+            data=template.data
+        )
+        template.compiled_css_hash = tailwind_source_hash(template.content)
+    except Exception:
+        logger.warning(f"Tailwind precompilation failed for template {template.id}", exc_info=True)
+        template.compiled_css = None
+        template.compiled_css_hash = None
+
 # Protected route example - get current user info
 @router.get("/me", response_model=schemas.UserRead)
 async def get_current_user(
@@ -65,6 +90,8 @@ async def create_template(
         data=template_data.data,
         user_id=user.id
     )
+    await analyze_template(template)
+    await _compile_template_css(template)
     
     db.add(template)
     await db.commit()
@@ -118,11 +145,16 @@ async def update_template(
     # Update fields
     if template_update.content is not None:
         template.content = template_update.content
+        await analyze_template(template)
     if template_update.data is not None:
         template.data = template_update.data
+    if template_update.content is not None or template_update.data is not None:
+        await _compile_template_css(template)
     
     await db.commit()
     await db.refresh(template)
+    template_cache.invalidate(user.id, template.id)
+    await pdf_cache.invalidate(template.id)
     
     return template
 
@@ -148,6 +180,8 @@ async def delete_template(
     
     await db.delete(template)
     await db.commit()
+    template_cache.invalidate(user.id, template_id)
+    await pdf_cache.invalidate(template_id)
     
     return None
 
@@ -160,12 +194,7 @@ async def generate_pdf(
 ):
     """Generate PDF from template"""
     # Get template
-    result = await db.execute(
-        select(models.Template)
-        .where(models.Template.id == template_id)
-        .where(models.Template.user_id == user.id)
-    )
-    template = result.scalars().first()
+    template = await template_cache.get(db, user.id, template_id)
     
     if not template:
         raise HTTPException(
@@ -175,20 +204,71 @@ async def generate_pdf(
     
     # Use template data or provided data
     data = pdf_request.data if pdf_request.data else template.data
+    check_template_data(template, data)
     
     # Generate PDF
     playwright_manager = await PlaywrightManager.get_instance()
-    pdf_bytes = await playwright_manager.generate_pdf(
+    pdf_stream = playwright_manager.generate_pdf_stream(
         content=template.content,
         engine=template.engine,
-        data=data
+        data=data,
+        compiled_css=compiled_css_for(template, data),
+        cache_namespace=template.id,
+        compiled_template=compiled_template_for(template)
     )
     
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={template.name}.pdf"}
-    )
+    return await streaming_pdf_response(pdf_stream, f"{template.name}.pdf")
+
+@router.post("/templates/{template_id}/generate-batch", response_class=Response)
+async def generate_pdf_batch(
+    template_id: str,
+    batch_request: schemas.BatchPDFRequest,
+    db: AsyncSession = Depends(get_db),
+    user: models.User = Depends(current_active_user)
+):
+    """Generate one PDF per data row from a template, as a ZIP or a single merged PDF"""
+    # Get template
+    template = await template_cache.get(db, user.id, template_id)
+    
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Template not found"
+        )
+    
+    rows = batch_request.data
+    for index, row in enumerate(rows, start=1):
+        check_template_data(template, row, row=index)
+    
+    playwright_manager = await PlaywrightManager.get_instance()
+    compiled_css = compiled_css_for(template, *rows)
+    compiled_template = compiled_template_for(template)
+    
+    if batch_request.output == schemas.BatchOutputEnum.MERGED:
+        pdf_stream = playwright_manager.generate_merged_pdf(
+            content=template.content,
+            engine=template.engine,
+            rows=rows,
+            compiled_css=compiled_css,
+            compiled_template=compiled_template
+        )
+        return await streaming_pdf_response(pdf_stream, f"{template.name}.pdf")
+    
+    width = len(str(len(rows)))
+    
+    async def named_pdfs():
+        index = 0
+        async for pdf_bytes in playwright_manager.generate_pdf_batch(
+            content=template.content,
+            engine=template.engine,
+            rows=rows,
+            compiled_css=compiled_css,
+            compiled_template=compiled_template
+        ):
+            index += 1
+            yield f"{template.name}-{index:0{width}d}.pdf", pdf_bytes
+    
+    return await streaming_pdf_response(stream_zip(named_pdfs()), f"{template.name}.zip", media_type="application/zip")
 
 @router.post("/generate-pdf", response_class=Response)
 async def generate_pdf_from_content(
@@ -208,20 +288,18 @@ async def generate_pdf_from_content(
         engine = "jsx"
     elif pdf_request.is_vue:
         engine = "vue"
+    elif pdf_request.is_mako:
+        engine = "mako"
     
     # Generate PDF
     playwright_manager = await PlaywrightManager.get_instance()
-    pdf_bytes = await playwright_manager.generate_pdf(
+    pdf_stream = playwright_manager.generate_pdf_stream(
         content=pdf_request.content,
         engine=engine,
         data=pdf_request.data
     )
     
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=generated.pdf"}
-    )
+    return await streaming_pdf_response(pdf_stream, "generated.pdf")
 
 @router.post("/guest", response_model=schemas.GuestUserResponse, status_code=status.HTTP_201_CREATED)
 async def create_guest_user(
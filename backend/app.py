@@ -1,21 +1,72 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.auth import auth_backend, fastapi_users
-from core.config import ALLOWED_ORIGINS
+from core.config import ALLOWED_ORIGINS, PLAYWRIGHT_EAGER_START
 from schemas import UserCreate, UserRead, UserUpdate
-from features.pdf_generation.services.playwright_manager import PlaywrightManager
+from convertors.daemon import converter_pool, mako_pool
+from core.pubsub import pubsub
+from core.api_key_cache import api_key_cache
+from features.pdf_generation.services.playwright_manager import PDFTooLarge, PlaywrightManager
+from features.pdf_generation.services.pdf_cache import pdf_cache
+from features.pdf_generation.services.admission import RenderOverloaded, render_admission
+from features.pdf_generation.services.template_analysis import TemplateDataMissing
+from features.pdf_generation.services.template_cache import template_cache
 
 # Import API routes
-from api.v1 import templates, api_keys, external
+from api.v1 import templates, api_keys, external, jobs
 from features.oauth import oauth_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cache invalidations from other worker processes
+    await pubsub.start()
+    api_key_cache.start()
+    # Browsers are launched, pooled and warmed before the app reports ready
+    if PLAYWRIGHT_EAGER_START:
+        playwright_manager = await PlaywrightManager.get_instance()
+        await playwright_manager.warm_up()
+    yield
+    await PlaywrightManager.shutdown()
+    await asyncio.gather(converter_pool.aclose(), mako_pool.aclose())
+    await api_key_cache.close()
+    await pubsub.close()
+
 # Create FastAPI instance
 app = FastAPI(
     title="pdfGen api",
     description="The api for the pdfGen application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Shed renders fast when the render path is saturated
+@app.exception_handler(RenderOverloaded)
+async def render_overloaded_handler(request: Request, exc: RenderOverloaded):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Data that can't satisfy the template never reaches a browser
+@app.exception_handler(TemplateDataMissing)
+async def template_data_missing_handler(request: Request, exc: TemplateDataMissing):
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": str(exc), "missing": exc.missing, "row": exc.row}
+    )
+
+# Oversized documents are a property of the request, not a server failure
+@app.exception_handler(PDFTooLarge)
+async def pdf_too_large_handler(request: Request, exc: PDFTooLarge):
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": str(exc)}
+    )
+
 #---------------------------------------start middleware--------------------------------------------
 
 from fastapi import Request
@@ -24,11 +75,6 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    playwright_manager = await PlaywrightManager.get_instance()
-    await playwright_manager.cleanup() 
-
 #@app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info(f"Incoming request: {request.method} {request.url}")
@@ -86,6 +132,7 @@ app.include_router(oauth_router, prefix="/api/v1/auth", tags=["oauth"])
 # Include API routes
 app.include_router(templates.router, prefix="/api/v1", tags=["templates"])
 app.include_router(api_keys.router, prefix="/api/v1", tags=["api-keys"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
 app.include_router(external.router, prefix="/api/v1/external", tags=["external"])
 
 # Root endpoint
@@ -96,7 +143,12 @@ def read_root():
 # Health check endpoint
 @app.get("/api/v1/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "pdf_cache": pdf_cache.stats(),
+        "template_cache": template_cache.stats(),
+        "render_admission": render_admission.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
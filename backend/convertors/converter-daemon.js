@@ -0,0 +1,72 @@
+// Long-lived converter process
+//
+// Reads one JSON request per line on stdin:
+//   {"id": 1, "engine": "jsx" | "vue", "template": "...", "context": {...}, "compiled": "..."}
+//   {"id": 2, "op": "analyze", "engine": "jsx" | "vue", "template": "..."}
+// and writes one JSON response per line on stdout:
+//   {"id": 1, "html": "..."}  or  {"id": 1, "error": "..."}
+//   {"id": 2, "compiled": "...", "variables": ["customer.name", ...]}
+//
+// `compiled` is optional; it is the generated render code returned by an
+// earlier analyze of the same template and saves compiling it again.
+const readline = require('readline');
+const { advancedJsxToHtml, generateJsx } = require('./jsx-converter');
+const { advancedVueToHtml, generateVue } = require('./vue-converter');
+const { referencedPaths } = require('./template-analysis');
+
+const converters = {
+  jsx: advancedJsxToHtml,
+  vue: advancedVueToHtml,
+};
+
+const generators = {
+  jsx: generateJsx,
+  vue: generateVue,
+};
+
+// stdout carries responses only, so template logging goes to stderr
+console.log = console.info = console.debug = console.error;
+
+function respond(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function engineFunction(table, engine) {
+  const fn = table[engine];
+  if (!fn) {
+    throw new Error(`Unknown engine: ${engine}`);
+  }
+  return fn;
+}
+
+function handle(line) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    respond({ id: null, error: `Invalid request: ${e.message}` });
+    return;
+  }
+
+  try {
+    if (request.op === 'analyze') {
+      const compiled = engineFunction(generators, request.engine)(request.template);
+      respond({ id: request.id, compiled, variables: referencedPaths(compiled) });
+      return;
+    }
+    const convert = engineFunction(converters, request.engine);
+    const html = convert(request.template, request.context || {}, request.compiled);
+    respond({ id: request.id, html: String(html).trim() });
+  } catch (e) {
+    respond({ id: request.id, error: (e && e.message) || String(e) });
+  }
+}
+
+const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+input.on('line', (line) => {
+  if (line.trim()) {
+    handle(line);
+  }
+});
+// The parent closed our stdin: it is shutting down or replacing us
+input.on('close', () => process.exit(0));
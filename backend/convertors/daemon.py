@@ -0,0 +1,277 @@
+"""
+Pools of long-lived converter processes
+
+Each process runs a converter daemon (converter-daemon.js under node for
+JSX/Vue, mako-daemon.py for Mako) and answers newline-delimited JSON
+requests one at a time. A process that crashes or overruns its timeout is
+killed and replaced on the next checkout. Async callers go through
+`aconvert`, which waits on the pipes from a bounded thread pool so the
+event loop keeps serving other requests.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.config import (
+    CONVERTER_POOL_SIZE,
+    CONVERTER_TIMEOUT,
+    MAKO_MODULE_DIR,
+    MAKO_POOL_SIZE,
+    MAKO_SANDBOX_MEMORY,
+    MAKO_TEMPLATE_CACHE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+DAEMON_SCRIPT = Path(__file__).parent / "converter-daemon.js"
+MAKO_DAEMON_SCRIPT = Path(__file__).parent / "mako-daemon.py"
+
+NODE_COMMAND = ["node", str(DAEMON_SCRIPT)]
+# Isolated mode: no PYTHON* variables, user site-packages or script directory on sys.path
+MAKO_COMMAND = [sys.executable, "-I", str(MAKO_DAEMON_SCRIPT)]
+
+
+class ConverterError(Exception):
+    """Raised when a template can't be converted"""
+
+
+class ConverterProcess:
+    """One process running a converter daemon"""
+
+    def __init__(self, command: List[str] = NODE_COMMAND, env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None):
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                env=env,
+                cwd=cwd,
+            )
+        except FileNotFoundError:
+            if command[0] == "node":
+                raise ConverterError("Node.js not found. Please install Node.js")
+            raise ConverterError(f"Converter command not found: {command[0]}")
+        self._responses = queue.Queue()
+        self._ids = itertools.count(1)
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_stdout(self):
+        for line in self._process.stdout:
+            self._responses.put(line)
+        # EOF: wake up a caller waiting on a process that died
+        self._responses.put(None)
+
+    def _read_stderr(self):
+        for line in self._process.stderr:
+            logger.debug(f"converter[{self._process.pid}]: {line.rstrip()}")
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def _write_request(self, request_id: int, fields: dict):
+        # Written piecewise so the template and the (possibly large) context are
+        # each encoded once and never concatenated into one request string
+        stdin = self._process.stdin
+        stdin.write(f'{{"id": {request_id}')
+        for name, value in fields.items():
+            stdin.write(f', "{name}": ')
+            stdin.write(json.dumps(value))
+        stdin.write("}\n")
+        stdin.flush()
+
+    def request(self, fields: dict, timeout: float) -> dict:
+        request_id = next(self._ids)
+        try:
+            self._write_request(request_id, fields)
+        except (BrokenPipeError, OSError):
+            self.kill()
+            raise ConverterError("Converter process exited")
+
+        try:
+            line = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            raise ConverterError(f"Conversion timed out after {timeout}s")
+        if line is None:
+            self.kill()
+            raise ConverterError(f"Converter process exited with code {self._process.poll()}")
+
+        response = json.loads(line)
+        if response.get("id") != request_id:
+            self.kill()
+            raise ConverterError("Converter process answered out of order")
+        if "error" in response:
+            raise ConverterError(response["error"])
+        return response
+
+    def convert(self, engine: str, template: str, context: dict, timeout: float, compiled: Optional[str] = None) -> str:
+        fields = {"engine": engine, "template": template, "context": context}
+        if compiled:
+            fields["compiled"] = compiled
+        return self.request(fields, timeout)["html"]
+
+    def kill(self):
+        if self.alive:
+            self._process.kill()
+        self._process.wait()
+
+    def close(self, timeout: float = 5):
+        """Let the process exit on its own once its stdin closes"""
+        self.close_stdin()
+        self.wait(timeout)
+
+    def close_stdin(self):
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+
+    def wait(self, timeout: float):
+        """Wait for the process to exit, killing it after `timeout`"""
+        try:
+            self._process.wait(timeout=max(timeout, 0))
+        except subprocess.TimeoutExpired:
+            self.kill()
+
+
+class ConverterPool:
+    """Fixed number of converter processes, started on first use"""
+
+    def __init__(
+        self,
+        size: int = CONVERTER_POOL_SIZE,
+        timeout: float = CONVERTER_TIMEOUT,
+        command: List[str] = NODE_COMMAND,
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+    ):
+        self.size = size
+        self.timeout = timeout
+        self.command = command
+        self._env = env
+        self._cwd = cwd
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # One thread per process, so excess conversions queue here rather than in _checkout
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="converter")
+            return self._executor
+
+    def _spawn(self) -> Optional[ConverterProcess]:
+        with self._lock:
+            if self._started >= self.size:
+                return None
+            self._started += 1
+            try:
+                process = ConverterProcess(self.command, self._env, self._cwd)
+            except Exception:
+                self._started -= 1
+                raise
+            self._processes.add(process)
+            return process
+
+    def _checkout(self) -> ConverterProcess:
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                process = self._spawn()
+            if process is None:
+                try:
+                    process = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise ConverterError("No converter process became available")
+            if process.alive:
+                return process
+            # Died while idle
+            self._checkin(process)
+
+    def _checkin(self, process: ConverterProcess):
+        if process.alive:
+            self._idle.put(process)
+            return
+        # Crashed or killed on timeout; the next checkout starts a fresh one
+        with self._lock:
+            self._processes.discard(process)
+            self._started -= 1
+
+    def convert(self, engine: str, template: str, context: Optional[dict] = None, compiled: Optional[str] = None) -> str:
+        process = self._checkout()
+        try:
+            return process.convert(engine, template, context or {}, self.timeout, compiled)
+        finally:
+            self._checkin(process)
+
+    async def aconvert(self, engine: str, template: str, context: Optional[dict] = None, compiled: Optional[str] = None) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.convert, engine, template, context, compiled)
+
+    def analyze(self, engine: str, template: str) -> dict:
+        """Generated render code and referenced data paths of a template, as {"compiled", "variables"}"""
+        process = self._checkout()
+        try:
+            return process.request({"op": "analyze", "engine": engine, "template": template}, self.timeout)
+        finally:
+            self._checkin(process)
+
+    async def aanalyze(self, engine: str, template: str) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.analyze, engine, template)
+
+    def close(self, timeout: float = 5):
+        with self._lock:
+            processes, self._processes = self._processes, set()
+            self._started = 0
+            self._idle = queue.LifoQueue()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        # Every process is told to exit before any is waited on, so they shut down together
+        for process in processes:
+            process.close_stdin()
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.wait(deadline - time.monotonic())
+
+    async def aclose(self, timeout: float = 5):
+        """Like close, without blocking the event loop"""
+        await asyncio.to_thread(self.close, timeout)
+
+
+def _mako_env() -> Dict[str, str]:
+    """Only what the Mako daemon needs; none of the app's secrets or database settings"""
+    env = {
+        "PATH": os.environ.get("PATH", ""),
+        "MAKO_TEMPLATE_CACHE_SIZE": str(MAKO_TEMPLATE_CACHE_SIZE),
+        "MAKO_SANDBOX_MEMORY": str(MAKO_SANDBOX_MEMORY),
+    }
+    if MAKO_MODULE_DIR:
+        env["MAKO_MODULE_DIR"] = str(Path(MAKO_MODULE_DIR).resolve())
+    return env
+
+
+converter_pool = ConverterPool()
+# Started lazily like the node pool; the working directory is kept out of the app's tree
+mako_pool = ConverterPool(size=MAKO_POOL_SIZE, command=MAKO_COMMAND, env=_mako_env(), cwd="/")
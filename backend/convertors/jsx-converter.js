@@ -1,4 +1,5 @@
 const fs = require('fs');
+const { TemplateCache, createRender, isValidExpression } = require('./template-cache');
 
 // Simple JSX to HTML converter without React
 function jsxToHtml(jsx, context = {}) {
@@ -37,96 +38,407 @@ function jsxToHtml(jsx, context = {}) {
   return html;
 }
 
-// Enhanced version that handles more complex expressions
-function advancedJsxToHtml(jsx, context = {}) {
-  // Pre-process common JSX patterns
-  let processed = jsx;
-  
-  // Handle map operations: {items.map(item => `<li>${item}</li>`)}
-  processed = processed.replace(
-    /\{([^}]*?)\.map\(([^)]+)\s*=>\s*\(([\s\S]*?)\)\)\}/g,  
-    (match, arrayExpr, param, jsxContent) => {
-        try {
-            const func = new Function(...Object.keys(context), `
-                const array = ${arrayExpr};
-                if (!Array.isArray(array)) return '';
-                return array.map(${param} => {
-                    // Replace JSX expressions inside the mapped content
-                    return \`${jsxContent.replace(/\{([^}]+)\}/g, '${$1}')}\`;
-                }).join('');
-            `);
-            return func(...Object.values(context));
-        } catch (e) {
-            console.warn(`Error in map operation: ${match}`, e);
-            return '';
+// Template compiler: a single pass over the template that reads JSX markup
+// and the JavaScript inside {...}, including JSX nested in that JavaScript
+// (maps, conditionals, ternaries). Each element becomes a string
+// concatenation, so the whole template compiles to one render function.
+
+const VOID_ELEMENTS = new Set([
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+  'link', 'meta', 'param', 'source', 'track', 'wbr',
+]);
+const FRAGMENTS = new Set(['', 'Fragment', 'React.Fragment']);
+const ATTRIBUTE_NAMES = { className: 'class', htmlFor: 'for' };
+
+const TAG_NAME = /[A-Za-z_$][\w$.:-]*/y;
+const ATTR_NAME = /[^\s"'>\/={}]+/y;
+const WHITESPACE = /\s*/y;
+const TEXT = /[^<{]+/y;
+const IDENTIFIER_END = /[\w$]$/;
+// After these keywords an expression starts, so '<' opens JSX and '/' a regex
+const EXPRESSION_KEYWORD = /(?:^|[^\w$])(?:return|yield|await|typeof|void|case|do|else|in|of)$/;
+// Trailing code EXPRESSION_KEYWORD needs: its longest keyword and the character before it
+const TAIL_LENGTH = 8;
+
+function matchAt(pattern, source, index) {
+  pattern.lastIndex = index;
+  const match = pattern.exec(source);
+  return match ? match[0] : '';
+}
+
+class JsxCompileError extends Error {}
+
+class JsxCompiler {
+  constructor(source) {
+    this.source = source;
+    this.i = 0;
+    // Names of the elements currently open, innermost last
+    this.open = [];
+  }
+
+  error(message) {
+    return new JsxCompileError(`${message} at offset ${this.i}`);
+  }
+
+  // Markup: text, {expressions} and elements until `closing` (or the end)
+  children(closing) {
+    const parts = [];
+    const { source } = this;
+    while (this.i < source.length) {
+      if (source[this.i] === '{') {
+        const expression = this.expressionContainer();
+        if (expression !== null) {
+          parts.push({ code: `__rt.child(${guard(expression, '')})`, label: expression.label });
+        }
+      } else if (source[this.i] === '<') {
+        if (source[this.i + 1] === '/') {
+          const end = source.indexOf('>', this.i);
+          const stop = end === -1 ? source.length : end + 1;
+          const name = source.slice(this.i + 2, stop - 1).trim();
+          // Ours or an ancestor's; an ancestor's implicitly closes this element
+          if (closing !== undefined && (name === closing || this.open.includes(name))) {
+            return parts;
+          }
+          // Stray closing tag, kept as written
+          parts.push({ text: source.slice(this.i, stop) });
+          this.i = stop;
+          continue;
         }
+        if (source.startsWith('<!', this.i)) {
+          // HTML comments and doctypes pass through
+          const terminator = source.startsWith('<!--', this.i) ? '-->' : '>';
+          const end = source.indexOf(terminator, this.i);
+          const stop = end === -1 ? source.length : end + terminator.length;
+          parts.push({ text: source.slice(this.i, stop) });
+          this.i = stop;
+        } else if (source[this.i + 1] === '>' || matchAt(TAG_NAME, source, this.i + 1)) {
+          parts.push(...this.element());
+        } else {
+          parts.push({ text: '<' });
+          this.i++;
+        }
+      } else {
+        const text = matchAt(TEXT, source, this.i);
+        parts.push({ text });
+        this.i += text.length;
+      }
     }
-  );
-  
-  // Handle conditional rendering: {condition && <div>content</div>}
-  processed = processed.replace(
-    /\{([^}]*?)\s*&&\s*([^}]*?)\}/g,
-    (match, condition, content) => {
-      try {
-        const func = new Function(...Object.keys(context), `
-          return (${condition}) ? \`${content}\` : '';
-        `);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in conditional: ${match}`, e);
-        return '';
+    return parts;
+  }
+
+  // One element as a list of static text and code parts
+  element() {
+    const { source } = this;
+    this.i++; // <
+    const name = matchAt(TAG_NAME, source, this.i);
+    this.i += name.length;
+    const fragment = FRAGMENTS.has(name);
+    const tag = name.toLowerCase();
+    const parts = fragment ? [] : [{ text: `<${name}` }];
+
+    // Attributes
+    for (;;) {
+      this.i += matchAt(WHITESPACE, source, this.i).length;
+      if (this.i >= source.length) {
+        throw this.error(`Unterminated <${name}>`);
+      }
+      if (source[this.i] === '>') {
+        this.i++;
+        break;
+      }
+      if (source.startsWith('/>', this.i)) {
+        this.i += 2;
+        if (!fragment) {
+          parts.push({ text: VOID_ELEMENTS.has(tag) ? '>' : `></${name}>` });
+        }
+        return parts;
+      }
+      if (source[this.i] === '{') {
+        // {...props}
+        const expression = this.expressionContainer();
+        if (expression !== null && !fragment) {
+          expression.code = expression.code.replace(/^\.\.\./, '');
+          parts.push({ code: `__rt.spread(${guard(expression, null)})`, label: expression.label });
+        }
+        continue;
+      }
+
+      const rawName = matchAt(ATTR_NAME, source, this.i) || source[this.i];
+      this.i += rawName.length;
+      // React-only props render nothing
+      const attrName = rawName === 'key' || rawName === 'ref' ? null : ATTRIBUTE_NAMES[rawName] || rawName;
+      const render = attrName !== null && !fragment;
+      this.i += matchAt(WHITESPACE, source, this.i).length;
+      if (source[this.i] !== '=') {
+        if (render) parts.push({ text: ` ${attrName}` });
+        continue;
+      }
+      this.i++;
+      this.i += matchAt(WHITESPACE, source, this.i).length;
+      const quote = source[this.i];
+      if (quote === '"' || quote === "'") {
+        const end = source.indexOf(quote, this.i + 1);
+        if (end === -1) throw this.error(`Unterminated attribute ${rawName}`);
+        if (render) parts.push({ text: ` ${attrName}=${quote}${source.slice(this.i + 1, end)}${quote}` });
+        this.i = end + 1;
+      } else if (quote === '{') {
+        const expression = this.expressionContainer();
+        if (expression !== null && render) {
+          parts.push({ code: `__rt.attr(${JSON.stringify(attrName)}, ${guard(expression, null)})`, label: expression.label });
+        }
+      } else {
+        throw this.error(`Unexpected character in attribute ${rawName}`);
       }
     }
-  );
-  
-  // Handle ternary operators: {condition ? 'yes' : 'no'}
-  processed = processed.replace(
-    /\{([^}]*?\?[^}]*?:[^}]*?)\}/g,
-    (match, ternary) => {
-      try {
-        const func = new Function(...Object.keys(context), `return ${ternary}`);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in ternary: ${match}`, e);
-        return '';
+
+    if (!fragment) {
+      parts.push({ text: '>' });
+    }
+    if (VOID_ELEMENTS.has(tag) && !fragment) {
+      return parts;
+    }
+
+    this.open.push(name);
+    parts.push(...this.children(name));
+    this.open.pop();
+    // Consume </name>; an ancestor's closing tag or the end of the template closes it implicitly
+    const end = source.indexOf('>', this.i);
+    if (end !== -1 && source.slice(this.i + 2, end).trim() === name) {
+      this.i = end + 1;
+    }
+    if (!fragment) {
+      parts.push({ text: `</${name}>` });
+    }
+    return parts;
+  }
+
+  // {expression}: its compiled code and source, or null if it holds only comments
+  expressionContainer() {
+    const start = this.i;
+    this.i++; // {
+    const code = this.javascript('}').trim();
+    this.i++; // }
+    return code ? { code, label: this.source.slice(start, this.i) } : null;
+  }
+
+  // JavaScript up to an unbalanced `terminator`, with embedded JSX compiled
+  javascript(terminator) {
+    const { source } = this;
+    let code = '';
+    // The end of code.trimEnd(), just long enough for the checks below, and
+    // whether whitespace followed it; kept as code grows so each step is O(1)
+    let prev = '';
+    let gap = '';
+    const append = (text) => {
+      code += text;
+      const trimmed = text.trimEnd();
+      if (trimmed) {
+        prev = (prev + gap + trimmed).slice(-TAIL_LENGTH);
+        gap = trimmed.length < text.length ? ' ' : '';
+      } else if (text) {
+        gap = ' ';
+      }
+    };
+    // Only braces can hide the terminator; unbalanced parentheses are left for the syntax check
+    let depth = 0;
+    while (this.i < source.length) {
+      const ch = source[this.i];
+      const expressionStart = prev === '' || /[(,=:?&|!{}\[;+\-*%~^<>]$/.test(prev) || EXPRESSION_KEYWORD.test(prev);
+
+      if (ch === terminator && depth === 0) {
+        return code;
+      }
+      if (ch === '{') {
+        depth++;
+      } else if (ch === '}') {
+        depth--;
+      }
+
+      if (ch === '"' || ch === "'") {
+        append(this.stringLiteral(ch));
+      } else if (ch === '`') {
+        append(this.templateLiteral());
+      } else if (source.startsWith('//', this.i)) {
+        const end = source.indexOf('\n', this.i);
+        this.i = end === -1 ? source.length : end;
+      } else if (source.startsWith('/*', this.i)) {
+        const end = source.indexOf('*/', this.i + 2);
+        this.i = end === -1 ? source.length : end + 2;
+      } else if (ch === '/' && expressionStart) {
+        append(this.regexLiteral());
+      } else if (ch === '<' && expressionStart && !IDENTIFIER_END.test(prev)
+          && (source[this.i + 1] === '>' || matchAt(TAG_NAME, source, this.i + 1))) {
+        append(`(${joinParts(this.element())})`);
+      } else {
+        append(ch);
+        this.i++;
       }
     }
-  );
-  
-  // Handle remaining simple expressions
-  processed = processed.replace(/\{([^}]+)\}/g, (match, expr) => {
-    try {
-      const func = new Function(...Object.keys(context), `return ${expr}`);
-      const result = func(...Object.values(context));
-      return result !== undefined ? result : '';
-    } catch (e) {
-      console.warn(`Error evaluating: ${expr}`, e);
-      return '';
+    throw this.error(`Expected '${terminator}'`);
+  }
+
+  stringLiteral(quote) {
+    const { source } = this;
+    const start = this.i;
+    this.i++;
+    while (this.i < source.length && source[this.i] !== quote) {
+      this.i += source[this.i] === '\\' ? 2 : 1;
     }
-  });
-  
-  // Convert JSX to HTML
-  processed = processed.replace(/className=/g, 'class=');
-  processed = processed.replace(/<(\w+)([^>]*?)\/>/g, '<$1$2></$1>');
-  processed = processed.replace(/<React\.Fragment>|<\/React\.Fragment>|<>|<\/>/g, '');
-  
-  return processed;
+    this.i++;
+    return source.slice(start, this.i);
+  }
+
+  templateLiteral() {
+    const { source } = this;
+    let code = '`';
+    this.i++;
+    while (this.i < source.length && source[this.i] !== '`') {
+      if (source[this.i] === '\\') {
+        code += source.slice(this.i, this.i + 2);
+        this.i += 2;
+      } else if (source.startsWith('${', this.i)) {
+        this.i += 2;
+        code += '${' + this.javascript('}') + '}';
+        this.i++;
+      } else {
+        code += source[this.i];
+        this.i++;
+      }
+    }
+    this.i++;
+    return code + '`';
+  }
+
+  regexLiteral() {
+    const { source } = this;
+    const start = this.i;
+    let inClass = false;
+    this.i++;
+    while (this.i < source.length) {
+      const ch = source[this.i];
+      if (ch === '\\') {
+        this.i += 2;
+        continue;
+      }
+      this.i++;
+      if (ch === '[') inClass = true;
+      else if (ch === ']') inClass = false;
+      else if (ch === '/' && !inClass) break;
+    }
+    this.i += matchAt(/[a-z]*/y, source, this.i).length;
+    return source.slice(start, this.i);
+  }
+}
+
+// Code for an expression whose failure renders `fallback`
+function guard(expression, fallback) {
+  return `__rt.attempt(() => (${expression.code}), ${JSON.stringify(fallback)}, ${JSON.stringify(expression.label)})`;
+}
+
+// Concatenation code for a list of parts, merging adjacent static text
+function joinParts(parts) {
+  const pieces = [];
+  let text = '';
+  for (const part of parts) {
+    if (part.text !== undefined) {
+      text += part.text;
+    } else {
+      if (text || pieces.length === 0) pieces.push(JSON.stringify(text));
+      text = '';
+      pieces.push(part.code);
+    }
+  }
+  if (text || pieces.length === 0) pieces.push(JSON.stringify(text));
+  return pieces.join(' + ');
+}
+
+const escapeAttr = (value) => String(value).replace(/&/g, '&amp;').replace(/"/g, '&quot;');
+
+function styleText(style) {
+  return Object.keys(style)
+    .filter((key) => style[key] !== null && style[key] !== undefined && style[key] !== '')
+    .map((key) => key.replace(/([A-Z])/g, '-$1').toLowerCase() + ': ' + style[key])
+    .join('; ');
+}
+
+// Helpers called by the generated render functions
+const jsxRuntime = {
+  // Rendered like React children: arrays are flattened, booleans and null render nothing
+  child(value) {
+    if (Array.isArray(value)) {
+      let out = '';
+      for (const item of value) out += jsxRuntime.child(item);
+      return out;
+    }
+    return value === null || value === undefined || typeof value === 'boolean' ? '' : value;
+  },
+
+  attr(name, value) {
+    if (value === null || value === undefined || value === false) return '';
+    if (value === true) return ` ${name}`;
+    if (name === 'style' && typeof value === 'object') return ` style="${escapeAttr(styleText(value))}"`;
+    return ` ${name}="${escapeAttr(value)}"`;
+  },
+
+  spread(props) {
+    let out = '';
+    for (const key of Object.keys(props || {})) {
+      if (key !== 'children' && key !== 'key') out += jsxRuntime.attr(ATTRIBUTE_NAMES[key] || key, props[key]);
+    }
+    return out;
+  },
+};
+
+// Generate the body of a JSX template's render function. A top-level
+// expression that doesn't parse is reported once and renders as empty text.
+function generateJsx(jsx) {
+  let parts;
+  try {
+    parts = new JsxCompiler(jsx).children();
+  } catch (e) {
+    if (!(e instanceof JsxCompileError)) throw e;
+    console.warn(`Error parsing JSX template: ${e.message}`);
+    parts = [{ text: '' }];
+  }
+  const checked = parts.map((part) =>
+    part.code === undefined || isValidExpression(part.code, part.label) ? part : { text: '' }
+  );
+  return `return ${joinParts(checked)};`;
+}
+
+// Render function from code generated by generateJsx
+function loadJsx(code) {
+  return createRender(code, jsxRuntime);
+}
+
+function compileJsx(jsx) {
+  return loadJsx(generateJsx(jsx));
+}
+
+const templateCache = new TemplateCache(compileJsx, loadJsx);
+
+// Enhanced version that handles more complex expressions. The template is
+// compiled on first use, or loaded from `compiled`, its generateJsx output;
+// later calls only run the cached render function.
+function advancedJsxToHtml(jsx, context = {}, compiled = null) {
+  return templateCache.get(jsx, compiled)(context);
 }
 
-// CLI interface
+// CLI interface: the request is read from stdin, so large templates and
+// datasets aren't limited by the size of the argument list
 if (require.main === module) {
-  const args = process.argv.slice(2);
+  const input = process.stdin.isTTY ? '' : fs.readFileSync(0, 'utf8');
   
-  if (args.length < 2) {
-    console.log('Usage: node jsx-converter.js <jsx-string> <context-json>');
-    console.log('Example: node jsx-converter.js "<div>{name}</div>" \'{"name":"John"}\'');
+  if (!input.trim()) {
+    console.log('Usage: node jsx-converter.js < request.json');
+    console.log('Request: {"template": "<jsx-string>", "context": {...}}');
+    console.log('Example: echo \'{"template":"<div>{name}</div>","context":{"name":"John"}}\' | node jsx-converter.js');
     process.exit(1);
   }
   
-  const jsx = args[0];
-  const context = JSON.parse(args[1] || '{}');
+  const request = JSON.parse(input);
   
-  const html = advancedJsxToHtml(jsx, context);
+  const html = advancedJsxToHtml(request.template, request.context || {});
   console.log(html);
 }
 
@@ -178,4 +490,4 @@ function test() {
 //     test();
 // }
 
-module.exports = { jsxToHtml, advancedJsxToHtml };
\ No newline at end of file
+module.exports = { jsxToHtml, advancedJsxToHtml, compileJsx, generateJsx };
\ No newline at end of file
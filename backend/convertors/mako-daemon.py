@@ -0,0 +1,213 @@
+"""
+Restricted Mako renderer, driven by convertors/daemon.py
+
+Reads newline-delimited JSON requests on stdin and answers each with one
+line on stdout, like converter-daemon.js:
+
+    {"id": 1, "engine": "mako", "template": "...", "context": {...}, "compiled": "..."}
+    -> {"id": 1, "html": "..."}
+    {"id": 2, "op": "analyze", "engine": "mako", "template": "..."}
+    -> {"id": 2, "compiled": "...", "variables": [...]}
+
+Templates are user-supplied, so this runs in its own process with a
+stripped environment and a memory limit, and is killed by the pool when a
+render overruns CONVERTER_TIMEOUT. Templates are also checked before they
+are compiled: only plain text, expressions, control lines and simple code
+blocks are accepted, and the Python inside them may only use an allowlist
+of expression and statement forms. Names that lead back to the runtime
+(context, self, capture, ...), underscore and frame attributes, str.format
+and the builtins that reach outside the template are rejected.
+"""
+import ast
+import builtins
+import hashlib
+import json
+import os
+import sys
+import types
+from collections import OrderedDict
+from pathlib import Path
+
+from mako import parsetree
+from mako.ast import PythonFragment
+from mako.lexer import Lexer
+from mako.pygen import adjust_whitespace
+from mako.template import ModuleTemplate, Template
+
+MODULE_DIR = os.environ.get("MAKO_MODULE_DIR", "")
+CACHE_SIZE = int(os.environ.get("MAKO_TEMPLATE_CACHE_SIZE", "500"))
+MEMORY_LIMIT = int(os.environ.get("MAKO_SANDBOX_MEMORY", "0"))
+
+# Names Mako provides to every template
+RUNTIME_NAMES = {"context", "loop", "caller", "capture", "local", "self", "parent", "next", "pageargs", "UNDEFINED", "STOP_RENDERING"}
+
+# The context and template namespaces lead back to the generated module and its imports
+BLOCKED_NAMES = {"context", "caller", "capture", "local", "self", "parent", "next", "pageargs"}
+BLOCKED_BUILTINS = {
+    "__import__", "breakpoint", "compile", "delattr", "dir", "eval", "exec", "exit", "getattr", "globals",
+    "help", "input", "locals", "memoryview", "object", "open", "print", "property", "quit", "setattr",
+    "super", "type", "vars", "classmethod", "staticmethod",
+}
+# Generator, coroutine, frame, traceback and code object internals
+BLOCKED_ATTRIBUTE_PREFIXES = ("_", "gi_", "cr_", "ag_", "f_", "tb_", "co_")
+# Format strings resolve '{0.__globals__}' without an attribute node to check
+BLOCKED_ATTRIBUTES = {"format", "format_map"}
+
+# Python forms templates may use: expressions, comprehensions, assignments and
+# the statements control lines compile to. Anything else (lambdas, function and
+# class definitions, with, imports, ...) is rejected.
+ALLOWED_PYTHON = (
+    ast.Module, ast.Expression, ast.Expr, ast.Name, ast.Constant, ast.Attribute, ast.Subscript, ast.Slice,
+    ast.Call, ast.keyword, ast.Starred, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.List, ast.Tuple, ast.Dict, ast.Set, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+    ast.comprehension, ast.JoinedStr, ast.FormattedValue, ast.Assign, ast.AugAssign, ast.If, ast.For,
+    ast.While, ast.Try, ast.ExceptHandler, ast.Pass, ast.Break, ast.Continue,
+    ast.expr_context, ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+# Plain text, ${expressions}, % control lines, <% code %>, ## comments and <%text>
+ALLOWED_NODES = (parsetree.Text, parsetree.Expression, parsetree.ControlLine, parsetree.Code, parsetree.Comment, parsetree.TextTag)
+
+
+class TemplateNotAllowed(Exception):
+    pass
+
+
+def _blocked(name):
+    def blocked(*args, **kwargs):
+        raise NameError(f"'{name}' is not available in templates")
+    return blocked
+
+
+# Rendered over the data so a lookup that slips past check_template can't fall
+# back to the real builtins
+BLOCKED_CONTEXT = {name: _blocked(name) for name in BLOCKED_BUILTINS}
+
+
+def _check_python(source: str):
+    for node in ast.walk(ast.parse(adjust_whitespace(source))):
+        if not isinstance(node, ALLOWED_PYTHON):
+            raise TemplateNotAllowed(f"{type(node).__name__} is not allowed in templates")
+        if isinstance(node, ast.Name) and (node.id in BLOCKED_NAMES or node.id in BLOCKED_BUILTINS or node.id.startswith("_")):
+            raise TemplateNotAllowed(f"'{node.id}' is not allowed")
+        if isinstance(node, ast.Attribute) and (node.attr in BLOCKED_ATTRIBUTES or node.attr.startswith(BLOCKED_ATTRIBUTE_PREFIXES)):
+            raise TemplateNotAllowed(f"attribute '{node.attr}' is not allowed")
+
+
+def check_template(source: str):
+    """Raise TemplateNotAllowed unless the template only uses the allowed subset of Mako"""
+    nodes = list(Lexer(source).parse().get_children())
+    while nodes:
+        node = nodes.pop()
+        if not isinstance(node, ALLOWED_NODES):
+            raise TemplateNotAllowed(f"<%{getattr(node, 'keyword', type(node).__name__)}> is not allowed")
+        if isinstance(node, parsetree.Code) and node.ismodule:
+            raise TemplateNotAllowed("module-level <%! %> blocks are not allowed")
+        if isinstance(node, (parsetree.Expression, parsetree.Code)):
+            _check_python(node.code.code)
+        if isinstance(node, parsetree.Expression) and node.escapes:
+            _check_python(node.escapes)
+        if isinstance(node, parsetree.ControlLine) and not node.isend:
+            # Completed into a parseable statement (`else:` -> `if False:pass\nelse:pass`) as Mako does
+            _check_python(PythonFragment(node.text, **node.exception_kwargs).code)
+        if isinstance(node, parsetree.TextTag):
+            continue
+        nodes.extend(node.get_children())
+
+
+def _key(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _compile(key: str, source: str) -> Template:
+    options = {"strict_undefined": True, "default_filters": ["h"]}
+    if MODULE_DIR:
+        # Mako compiles file-based templates to <module_directory>/<uri>.py
+        # and reuses that module across processes and restarts
+        module_dir = Path(MODULE_DIR)
+        module_dir.mkdir(parents=True, exist_ok=True)
+        path = module_dir / f"{key}.mako"
+        if not path.exists():
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(source, encoding="utf-8")
+            os.replace(tmp_path, path)
+        return Template(filename=str(path), module_directory=str(module_dir), uri=path.name, **options)
+    return Template(text=source, **options)
+
+
+def _load(key: str, source: str, compiled: str) -> Template:
+    """Template from module source produced by an earlier analyze"""
+    module = types.ModuleType(f"mako_{key}")
+    exec(compile(compiled, module.__name__, "exec"), module.__dict__)
+    return ModuleTemplate(module, template_source=source)
+
+
+_templates = OrderedDict()
+
+
+def template_for(source: str, compiled: str = None) -> Template:
+    key = _key(source)
+    template = _templates.get(key)
+    if template is not None:
+        _templates.move_to_end(key)
+        return template
+
+    check_template(source)
+    template = _load(key, source, compiled) if compiled else _compile(key, source)
+    _templates[key] = template
+    if len(_templates) > CACHE_SIZE:
+        _templates.popitem(last=False)
+    return template
+
+
+def render(source: str, context: dict, compiled: str = None) -> str:
+    return template_for(source, compiled).render(**{**(context or {}), **BLOCKED_CONTEXT}).strip()
+
+
+def analyze(source: str) -> dict:
+    """Module source of the template and the names it reads from the context"""
+    template = template_for(source)
+    referenced, declared = set(), set()
+    nodes = list(Lexer(source).parse().get_children())
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get_children())
+        if hasattr(node, "undeclared_identifiers"):
+            referenced.update(node.undeclared_identifiers())
+            declared.update(node.declared_identifiers())
+    variables = referenced - declared - RUNTIME_NAMES - set(dir(builtins))
+    return {"compiled": template.code, "variables": sorted(variables)}
+
+
+def handle(request: dict) -> dict:
+    if request.get("op") == "analyze":
+        return analyze(request["template"])
+    return {"html": render(request["template"], request.get("context"), request.get("compiled"))}
+
+
+def main():
+    if MEMORY_LIMIT:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (MEMORY_LIMIT, MEMORY_LIMIT))
+
+    # Responses own stdout; anything else written there would corrupt the protocol
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            response = handle(request)
+        except MemoryError:
+            response = {"error": "Template exceeded the memory limit"}
+        except Exception as e:
+            response = {"error": str(e)}
+        response["id"] = request.get("id")
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+// Save-time analysis of generated render code
+//
+// Lists the data paths a compiled template requires from its context, e.g.
+// `customer.name` or `lineItems`, so a render can be rejected up front when
+// the data it needs is missing. The scan is deliberately conservative: a
+// name declared anywhere in the template (an arrow parameter, a v-for
+// alias, a `const`) or tested with `typeof` never counts as a context
+// reference, and a name the template tests anywhere (`discount && ...`,
+// `notes ? ... : null`, `title || ...`, `!hidden`, `opt?.x`, a v-if or
+// v-show condition) is optional, along with every path under it.
+
+const KEYWORDS = new Set([
+  'await', 'break', 'case', 'catch', 'class', 'const', 'continue', 'debugger', 'default', 'delete',
+  'do', 'else', 'export', 'extends', 'false', 'finally', 'for', 'function', 'if', 'import', 'in',
+  'instanceof', 'let', 'new', 'null', 'of', 'return', 'super', 'switch', 'this', 'throw', 'true',
+  'try', 'typeof', 'var', 'void', 'while', 'with', 'yield', 'async',
+]);
+
+// Keywords after which a `/` starts a regex literal rather than a division
+const REGEX_AFTER_KEYWORDS = new Set(['return', 'typeof', 'case', 'in', 'of', 'new', 'delete', 'void', 'instanceof', 'yield', 'await']);
+
+// Globals of the render page that don't exist in node, where the analysis runs
+const BROWSER_GLOBALS = new Set(['window', 'document', 'navigator', 'location', 'self']);
+
+const DECLARING_KEYWORDS = new Set(['let', 'const', 'var', 'function', 'class']);
+
+const PUNCTUATORS = ['?.', '=>', '...', '===', '!==', '**', '==', '!=', '<=', '>=', '&&', '||', '??'];
+
+function isIdentifierStart(ch) {
+  return /[A-Za-z_$\u00a0-\uffff]/.test(ch);
+}
+
+function isIdentifierPart(ch) {
+  return /[\w$\u00a0-\uffff]/.test(ch);
+}
+
+function regexAllowed(tokens) {
+  const prev = tokens[tokens.length - 1];
+  if (!prev) return true;
+  if (prev.type === 'name') return REGEX_AFTER_KEYWORDS.has(prev.value);
+  if (prev.type === 'punct') return ![')', ']', '}'].includes(prev.value);
+  return false;
+}
+
+// Tokenize `code` from `start`. Inside a template literal substitution the
+// scan stops at the `}` that closes it and returns its position.
+function tokenize(code, start = 0, inSubstitution = false, tokens = []) {
+  let i = start;
+  let depth = 0;
+  while (i < code.length) {
+    const ch = code[i];
+
+    if (/\s/.test(ch)) {
+      i++;
+    } else if (code.startsWith('//', i)) {
+      const end = code.indexOf('\n', i);
+      i = end === -1 ? code.length : end;
+    } else if (code.startsWith('/*', i)) {
+      const end = code.indexOf('*/', i + 2);
+      i = end === -1 ? code.length : end + 2;
+    } else if (ch === '"' || ch === "'") {
+      i++;
+      while (i < code.length && code[i] !== ch) i += code[i] === '\\' ? 2 : 1;
+      i++;
+      tokens.push({ type: 'string' });
+    } else if (ch === '`') {
+      i++;
+      while (i < code.length && code[i] !== '`') {
+        if (code[i] === '\\') {
+          i += 2;
+        } else if (code.startsWith('${', i)) {
+          // A substitution is an isolated expression
+          tokens.push({ type: 'punct', value: '(' });
+          i = tokenize(code, i + 2, true, tokens) + 1;
+          tokens.push({ type: 'punct', value: ')' });
+        } else {
+          i++;
+        }
+      }
+      i++;
+      tokens.push({ type: 'string' });
+    } else if (ch === '/' && regexAllowed(tokens)) {
+      let inClass = false;
+      i++;
+      while (i < code.length && (code[i] !== '/' || inClass)) {
+        if (code[i] === '\\') i++;
+        else if (code[i] === '[') inClass = true;
+        else if (code[i] === ']') inClass = false;
+        i++;
+      }
+      i++;
+      while (i < code.length && isIdentifierPart(code[i])) i++;
+      tokens.push({ type: 'regex' });
+    } else if (isIdentifierStart(ch)) {
+      let end = i + 1;
+      while (end < code.length && isIdentifierPart(code[end])) end++;
+      tokens.push({ type: 'name', value: code.slice(i, end) });
+      i = end;
+    } else if (/[0-9]/.test(ch) || (ch === '.' && /[0-9]/.test(code[i + 1] || ''))) {
+      i++;
+      while (i < code.length && /[\w.]/.test(code[i])) i++;
+      tokens.push({ type: 'number' });
+    } else {
+      if (ch === '{') {
+        depth++;
+      } else if (ch === '}') {
+        if (inSubstitution && depth === 0) return i;
+        depth--;
+      }
+      const punct = PUNCTUATORS.find((p) => code.startsWith(p, i)) || ch;
+      // `a?.5:0` is a conditional, not optional chaining
+      const value = punct === '?.' && /[0-9]/.test(code[i + 2] || '') ? '?' : punct;
+      tokens.push({ type: 'punct', value });
+      i += value.length;
+    }
+  }
+  return i;
+}
+
+function isPunct(token, ...values) {
+  return token !== undefined && token.type === 'punct' && values.includes(token.value);
+}
+
+function isName(token, ...values) {
+  return token !== undefined && token.type === 'name' && (values.length === 0 || values.includes(token.value));
+}
+
+// Names bound by the code itself (declarations and function parameters),
+// and names it checks with `typeof` before use
+function declaredNames(tokens) {
+  const declared = new Set();
+  const open = [];
+  tokens.forEach((token, i) => {
+    if (isName(token) && DECLARING_KEYWORDS.has(tokens[i - 1] && tokens[i - 1].value)) {
+      declared.add(token.value);
+    } else if (isName(token) && isName(tokens[i - 1], 'typeof')) {
+      declared.add(token.value);
+    } else if (isName(token) && isPunct(tokens[i + 1], '=>')) {
+      declared.add(token.value);
+    } else if (isPunct(token, '(')) {
+      open.push(i);
+    } else if (isPunct(token, ')') && open.length) {
+      const start = open.pop();
+      const before = tokens[start - 1];
+      const isParameterList = isPunct(tokens[i + 1], '=>')
+        || isName(before, 'function', 'catch')
+        || (isName(before) && isName(tokens[start - 2], 'function'));
+      if (isParameterList) {
+        for (let j = start + 1; j < i; j++) {
+          if (isName(tokens[j]) && !isPunct(tokens[j - 1], '.', '?.', '=')) declared.add(tokens[j].value);
+        }
+      }
+    }
+  });
+  return declared;
+}
+
+// Token indexes inside a condition: the parentheses of `if (...)` and
+// `while (...)`, and Vue's v-if/v-show conditions, which compile to
+// `__rt.attempt(() => (condition), false | true, ...)`
+function conditionTokens(tokens) {
+  const inCondition = new Set();
+  const open = [];
+  tokens.forEach((token, i) => {
+    if (isPunct(token, '(')) {
+      open.push(i);
+    } else if (isPunct(token, ')') && open.length) {
+      const start = open.pop();
+      const isStatementTest = isName(tokens[start - 1], 'if', 'while');
+      const isDirectiveTest = isPunct(tokens[start - 1], '=>')
+        && isPunct(tokens[i + 1], ',')
+        && isName(tokens[i + 2], 'true', 'false');
+      if (isStatementTest || isDirectiveTest) {
+        for (let j = start + 1; j < i; j++) inCondition.add(j);
+      }
+    }
+  });
+  return inCondition;
+}
+
+// Whether the reference spanning tokens[start..end) is tested rather than just read
+function isGuarded(tokens, start, end, inCondition) {
+  if (inCondition.has(start)) return true;
+  if (isPunct(tokens[start - 1], '!')) return true;
+  if (isPunct(tokens[start + 1], '?.')) return true;
+  const next = tokens[end];
+  if (isPunct(next, '&&', '||', '??', '?')) return true;
+  return isPunct(next, '==', '!=', '===', '!==') && isName(tokens[end + 1], 'null', 'undefined');
+}
+
+function isContextName(name, declared) {
+  return !name.startsWith('__')
+    && !declared.has(name)
+    && !(name in globalThis)
+    && !BROWSER_GLOBALS.has(name)
+    && !['undefined', 'NaN', 'Infinity', 'arguments'].includes(name);
+}
+
+// Sorted data paths the code requires from its context
+function referencedPaths(code) {
+  const tokens = [];
+  tokenize(code, 0, false, tokens);
+  const declared = declaredNames(tokens);
+  const inCondition = conditionTokens(tokens);
+  const paths = new Set();
+  const optional = new Set();
+
+  tokens.forEach((token, i) => {
+    const prev = tokens[i - 1];
+    if (!isName(token) || KEYWORDS.has(token.value)) return;
+    if (isPunct(prev, '.', '?.')) return;
+    // An object literal key
+    if (isPunct(tokens[i + 1], ':') && isPunct(prev, '{', ',')) return;
+    if (!isContextName(token.value, declared)) return;
+
+    const path = [token.value];
+    let j = i + 1;
+    while (isPunct(tokens[j], '.', '?.') && isName(tokens[j + 1])) {
+      path.push(tokens[j + 1].value);
+      j += 2;
+    }
+    if (isGuarded(tokens, i, j, inCondition)) optional.add(token.value);
+    // `items.map(...)` reads `items`; `map` is a method, not data
+    if (path.length > 1 && isPunct(tokens[j], '(')) path.pop();
+    paths.add(path.join('.'));
+  });
+
+  return [...paths].filter((path) => !optional.has(path.split('.')[0])).sort();
+}
+
+module.exports = { referencedPaths };
@@ -0,0 +1,104 @@
+// Compiled template cache shared by the JSX and Vue converters
+//
+// A converter compiles a template source once into a render function,
+// (context) => html, and keeps it here keyed by a hash of the source.
+// Rendering the same template again only calls the cached function. A
+// caller holding the generated code from an earlier compile (saved
+// templates store it) can pass it along to skip compiling altogether.
+
+const DEFAULT_MAX_ENTRIES = 500;
+
+// cyrb53: fast 53-bit string hash (public domain, bryc)
+function cyrb53(str, seed = 0) {
+  let h1 = 0xdeadbeef ^ seed;
+  let h2 = 0x41c6ce57 ^ seed;
+  for (let i = 0; i < str.length; i++) {
+    const ch = str.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507);
+  h1 ^= Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507);
+  h2 ^= Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+}
+
+// LRU of compiled render functions; a Map iterates in insertion order
+class TemplateCache {
+  constructor(compile, load, maxEntries = DEFAULT_MAX_ENTRIES) {
+    this.compile = compile;
+    this.load = load;
+    this.maxEntries = maxEntries;
+    this.entries = new Map();
+  }
+
+  get(source, code) {
+    const key = cyrb53(source);
+    const entry = this.entries.get(key);
+    if (entry !== undefined) {
+      this.entries.delete(key);
+      // The source comparison guards against the odd hash collision
+      if (entry.source === source) {
+        this.entries.set(key, entry);
+        return entry.render;
+      }
+    }
+
+    const render = code ? this.load(code) : this.compile(source);
+    this.entries.set(key, { source, render });
+    if (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+    return render;
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+}
+
+// Helpers available to generated code as `__rt`
+const runtime = {
+  // One failing expression renders as `fallback` instead of failing the template
+  attempt(fn, fallback, label) {
+    try {
+      return fn();
+    } catch (e) {
+      console.warn(`Error evaluating: ${label}`, e);
+      return fallback;
+    }
+  },
+};
+
+// Turn the body of a generated function into a render function. Template
+// expressions see the context's keys as variables through `with`; `helpers`
+// extends the runtime for converter-specific generated code.
+function createRender(body, helpers = {}) {
+  const fn = new Function('__ctx', '__rt', `with (__ctx) {\n${body}\n}`);
+  const rt = { ...runtime, ...helpers };
+  return (context = {}) => fn(context || {}, rt);
+}
+
+// Whether `code` parses as an expression; failures are reported once, at compile time
+function isValidExpression(code, label) {
+  try {
+    new Function('__ctx', '__rt', `with (__ctx) { return (${code}); }`);
+    return true;
+  } catch (e) {
+    console.warn(`Error compiling: ${label}`, e);
+    return false;
+  }
+}
+
+// Code for one guarded expression; one that doesn't parse renders as
+// `fallback` from then on
+function guardedExpression(code, fallback, label) {
+  const fallbackCode = JSON.stringify(fallback);
+  if (!isValidExpression(code, label)) {
+    return fallbackCode;
+  }
+  return `__rt.attempt(() => (${code}), ${fallbackCode}, ${JSON.stringify(label)})`;
+}
+
+module.exports = { TemplateCache, cyrb53, createRender, guardedExpression, isValidExpression, runtime };
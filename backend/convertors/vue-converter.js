@@ -1,4 +1,5 @@
 const fs = require('fs');
+const { TemplateCache, createRender, guardedExpression, isValidExpression } = require('./template-cache');
 
 // Simple Vue template to HTML converter
 function vueToHtml(vueTemplate, context = {}) {
@@ -27,148 +28,463 @@ function vueToHtml(vueTemplate, context = {}) {
   return html;
 }
 
-// Enhanced version that handles more complex Vue template expressions
-function advancedVueToHtml(vueTemplate, context = {}) {
-  // Pre-process common Vue patterns
-  let processed = vueTemplate;
-  
-  // Handle v-for directive: <li v-for="item in items">{{ item }}</li>
-  processed = processed.replace(
-    /<(\w+)([^>]*?)\s+v-for\s*=\s*["']([^"']+)\s+in\s+([^"']+)["']([^>]*?)>([\s\S]*?)<\/\1>/g,
-    (match, tagName, beforeAttrs, itemVar, arrayExpr, afterAttrs, content) => {
-      try {
-        // Get the array from context
-        const getArrayFunc = new Function(...Object.keys(context), `return ${arrayExpr.trim()};`);
-        const array = getArrayFunc(...Object.values(context));
-        
-        if (!Array.isArray(array)) return '';
-        
-        return array.map(item => {
-          // Create a new context that includes the loop variable
-          const loopContext = { ...context, [itemVar.trim()]: item };
-          
-          // Process the content with the loop context
-          let itemContent = content;
-          itemContent = itemContent.replace(/\{\{\s*([^}]+)\s*\}\}/g, (innerMatch, expr) => {
-            try {
-              const evalFunc = new Function(...Object.keys(loopContext), `return ${expr.trim()};`);
-              return evalFunc(...Object.values(loopContext));
-            } catch (e) {
-              console.warn('Error in loop expression:', expr, e);
-              return '';
-            }
-          });
-          
-          return `<${tagName}${beforeAttrs}${afterAttrs}>${itemContent}</${tagName}>`;
-        }).join('');
-      } catch (e) {
-        console.warn(`Error in v-for operation: ${match}`, e);
-        return '';
+// Template compiler: the template is parsed in a single left-to-right pass
+// into a tree of text, interpolation and element nodes, with directives
+// pulled out of the attributes. The tree is then turned into the body of one
+// render function. Both steps are linear in the size of the template.
+
+const VOID_ELEMENTS = new Set([
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+  'link', 'meta', 'param', 'source', 'track', 'wbr',
+]);
+// Elements whose content is not markup
+const RAW_TEXT_ELEMENTS = new Set(['script', 'style', 'textarea', 'title']);
+
+const TAG_NAME = /[A-Za-z][\w:.-]*/y;
+const ATTR_NAME = /[^\s"'>\/=]+/y;
+const WHITESPACE = /\s*/y;
+const UNQUOTED_VALUE = /[^\s>]*/y;
+const V_FOR = /^\s*(?:\(([^)]*)\)|([\s\S]+?))\s+(?:in|of)\s+([\s\S]+?)\s*$/;
+
+function matchAt(pattern, source, index) {
+  pattern.lastIndex = index;
+  const match = pattern.exec(source);
+  return match ? match[0] : '';
+}
+
+// Sort an element's attributes into static attributes, bindings and directives
+function readDirectives(element) {
+  for (const attr of element.rawAttrs) {
+    const { name, value } = attr;
+    if (name === 'v-for') {
+      const match = V_FOR.exec(value || '');
+      if (match) {
+        element.for = { params: (match[1] !== undefined ? match[1] : match[2]).trim(), source: match[3], label: `v-for="${value}"` };
+      } else {
+        console.warn(`Invalid v-for expression: ${value}`);
       }
+    } else if (name === 'v-if') {
+      element.if = value;
+    } else if (name === 'v-else-if') {
+      element.elseIf = value;
+    } else if (name === 'v-else') {
+      element.else = true;
+    } else if (name === 'v-show') {
+      element.show = value;
+    } else if (name === 'v-html' || name === 'v-text') {
+      element[name === 'v-html' ? 'html' : 'text'] = value;
+    } else if (name.startsWith(':') || name.startsWith('v-bind:')) {
+      element.bindings.push({ name: name.slice(name.indexOf(':') + 1), expr: value });
+    } else if (name.startsWith('v-') || name.startsWith('@') || name.startsWith('#')) {
+      // Event handlers, slots and other directives have no meaning in a static render
+    } else {
+      element.attrs.push(attr);
     }
-  );
-  
-  // Handle v-if directive: <div v-if="condition">content</div>
-  processed = processed.replace(
-    /<(\w+)([^>]*?)\s+v-if\s*=\s*["']([^"']+)["']([^>]*?)>([\s\S]*?)<\/\1>/g,
-    (match, tagName, beforeAttrs, condition, afterAttrs, content) => {
-      try {
-        const func = new Function(...Object.keys(context), `
-          return (${condition.trim()}) ? \`<${tagName}${beforeAttrs}${afterAttrs}>${content}</${tagName}>\` : '';
-        `);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in v-if: ${match}`, e);
-        return '';
-      }
+  }
+  delete element.rawAttrs;
+}
+
+function parseTemplate(source) {
+  const root = { type: 'root', children: [] };
+  const stack = [root];
+  const current = () => stack[stack.length - 1];
+  let text = '';
+  let i = 0;
+
+  const flushText = () => {
+    if (text) {
+      current().children.push({ type: 'text', value: text });
+      text = '';
     }
-  );
-  
-  // Handle v-show directive: <div v-show="condition">content</div>
-  processed = processed.replace(
-    /<(\w+)([^>]*?)\s+v-show\s*=\s*["']([^"']+)["']([^>]*?)>([\s\S]*?)<\/\1>/g,
-    (match, tagName, beforeAttrs, condition, afterAttrs, content) => {
-      try {
-        const func = new Function(...Object.keys(context), `
-          const shouldShow = ${condition.trim()};
-          const style = shouldShow ? '' : ' style="display: none;"';
-          return \`<${tagName}${beforeAttrs}${afterAttrs}\${style}>${content}</${tagName}>\`;
-        `);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in v-show: ${match}`, e);
-        return '';
+  };
+
+  while (i < source.length) {
+    const ch = source[i];
+
+    // Interpolation; its expression may contain '<' or '>'
+    if (ch === '{' && source[i + 1] === '{') {
+      const end = source.indexOf('}}', i + 2);
+      if (end !== -1) {
+        flushText();
+        current().children.push({ type: 'interpolation', expr: source.slice(i + 2, end).trim() });
+        i = end + 2;
+        continue;
       }
     }
-  );
-  
-  // Handle v-bind:class or :class directive
-  processed = processed.replace(
-    /\s+(?:v-bind:class|:class)\s*=\s*["']([^"']+)["']/g,
-    (match, classExpr) => {
-      try {
-        const func = new Function(...Object.keys(context), `
-          const result = ${classExpr.trim()};
-          if (typeof result === 'object' && result !== null) {
-            // Handle object syntax: { 'class-name': condition }
-            return ' class="' + Object.keys(result).filter(key => result[key]).join(' ') + '"';
-          } else if (Array.isArray(result)) {
-            // Handle array syntax: ['class1', 'class2']
-            return ' class="' + result.join(' ') + '"';
+
+    if (ch === '<') {
+      // Comments and doctypes are copied through as text
+      if (source.startsWith('<!--', i)) {
+        const end = source.indexOf('-->', i + 4);
+        const stop = end === -1 ? source.length : end + 3;
+        text += source.slice(i, stop);
+        i = stop;
+        continue;
+      }
+      if (source[i + 1] === '!') {
+        const end = source.indexOf('>', i);
+        const stop = end === -1 ? source.length : end + 1;
+        text += source.slice(i, stop);
+        i = stop;
+        continue;
+      }
+
+      // Closing tag: closes the nearest open element of that name
+      if (source[i + 1] === '/') {
+        const name = matchAt(TAG_NAME, source, i + 2);
+        const end = source.indexOf('>', i);
+        if (name && end !== -1) {
+          const tag = name.toLowerCase();
+          let depth = stack.length - 1;
+          while (depth > 0 && stack[depth].tag !== tag) depth--;
+          if (depth > 0) {
+            flushText();
+            stack.length = depth;
           } else {
-            // Handle string
-            return ' class="' + result + '"';
+            // Stray closing tag, kept as written
+            text += source.slice(i, end + 1);
           }
-        `);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in :class binding: ${match}`, e);
-        return ' class=""';
+          i = end + 1;
+          continue;
+        }
       }
-    }
-  );
-  
-  // Handle v-bind:style or :style directive
-  processed = processed.replace(
-    /\s+(?:v-bind:style|:style)\s*=\s*["']([^"']+)["']/g,
-    (match, styleExpr) => {
-      try {
-        const func = new Function(...Object.keys(context), `
-          const result = ${styleExpr.trim()};
-          if (typeof result === 'object' && result !== null) {
-            // Handle object syntax: { 'color': 'red', 'font-size': '14px' }
-            return ' style="' + Object.keys(result).map(key => 
-              key.replace(/([A-Z])/g, '-$1').toLowerCase() + ': ' + result[key]
-            ).join('; ') + '"';
+
+      // Opening tag
+      const name = matchAt(TAG_NAME, source, i + 1);
+      if (name) {
+        const element = {
+          type: 'element',
+          tag: name.toLowerCase(),
+          name,
+          rawAttrs: [],
+          attrs: [],
+          bindings: [],
+          children: [],
+        };
+        let j = i + 1 + name.length;
+        let selfClosing = false;
+        while (j < source.length) {
+          j += matchAt(WHITESPACE, source, j).length;
+          if (source[j] === '>') { j++; break; }
+          if (source.startsWith('/>', j)) { selfClosing = true; j += 2; break; }
+          const attrName = matchAt(ATTR_NAME, source, j) || source[j];
+          j += attrName.length;
+          j += matchAt(WHITESPACE, source, j).length;
+          if (source[j] !== '=') {
+            element.rawAttrs.push({ name: attrName, value: null, quote: '' });
+            continue;
+          }
+          j += 1;
+          j += matchAt(WHITESPACE, source, j).length;
+          const quote = source[j] === '"' || source[j] === "'" ? source[j] : '';
+          let value;
+          if (quote) {
+            const end = source.indexOf(quote, j + 1);
+            const stop = end === -1 ? source.length : end;
+            value = source.slice(j + 1, stop);
+            j = stop + 1;
           } else {
-            // Handle string
-            return ' style="' + result + '"';
+            value = matchAt(UNQUOTED_VALUE, source, j);
+            j += value.length;
           }
-        `);
-        return func(...Object.values(context));
-      } catch (e) {
-        console.warn(`Error in :style binding: ${match}`, e);
-        return ' style=""';
+          element.rawAttrs.push({ name: attrName, value, quote });
+        }
+
+        flushText();
+        readDirectives(element);
+        current().children.push(element);
+        i = j;
+
+        if (selfClosing || VOID_ELEMENTS.has(element.tag)) {
+          element.selfClosing = true;
+          continue;
+        }
+        if (RAW_TEXT_ELEMENTS.has(element.tag)) {
+          const close = source.toLowerCase().indexOf(`</${element.tag}`, i);
+          const stop = close === -1 ? source.length : close;
+          if (stop > i) {
+            element.children.push({ type: 'text', value: source.slice(i, stop) });
+          }
+          const end = close === -1 ? source.length : source.indexOf('>', close);
+          i = end === -1 ? source.length : end + 1;
+          continue;
+        }
+        stack.push(element);
+        continue;
       }
     }
-  );
-  
-  // Handle remaining Vue interpolations {{ expression }}
-  processed = processed.replace(/\{\{\s*([^}]+)\s*\}\}/g, (match, expr) => {
-    try {
-      const func = new Function(...Object.keys(context), `return ${expr.trim()}`);
-      const result = func(...Object.values(context));
-      return result !== undefined ? result : '';
-    } catch (e) {
-      console.warn(`Error evaluating: ${expr}`, e);
-      return '';
+
+    text += ch;
+    i++;
+  }
+
+  flushText();
+  return root.children;
+}
+
+// Collects generated statements, merging runs of static markup into one append
+class CodeBuilder {
+  constructor() {
+    this.code = '';
+    this.pending = '';
+  }
+
+  markup(text) {
+    this.pending += text;
+  }
+
+  append(expression) {
+    this.flush();
+    this.code += `__out += ${expression};\n`;
+  }
+
+  statement(code) {
+    this.flush();
+    this.code += code;
+  }
+
+  flush() {
+    if (this.pending) {
+      this.code += `__out += ${JSON.stringify(this.pending)};\n`;
+      this.pending = '';
+    }
+  }
+
+  toString() {
+    this.flush();
+    return this.code;
+  }
+}
+
+const isBlank = (node) => node.type === 'text' && !node.value.trim();
+
+function genChildren(children, out) {
+  for (let i = 0; i < children.length; i++) {
+    const node = children[i];
+
+    if (node.type === 'element' && node.if !== undefined && !node.for) {
+      // Gather the v-else-if/v-else siblings; whitespace between branches is dropped
+      const branches = [node];
+      let last = i;
+      for (let j = i + 1; j < children.length; j++) {
+        const next = children[j];
+        if (isBlank(next)) continue;
+        if (next.type !== 'element' || next.for || (next.elseIf === undefined && !next.else)) break;
+        branches.push(next);
+        last = j;
+        if (next.else) break;
+      }
+      genIfChain(branches, out);
+      i = last;
+      continue;
+    }
+
+    genNode(node, out);
+  }
+}
+
+function genIfChain(branches, out) {
+  let code = '';
+  branches.forEach((branch, index) => {
+    const body = new CodeBuilder();
+    genElement(branch, body);
+    if (index === 0) {
+      code += `if (${guardedExpression(branch.if, false, `v-if="${branch.if}"`)}) {\n${body}}`;
+    } else if (branch.else) {
+      code += ` else {\n${body}}`;
+    } else {
+      code += ` else if (${guardedExpression(branch.elseIf, false, `v-else-if="${branch.elseIf}"`)}) {\n${body}}`;
     }
   });
-  
-  // Clean up any remaining Vue directives that weren't handled
-  processed = processed.replace(/\s+v-[a-zA-Z-]+\s*=\s*["'][^"']*["']/g, '');
-  
-  return processed;
+  out.statement(code + '\n');
+}
+
+function genNode(node, out) {
+  if (node.type === 'text') {
+    out.markup(node.value);
+  } else if (node.type === 'interpolation') {
+    out.append(`__rt.display(${guardedExpression(node.expr, '', node.expr)})`);
+  } else if (node.for) {
+    genFor(node, out);
+  } else if (node.if !== undefined) {
+    genIfChain([node], out);
+  } else {
+    genElement(node, out);
+  }
+}
+
+// v-for wraps the element (and its own v-if) in a loop, so the loop
+// variables are in scope for everything on and inside the element
+function genFor(node, out) {
+  const { params, source, label } = node.for;
+  if (!isValidExpression(source, label) || !isValidExpression(`(${params}) => 0`, label)) {
+    return;
+  }
+
+  const body = new CodeBuilder();
+  if (node.if !== undefined) {
+    genIfChain([node], body);
+  } else {
+    genElement(node, body);
+  }
+  out.append(`__rt.attempt(() => __rt.each(${source}, (${params}) => {\nlet __out = '';\n${body}return __out;\n}), '', ${JSON.stringify(label)})`);
+}
+
+function genElement(node, out) {
+  // <template> only groups its children
+  if (node.tag !== 'template') {
+    genOpeningTag(node, out);
+  }
+
+  if (node.html !== undefined) {
+    out.append(`__rt.display(${guardedExpression(node.html, '', `v-html="${node.html}"`)})`);
+  } else if (node.text !== undefined) {
+    out.append(`__rt.escapeHtml(${guardedExpression(node.text, '', `v-text="${node.text}"`)})`);
+  } else {
+    genChildren(node.children, out);
+  }
+
+  if (node.tag !== 'template' && !VOID_ELEMENTS.has(node.tag)) {
+    out.markup(`</${node.name}>`);
+  }
+}
+
+function genOpeningTag(node, out) {
+  out.markup(`<${node.name}`);
+
+  const classBinding = node.bindings.find((binding) => binding.name === 'class');
+  const styleBinding = node.bindings.find((binding) => binding.name === 'style');
+  const mergeClass = classBinding !== undefined;
+  const mergeStyle = styleBinding !== undefined || node.show !== undefined;
+  let staticClass = '';
+  let staticStyle = '';
+
+  for (const attr of node.attrs) {
+    if (mergeClass && attr.name === 'class') {
+      staticClass = attr.value || '';
+    } else if (mergeStyle && attr.name === 'style') {
+      staticStyle = attr.value || '';
+    } else if (attr.value === null) {
+      out.markup(` ${attr.name}`);
+    } else {
+      out.markup(` ${attr.name}=${attr.quote}${attr.value}${attr.quote}`);
+    }
+  }
+
+  if (mergeClass) {
+    const value = guardedExpression(classBinding.expr, null, `:class="${classBinding.expr}"`);
+    out.append(`__rt.classAttr(${JSON.stringify(staticClass)}, ${value})`);
+  }
+  if (mergeStyle) {
+    const value = styleBinding ? guardedExpression(styleBinding.expr, null, `:style="${styleBinding.expr}"`) : 'null';
+    const shown = node.show !== undefined ? guardedExpression(node.show, true, `v-show="${node.show}"`) : 'true';
+    out.append(`__rt.styleAttr(${JSON.stringify(staticStyle)}, ${value}, ${shown})`);
+  }
+  for (const binding of node.bindings) {
+    if (binding.name === 'class' || binding.name === 'style') continue;
+    const value = guardedExpression(binding.expr, null, `:${binding.name}="${binding.expr}"`);
+    out.append(`__rt.attr(${JSON.stringify(binding.name)}, ${value})`);
+  }
+
+  out.markup('>');
+}
+
+const escapeAttr = (value) => String(value).replace(/&/g, '&amp;').replace(/"/g, '&quot;');
+
+function normalizeClass(value) {
+  if (Array.isArray(value)) {
+    return value.map(normalizeClass).filter(Boolean).join(' ');
+  }
+  if (value && typeof value === 'object') {
+    return Object.keys(value).filter((key) => value[key]).join(' ');
+  }
+  return value === null || value === undefined || value === false ? '' : String(value);
+}
+
+function normalizeStyle(value) {
+  if (Array.isArray(value)) {
+    return value.map(normalizeStyle).filter(Boolean).join('; ');
+  }
+  if (value && typeof value === 'object') {
+    return Object.keys(value)
+      .filter((key) => value[key] !== null && value[key] !== undefined && value[key] !== '')
+      .map((key) => key.replace(/([A-Z])/g, '-$1').toLowerCase() + ': ' + value[key])
+      .join('; ');
+  }
+  return value === null || value === undefined || value === false ? '' : String(value).trim().replace(/;$/, '');
+}
+
+// Helpers called by the generated render functions
+const vueRuntime = {
+  display(value) {
+    return value === null || value === undefined ? '' : value;
+  },
+
+  escapeHtml(value) {
+    return value === null || value === undefined
+      ? ''
+      : String(value).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+  },
+
+  // v-for over arrays, strings, other iterables, numbers (1..n) and plain objects
+  each(source, render) {
+    let out = '';
+    if (Array.isArray(source) || typeof source === 'string') {
+      for (let i = 0; i < source.length; i++) out += render(source[i], i);
+    } else if (typeof source === 'number') {
+      for (let i = 0; i < source; i++) out += render(i + 1, i);
+    } else if (source && typeof source[Symbol.iterator] === 'function') {
+      let i = 0;
+      for (const item of source) out += render(item, i++);
+    } else if (source && typeof source === 'object') {
+      Object.keys(source).forEach((key, i) => {
+        out += render(source[key], key, i);
+      });
+    }
+    return out;
+  },
+
+  classAttr(staticClass, value) {
+    const merged = [staticClass.trim(), normalizeClass(value)].filter(Boolean).join(' ');
+    return merged ? ` class="${escapeAttr(merged)}"` : '';
+  },
+
+  styleAttr(staticStyle, value, shown) {
+    const parts = [normalizeStyle(staticStyle), normalizeStyle(value)];
+    if (!shown) parts.push('display: none');
+    const merged = parts.filter(Boolean).join('; ');
+    return merged ? ` style="${escapeAttr(merged)};"` : '';
+  },
+
+  attr(name, value) {
+    if (value === null || value === undefined || value === false) return '';
+    return value === true ? ` ${name}` : ` ${name}="${escapeAttr(value)}"`;
+  },
+};
+
+// Generate the body of a Vue template's render function
+function generateVue(vueTemplate) {
+  const out = new CodeBuilder();
+  genChildren(parseTemplate(vueTemplate), out);
+  return `let __out = '';\n${out}return __out;`;
+}
+
+// Render function from code generated by generateVue
+function loadVue(code) {
+  return createRender(code, vueRuntime);
+}
+
+function compileVue(vueTemplate) {
+  return loadVue(generateVue(vueTemplate));
+}
+
+const templateCache = new TemplateCache(compileVue, loadVue);
+
+// Enhanced version that handles more complex Vue template expressions. The
+// template is compiled on first use, or loaded from `compiled`, its
+// generateVue output; later calls only run the cached render function.
+function advancedVueToHtml(vueTemplate, context = {}, compiled = null) {
+  return templateCache.get(vueTemplate, compiled)(context);
 }
 
 // CLI interface
@@ -180,17 +496,21 @@ if (require.main === module) {
     process.exit(0);
   }
   
-  if (args.length < 2) {
-    console.log('Usage: node vue-converter.js <vue-template-string> <context-json>');
+  // The request is read from stdin, so large templates and datasets
+  // aren't limited by the size of the argument list
+  const input = process.stdin.isTTY ? '' : fs.readFileSync(0, 'utf8');
+  
+  if (!input.trim()) {
+    console.log('Usage: node vue-converter.js < request.json');
     console.log('       node vue-converter.js test');
-    console.log('Example: node vue-converter.js "<div>{{ name }}</div>" \'{"name":"John"}\'');
+    console.log('Request: {"template": "<vue-template-string>", "context": {...}}');
+    console.log('Example: echo \'{"template":"<div>{{ name }}</div>","context":{"name":"John"}}\' | node vue-converter.js');
     process.exit(1);
   }
   
-  const vueTemplate = args[0];
-  const context = JSON.parse(args[1] || '{}');
+  const request = JSON.parse(input);
   
-  const html = advancedVueToHtml(vueTemplate, context);
+  const html = advancedVueToHtml(request.template, request.context || {});
   console.log(html);
 }
 
@@ -266,4 +586,4 @@ function test() {
 
 // Test function is now accessible via the CLI
 
-module.exports = { vueToHtml, advancedVueToHtml };
+module.exports = { vueToHtml, advancedVueToHtml, compileVue, generateVue };
@@ -1,78 +1,115 @@
-import subprocess
-import json
-import os
-from pathlib import Path
+from .daemon import ConverterError, ConverterPool, converter_pool, mako_pool
 
 
 class JSXConverter:
-    def __init__(self, node_script_path="convertors/jsx-converter.js"):
-        self.node_script_path = node_script_path
-        
-    def convert(self, jsx_string:str, context:dict=None):
+    def __init__(self, pool: ConverterPool = None):
+        self.pool = pool or converter_pool
+
+    def convert(self, jsx_string:str, context:dict=None, compiled:str=None):
         """
-        Convert JSX string to HTML using Node.js
-        
+        Convert JSX string to HTML using the Node.js converter pool
+
         Args:
             jsx_string (str): JSX template string
             context (dict): Variables to pass to the JSX template
-            
+            compiled (str): Render code from an earlier analyze of the same template
+
         Returns:
             str: Converted HTML string
         """
-        if context is None:
-            context = {}
-            
         try:
-            context_json = json.dumps(context)
-            
-            # Call Node.js script
-            result = subprocess.run([
-                'node', 
-                self.node_script_path, 
-                jsx_string,
-                context_json
-            ], capture_output=True, text=True, check=True)
-            
-            return result.stdout.strip()
-            
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"JSX conversion failed: {e.stderr}")
-        except FileNotFoundError:
-            raise Exception("Node.js not found. Please install Node.js")
+            return self.pool.convert("jsx", jsx_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"JSX conversion failed: {e}")
+
+    async def aconvert(self, jsx_string:str, context:dict=None, compiled:str=None):
+        """Like convert, without blocking the event loop"""
+        try:
+            return await self.pool.aconvert("jsx", jsx_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"JSX conversion failed: {e}")
+
+    async def aanalyze(self, jsx_string:str) -> dict:
+        """Compile the template, returning its render code and the data paths it requires"""
+        try:
+            return await self.pool.aanalyze("jsx", jsx_string)
+        except ConverterError as e:
+            raise Exception(f"JSX compilation failed: {e}")
 
 
 class VueConverter:
-    def __init__(self, node_script_path="convertors/vue-converter.js"):
-        self.node_script_path = node_script_path
-        
-    def convert(self, vue_string:str, context:dict=None):
+    def __init__(self, pool: ConverterPool = None):
+        self.pool = pool or converter_pool
+
+    def convert(self, vue_string:str, context:dict=None, compiled:str=None):
         """
-        Convert Vue string to HTML using Node.js
-        
+        Convert Vue string to HTML using the Node.js converter pool
+
         Args:
             vue_string (str): Vue template string
             context (dict): Variables to pass to the Vue template
-            
+            compiled (str): Render code from an earlier analyze of the same template
+
+        Returns:
+            str: Converted HTML string
+        """
+        try:
+            return self.pool.convert("vue", vue_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"Vue conversion failed: {e}")
+
+    async def aconvert(self, vue_string:str, context:dict=None, compiled:str=None):
+        """Like convert, without blocking the event loop"""
+        try:
+            return await self.pool.aconvert("vue", vue_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"Vue conversion failed: {e}")
+
+    async def aanalyze(self, vue_string:str) -> dict:
+        """Compile the template, returning its render code and the data paths it requires"""
+        try:
+            return await self.pool.aanalyze("vue", vue_string)
+        except ConverterError as e:
+            raise Exception(f"Vue compilation failed: {e}")
+
+
+class MakoConverter:
+    """
+    Render Mako templates in the sandboxed Mako daemon pool. Templates are
+    restricted to expressions, control lines and plain code blocks, and
+    expressions are HTML-escaped unless filtered with `| n`.
+    """
+
+    def __init__(self, pool: ConverterPool = None):
+        self.pool = pool or mako_pool
+
+    def convert(self, mako_string:str, context:dict=None, compiled:str=None):
+        """
+        Convert Mako string to HTML using the Mako daemon pool
+
+        Args:
+            mako_string (str): Mako template string
+            context (dict): Variables to pass to the Mako template
+            compiled (str): Module source from an earlier analyze of the same template
+
         Returns:
             str: Converted HTML string
         """
-        if context is None:
-            context = {}
-            
         try:
-            context_json = json.dumps(context)
-            
-            # Call Node.js script
-            result = subprocess.run([
-                'node', 
-                self.node_script_path, 
-                vue_string,
-                context_json
-            ], capture_output=True, text=True, check=True)
-            
-            return result.stdout.strip()
-            
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Vue conversion failed: {e.stderr}")
-        except FileNotFoundError:
-            raise Exception("Node.js not found. Please install Node.js")
+            return self.pool.convert("mako", mako_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"Mako conversion failed: {e}")
+
+    async def aconvert(self, mako_string:str, context:dict=None, compiled:str=None):
+        """Like convert, without blocking the event loop"""
+        try:
+            return await self.pool.aconvert("mako", mako_string, context, compiled)
+        except ConverterError as e:
+            raise Exception(f"Mako conversion failed: {e}")
+
+    async def aanalyze(self, mako_string:str) -> dict:
+        """Compile the template, returning its module source and the names it reads from the context"""
+        try:
+            return await self.pool.aanalyze("mako", mako_string)
+        except ConverterError as e:
+            raise Exception(f"Mako compilation failed: {e}")
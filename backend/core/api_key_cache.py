@@ -0,0 +1,140 @@
+"""
+Validated API keys cached per process, with write-behind last_used updates
+
+A key that authenticated recently is trusted from memory for a short TTL
+instead of being looked up with its user on every request. Its last_used
+timestamp is buffered and written for all keys in one batch every few
+seconds. Editing or deleting a key, or updating its user, drops the cached
+entries in every worker.
+"""
+import asyncio
+import hashlib
+import itertools
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+
+import models
+from core.cache import TTLCache
+from core.config import API_KEY_CACHE_MAX_ENTRIES, API_KEY_CACHE_TTL, API_KEY_LAST_USED_FLUSH_INTERVAL
+from core.database import async_session
+from core.pubsub import pubsub
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "api_keys"
+
+
+class CachedApiKey:
+    """An API key that validated, and its active user"""
+
+    __slots__ = ("api_key_id", "expires_at", "user")
+
+    def __init__(self, api_key_id: int, expires_at: Optional[datetime], user: models.User):
+        self.api_key_id = api_key_id
+        self.expires_at = expires_at
+        self.user = user
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at < datetime.now()
+
+
+def _digest(key: str) -> str:
+    # Entries and revocation messages never carry the key itself
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ApiKeyCache:
+    def __init__(
+        self,
+        ttl: float = API_KEY_CACHE_TTL,
+        max_entries: int = API_KEY_CACHE_MAX_ENTRIES,
+        flush_interval: float = API_KEY_LAST_USED_FLUSH_INTERVAL,
+    ):
+        self.enabled = ttl > 0
+        self._entries = TTLCache(ttl, max_entries=max_entries)
+        self._flush_interval = flush_interval
+        # api key id -> latest use not yet written
+        self._last_used: Dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Bumped on every revocation, so a key read before one isn't cached after it
+        self._generations = itertools.count()
+        self.generation = next(self._generations)
+        pubsub.subscribe(CHANNEL, self._on_revoke)
+
+    def get(self, key: str) -> Optional[CachedApiKey]:
+        return self._entries.get(_digest(key))
+
+    def set(self, key: str, entry: CachedApiKey, generation: int):
+        """Cache a validated key, unless a revocation happened since `generation` was read"""
+        if self.enabled and generation == self.generation:
+            self._entries.set(_digest(key), entry)
+
+    def revoke_key(self, key: str):
+        pubsub.publish(CHANNEL, {"key": _digest(key)})
+
+    def revoke_user(self, user_id: int):
+        pubsub.publish(CHANNEL, {"user_id": user_id})
+
+    def _on_revoke(self, message: dict):
+        self.generation = next(self._generations)
+        if message.get("key"):
+            self._entries.pop(message["key"])
+        if message.get("user_id") is not None:
+            for digest in self._entries.keys():
+                entry = self._entries.get(digest)
+                if entry is not None and entry.user.id == message["user_id"]:
+                    self._entries.pop(digest)
+
+    def touch(self, api_key_id: int):
+        """Record a use of the key; written on the next flush"""
+        self._last_used[api_key_id] = datetime.now()
+
+    async def flush(self):
+        pending, self._last_used = self._last_used, {}
+        if not pending:
+            return
+        try:
+            async with async_session() as db:
+                # A plain executemany: keys deleted in the meantime just match no row
+                api_keys = models.ApiKey.__table__
+                await db.execute(
+                    update(api_keys)
+                    .where(api_keys.c.id == bindparam("api_key_id"))
+                    .values(last_used=bindparam("last_used")),
+                    [{"api_key_id": api_key_id, "last_used": last_used} for api_key_id, last_used in pending.items()]
+                )
+                await db.commit()
+        except Exception:
+            # Keep the timestamps for the next attempt, unless the key was used again since
+            for api_key_id, last_used in pending.items():
+                self._last_used.setdefault(api_key_id, last_used)
+            raise
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write API key last_used timestamps")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+api_key_cache = ApiKeyCache()
@@ -1,20 +1,24 @@
 """
 Core authentication and user management
 """
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import Depends, Request, Response
-from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin
+import jwt
+from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin, exceptions
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import User
 from .database import get_db
 from .config import SECRET_KEY
+from .api_key_cache import api_key_cache
+from .user_cache import user_cache
 from schemas import UserCreate
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
@@ -36,6 +40,18 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
         self, user: User, token: str, request: Optional[Request] = None
     ):
         print(f"Verification requested for user {user.id}. Verification token: {token}")
+
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None):
+        # A deactivated user's API keys and sessions must stop working right away
+        api_key_cache.revoke_user(user.id)
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        user_cache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        api_key_cache.revoke_user(user.id)
+        user_cache.invalidate(user.id)
     
 async def get_user_db(session = Depends(get_db)):
     yield SQLAlchemyUserDatabase(session, User)
@@ -43,9 +59,38 @@ async def get_user_db(session = Depends(get_db)):
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
     yield UserManager(user_db)
 
+class CachedJWTStrategy(JWTStrategy):
+    """JWTStrategy that reuses recently resolved users instead of fetching them per request"""
+
+    async def read_token(self, token: Optional[str], user_manager: UserManager) -> Optional[User]:
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+            parsed_id = user_manager.parse_id(user_id)
+        except (jwt.PyJWTError, exceptions.InvalidID):
+            return None
+
+        session = user_manager.user_db.session
+        user = await user_cache.get(session, parsed_id)
+        if user is not None:
+            return user
+
+        generation = user_cache.generation
+        try:
+            user = await user_manager.get(parsed_id)
+        except exceptions.UserNotExists:
+            return None
+        user_cache.set(user, generation)
+        return user
+
 # JWT Strategy
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=SECRET_KEY, lifetime_seconds=3600)
 
 # Authentication backend
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
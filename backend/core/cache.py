@@ -0,0 +1,122 @@
+"""
+In-process caching helpers
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used mapping bounded by entry count and/or total size"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._sizeof = sizeof
+        # key -> (value, size)
+        self._data: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        size = self._sizeof(value) if self.max_size is not None else 0
+        with self._lock:
+            self._remove(key)
+            # A value larger than the whole cache would only evict everything else
+            if self.max_size is not None and size > self.max_size:
+                return
+            self._data[key] = (value, size)
+            self._size += size
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data.keys())
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _remove(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+        return entry
+
+    def _evict(self):
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_size is not None and self._size > self.max_size)
+        ):
+            self._remove(next(iter(self._data)))
+
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire `ttl` seconds after they were set"""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: Optional[int] = None,
+        max_size: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        # Entries are stored as (value, expires_at)
+        super().__init__(max_entries, max_size, lambda entry: sizeof(entry[0]))
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry[0]
+            if now >= expires_at:
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        super().set(key, (value, time.monotonic() + self.ttl))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = super().pop(key)
+        return default if entry is None else entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
@@ -6,6 +6,18 @@ from typing import Optional
 
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+# Connection pool (server databases such as Postgres)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced; -1 disables
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))  # asyncpg prepared statements per connection; 0 behind pgbouncer
+# SQLite pragmas applied to every connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256MB
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms a writer waits for the lock
 
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
@@ -13,6 +25,10 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 # CORS
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 
+# Dashboard sessions (JWT)
+JWT_USER_CACHE_TTL = float(os.getenv("JWT_USER_CACHE_TTL", "30"))  # seconds a token's user is reused without a lookup; 0 disables
+JWT_USER_CACHE_MAX_ENTRIES = int(os.getenv("JWT_USER_CACHE_MAX_ENTRIES", "10000"))
+
 # OAuth
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
@@ -21,7 +37,83 @@ GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8000/ap
 # API Keys
 API_KEY_LENGTH = 32
 API_KEY_EXPIRY_DAYS = 365  # Default expiry for API keys
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "30"))  # seconds a validated key is trusted without a lookup; 0 disables
+API_KEY_CACHE_MAX_ENTRIES = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "10000"))
+API_KEY_LAST_USED_FLUSH_INTERVAL = float(os.getenv("API_KEY_LAST_USED_FLUSH_INTERVAL", "5"))  # seconds between batched last_used writes
 
 # PDF Generation
-PLAYWRIGHT_TIMEOUT = 30000  # 30 seconds
+PLAYWRIGHT_TIMEOUT = int(os.getenv("PLAYWRIGHT_TIMEOUT", "30000"))  # 30 seconds
+# Per-engine fallback (ms) for the render readiness signal; the PDF is printed once it elapses
+RENDER_READY_TIMEOUTS = {
+    "html": int(os.getenv("RENDER_READY_TIMEOUT_HTML", str(PLAYWRIGHT_TIMEOUT))),
+    "jsx": int(os.getenv("RENDER_READY_TIMEOUT_JSX", str(PLAYWRIGHT_TIMEOUT))),
+    "vue": int(os.getenv("RENDER_READY_TIMEOUT_VUE", str(PLAYWRIGHT_TIMEOUT))),
+    "mako": int(os.getenv("RENDER_READY_TIMEOUT_MAKO", str(PLAYWRIGHT_TIMEOUT))),
+}
 MAX_PDF_SIZE = 50 * 1024 * 1024  # 50MB
+PDF_STREAM_CHUNK_SIZE = int(os.getenv("PDF_STREAM_CHUNK_SIZE", str(256 * 1024)))  # Bytes read from Chromium per chunk
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "10000"))
+TAILWIND_BROWSER_SCRIPT = os.getenv("TAILWIND_BROWSER_SCRIPT", "node_modules/@tailwindcss/browser/dist/index.global.js")
+
+# Browser pool
+PLAYWRIGHT_EAGER_START = os.getenv("PLAYWRIGHT_EAGER_START", "true").lower() == "true"  # Launch and warm up browsers at startup
+PLAYWRIGHT_BROWSER_COUNT = int(os.getenv("PLAYWRIGHT_BROWSER_COUNT", str(os.cpu_count() or 1)))  # Defaults to one per core
+
+# Browser supervision: a browser is drained and replaced once it crosses any of these
+PLAYWRIGHT_SUPERVISOR_INTERVAL = float(os.getenv("PLAYWRIGHT_SUPERVISOR_INTERVAL", "10"))  # seconds between health checks
+PLAYWRIGHT_BROWSER_MAX_RENDERS = int(os.getenv("PLAYWRIGHT_BROWSER_MAX_RENDERS", "5000"))  # 0 disables
+PLAYWRIGHT_BROWSER_MAX_RSS = int(os.getenv("PLAYWRIGHT_BROWSER_MAX_RSS", str(1024 * 1024 * 1024)))  # 1GB, 0 disables
+PLAYWRIGHT_BROWSER_MAX_ERROR_RATE = float(os.getenv("PLAYWRIGHT_BROWSER_MAX_ERROR_RATE", "0.5"))
+PLAYWRIGHT_BROWSER_ERROR_WINDOW = int(os.getenv("PLAYWRIGHT_BROWSER_ERROR_WINDOW", "50"))  # Renders the error rate is measured over
+PLAYWRIGHT_BROWSER_DRAIN_TIMEOUT = float(os.getenv("PLAYWRIGHT_BROWSER_DRAIN_TIMEOUT", "60"))  # seconds
+
+# Page pool (per browser)
+PLAYWRIGHT_PAGE_POOL_SIZE = int(os.getenv("PLAYWRIGHT_PAGE_POOL_SIZE", "4"))
+PLAYWRIGHT_PAGE_MAX_USES = int(os.getenv("PLAYWRIGHT_PAGE_MAX_USES", "200"))  # Recreate a page after this many renders
+PLAYWRIGHT_PAGE_CHECKOUT_TIMEOUT = float(os.getenv("PLAYWRIGHT_PAGE_CHECKOUT_TIMEOUT", "10"))  # seconds
+
+# Admission control: renders beyond these limits are rejected with a 503 and Retry-After.
+# Queued renders that can't start within PLAYWRIGHT_TIMEOUT are rejected too.
+RENDER_MAX_IN_FLIGHT = int(os.getenv("RENDER_MAX_IN_FLIGHT", str(PLAYWRIGHT_BROWSER_COUNT * PLAYWRIGHT_PAGE_POOL_SIZE)))
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", str(2 * PLAYWRIGHT_BROWSER_COUNT * PLAYWRIGHT_PAGE_POOL_SIZE)))
+RENDER_RETRY_AFTER = int(os.getenv("RENDER_RETRY_AFTER", "5"))  # seconds, sent in the Retry-After header
+
+# JSX/Vue converter processes (long-lived node daemons)
+CONVERTER_POOL_SIZE = int(os.getenv("CONVERTER_POOL_SIZE", str(os.cpu_count() or 1)))
+CONVERTER_TIMEOUT = float(os.getenv("CONVERTER_TIMEOUT", "10"))  # seconds per conversion before the process is killed
+BATCH_CONVERT_CONCURRENCY = int(os.getenv("BATCH_CONVERT_CONCURRENCY", str(CONVERTER_POOL_SIZE)))  # Rows a merged render converts at once
+# "node" converts JSX/Vue in the converter pool, "page" inside the Chromium page doing the render
+TEMPLATE_CONVERSION = os.getenv("TEMPLATE_CONVERSION", "node").lower()
+
+# Mako templates, rendered in sandboxed subprocesses that are killed after CONVERTER_TIMEOUT
+MAKO_POOL_SIZE = int(os.getenv("MAKO_POOL_SIZE", str(CONVERTER_POOL_SIZE)))
+MAKO_SANDBOX_MEMORY = int(os.getenv("MAKO_SANDBOX_MEMORY", str(512 * 1024 * 1024)))  # Address space per process; 0 for no limit
+MAKO_TEMPLATE_CACHE_SIZE = int(os.getenv("MAKO_TEMPLATE_CACHE_SIZE", "500"))  # Compiled templates kept in memory per process
+MAKO_MODULE_DIR = os.getenv("MAKO_MODULE_DIR", ".cache/mako")  # Compiled modules on disk; empty to disable
+
+# Rendered PDF cache
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "true").lower() == "true"
+PDF_CACHE_MEMORY_MAX_SIZE = int(os.getenv("PDF_CACHE_MEMORY_MAX_SIZE", str(256 * 1024 * 1024)))  # 256MB
+PDF_CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MEMORY_MAX_ENTRIES", "1000"))
+PDF_CACHE_MAX_ENTRY_SIZE = int(os.getenv("PDF_CACHE_MAX_ENTRY_SIZE", str(10 * 1024 * 1024)))  # Larger streamed PDFs are not cached
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", ".cache/pdf")  # Empty to disable the disk tier
+PDF_CACHE_DISK_MAX_SIZE = int(os.getenv("PDF_CACHE_DISK_MAX_SIZE", str(2 * 1024 * 1024 * 1024)))  # 2GB
+
+# Asynchronous render jobs
+RENDER_JOB_RESULT_DIR = os.getenv("RENDER_JOB_RESULT_DIR", "render_jobs")
+RENDER_JOB_WORKER_PROCESSES = int(os.getenv("RENDER_JOB_WORKER_PROCESSES", "1"))
+RENDER_JOB_WORKER_CONCURRENCY = int(os.getenv("RENDER_JOB_WORKER_CONCURRENCY", "4"))  # Jobs rendered at once per process
+RENDER_JOB_POLL_INTERVAL = float(os.getenv("RENDER_JOB_POLL_INTERVAL", "1"))  # seconds
+RENDER_JOB_STALE_AFTER = int(os.getenv("RENDER_JOB_STALE_AFTER", "600"))  # Running jobs older than this are requeued (seconds)
+RENDER_JOB_MAX_ATTEMPTS = int(os.getenv("RENDER_JOB_MAX_ATTEMPTS", "3"))
+RENDER_JOB_RETRY_DELAY = float(os.getenv("RENDER_JOB_RETRY_DELAY", "5"))  # Jobs shed under load are claimable again after this (seconds)
+RENDER_JOB_RETENTION = int(os.getenv("RENDER_JOB_RETENTION", str(24 * 60 * 60)))  # Finished jobs and their PDFs are deleted after this (seconds); 0 keeps them
+
+# Saved template rows cached per process, dropped on update/delete in every worker
+TEMPLATE_CACHE_TTL = float(os.getenv("TEMPLATE_CACHE_TTL", "60"))  # seconds, bounds staleness if an invalidation is missed; 0 disables
+TEMPLATE_CACHE_MAX_ENTRIES = int(os.getenv("TEMPLATE_CACHE_MAX_ENTRIES", "1000"))
+
+# Invalidation messages between the app's worker processes on this host (UDP multicast, never leaves the machine)
+PUBSUB_ENABLED = os.getenv("PUBSUB_ENABLED", "true").lower() == "true"
+PUBSUB_GROUP = os.getenv("PUBSUB_GROUP", "239.255.43.21")
+PUBSUB_PORT = int(os.getenv("PUBSUB_PORT", "48621"))
@@ -1,21 +1,71 @@
 """
 Database configuration and session management
 """
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import DATABASE_URL
+from .config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT,
+)
 
-# Convert SQLite URL to async format
+# Use the async driver for URLs that don't name one
 if DATABASE_URL.startswith("sqlite://"):
-    SQLALCHEMY_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://")
+    SQLALCHEMY_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+elif DATABASE_URL.startswith(("postgresql://", "postgres://")):
+    SQLALCHEMY_DATABASE_URL = "postgresql+asyncpg://" + DATABASE_URL.split("://", 1)[1]
 else:
     SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
+backend = make_url(SQLALCHEMY_DATABASE_URL).get_backend_name()
+
+
+def _engine_options() -> dict:
+    if backend == "sqlite":
+        # The connection is handed between threads by aiosqlite
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if make_url(SQLALCHEMY_DATABASE_URL).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            # SQLAlchemy's cache of prepared statements, and asyncpg's own
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
 # Create async engine
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+
+
+if backend == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the single writer; NORMAL sync is safe with WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.close()
+
 
 # Create async SessionLocal class
 async_session = sessionmaker(
@@ -0,0 +1,118 @@
+"""
+Best-effort pub/sub between the app's worker processes on one host
+
+Messages are small JSON datagrams sent to a UDP multicast group with a TTL
+of 0, so they never leave the machine. Every process that started the
+pubsub receives them, including the sender, which skips its own. Delivery
+isn't guaranteed; subscribers keep caches short-lived enough to tolerate a
+lost message.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import socket
+import struct
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from core.config import PUBSUB_ENABLED, PUBSUB_GROUP, PUBSUB_PORT
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], None]
+
+
+class _PubSubProtocol(asyncio.DatagramProtocol):
+    def __init__(self, pubsub: "PubSub"):
+        self._pubsub = pubsub
+
+    def datagram_received(self, data: bytes, addr):
+        self._pubsub._receive(data)
+
+
+class PubSub:
+    """Channels of JSON messages; handlers run on the event loop and must not block"""
+
+    def __init__(self, group: str = PUBSUB_GROUP, port: int = PUBSUB_PORT, enabled: bool = PUBSUB_ENABLED):
+        self.group = group
+        self.port = port
+        self.enabled = enabled
+        self._sender_id = secrets.token_hex(8)
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._send_socket: Optional[socket.socket] = None
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers[channel].append(handler)
+
+    def _listen_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Every worker process binds the same port
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("127.0.0.1"))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.setblocking(False)
+        return sock
+
+    def _publish_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton("127.0.0.1"))
+        sock.setblocking(False)
+        return sock
+
+    async def start(self):
+        if not self.enabled or self._transport is not None:
+            return
+        try:
+            listen_socket = self._listen_socket()
+            self._send_socket = self._publish_socket()
+        except OSError:
+            # Messages still reach this process's own subscribers
+            logger.warning("Pub/sub unavailable, invalidations stay local to this process", exc_info=True)
+            return
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: _PubSubProtocol(self), sock=listen_socket)
+
+    def publish(self, channel: str, message: dict):
+        """Deliver `message` to this process's subscribers now and to other processes' shortly"""
+        self._dispatch(channel, message)
+        if self._send_socket is None:
+            return
+        payload = json.dumps({"sender": self._sender_id, "channel": channel, "message": message})
+        try:
+            self._send_socket.sendto(payload.encode("utf-8"), (self.group, self.port))
+        except OSError:
+            logger.warning(f"Failed to publish to {channel}", exc_info=True)
+
+    def _receive(self, data: bytes):
+        try:
+            envelope = json.loads(data)
+        except ValueError:
+            return
+        if envelope.get("sender") == self._sender_id:
+            return
+        self._dispatch(envelope.get("channel"), envelope.get("message") or {})
+
+    def _dispatch(self, channel: str, message: dict):
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception(f"Pub/sub handler for {channel} failed")
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._send_socket is not None:
+            self._send_socket.close()
+            self._send_socket = None
+
+
+pubsub = PubSub()
@@ -0,0 +1,57 @@
+"""
+Users resolved from dashboard JWTs, cached per process
+
+The token itself is still verified on every request; only the user lookup
+behind it is skipped while the entry is fresh. Updating or deleting a user
+drops the entry in every worker.
+"""
+import itertools
+from typing import Optional
+
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import User
+from core.cache import TTLCache
+from core.config import JWT_USER_CACHE_MAX_ENTRIES, JWT_USER_CACHE_TTL
+from core.pubsub import pubsub
+
+CHANNEL = "users"
+
+
+class UserCache:
+    def __init__(self, ttl: float = JWT_USER_CACHE_TTL, max_entries: int = JWT_USER_CACHE_MAX_ENTRIES):
+        self.enabled = ttl > 0
+        self._entries = TTLCache(ttl, max_entries=max_entries)
+        # Bumped on every invalidation, so a user read before one isn't cached after it
+        self._generations = itertools.count()
+        self.generation = next(self._generations)
+        pubsub.subscribe(CHANNEL, self._on_invalidate)
+
+    async def get(self, session: AsyncSession, user_id: int) -> Optional[User]:
+        """The cached user as an instance of `session`, without querying the database"""
+        cached = self._entries.get(user_id)
+        if cached is None:
+            return None
+        try:
+            # Each request gets its own instance; the cached one is only ever read
+            return await session.merge(cached, load=False)
+        except InvalidRequestError:
+            # Modified since it was cached; the caller loads it afresh
+            self._entries.pop(user_id)
+            return None
+
+    def set(self, user: User, generation: int):
+        # Inactive users are always looked up, so reactivation takes effect at once
+        if self.enabled and user.is_active and generation == self.generation:
+            self._entries.set(user.id, user)
+
+    def invalidate(self, user_id: int):
+        pubsub.publish(CHANNEL, {"user_id": user_id})
+
+    def _on_invalidate(self, message: dict):
+        self.generation = next(self._generations)
+        self._entries.pop(message.get("user_id"))
+
+
+user_cache = UserCache()
@@ -0,0 +1,75 @@
+"""
+Admission control for the render path
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from core.config import (
+    RENDER_MAX_IN_FLIGHT,
+    RENDER_MAX_QUEUE,
+    RENDER_RETRY_AFTER,
+    PLAYWRIGHT_TIMEOUT,
+)
+
+
+class RenderOverloaded(Exception):
+    """Raised when a render is shed because the render path is saturated"""
+
+    def __init__(self, message: str, retry_after: int = RENDER_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RenderAdmission:
+    """
+    Bounds concurrent renders and the number of renders waiting for a slot.
+    Renders beyond the queue, or that wait past the deadline, are rejected
+    immediately instead of piling up on Chromium.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, deadline_ms: int):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self._deadline = deadline_ms / 1000
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise RenderOverloaded("Render queue is full, try again later")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._deadline)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RenderOverloaded("Timed out waiting for a free renderer, try again later")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+        }
+
+
+render_admission = RenderAdmission(
+    max_in_flight=RENDER_MAX_IN_FLIGHT,
+    max_queue=RENDER_MAX_QUEUE,
+    deadline_ms=PLAYWRIGHT_TIMEOUT,
+)
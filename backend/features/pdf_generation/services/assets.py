@@ -0,0 +1,44 @@
+"""
+Static assets served to render pages from memory
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import BrowserContext, Route
+
+from core.config import TAILWIND_BROWSER_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+# Rendered documents keep referencing the CDN URL; requests to it are
+# intercepted and answered from the bundled copy.
+TAILWIND_SCRIPT_URL = "https://cdn.jsdelivr.net/npm/@tailwindcss/browser@4"
+
+
+def load_tailwind_script(path: str = TAILWIND_BROWSER_SCRIPT) -> Optional[bytes]:
+    """Read the bundled Tailwind browser build, or None if it isn't installed"""
+    try:
+        return Path(path).read_bytes()
+    except OSError:
+        logger.warning(
+            "Tailwind browser build not found at %s, renders will fetch it from the CDN. "
+            "Run `npm install` in the backend directory to bundle it.",
+            path,
+        )
+        return None
+
+
+async def serve_tailwind(context: BrowserContext, script: Optional[bytes]):
+    """Fulfil Tailwind script requests in this context from memory"""
+    if script is None:
+        return
+
+    async def fulfill(route: Route):
+        await route.fulfill(
+            status=200,
+            body=script,
+            content_type="application/javascript; charset=utf-8",
+        )
+
+    await context.route(TAILWIND_SCRIPT_URL, fulfill)
@@ -0,0 +1,144 @@
+"""
+A single Chromium instance and its page pool
+"""
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import BrowserContext, Error as PlaywrightError, Playwright
+
+from .page_pool import PagePool
+
+logger = logging.getLogger(__name__)
+
+
+def _process_rss(pid: int) -> int:
+    """Resident set size of a process in bytes, 0 if it can't be read"""
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+class BrowserWorker:
+    """One browser process, tracked by the number of renders it is running"""
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        index: int,
+        pool_size: int,
+        max_uses: int,
+        checkout_timeout: float,
+        setup_context: Optional[Callable[[BrowserContext], Awaitable[None]]] = None,
+        on_disconnect: Optional[Callable[["BrowserWorker"], None]] = None,
+        error_window: int = 50,
+    ):
+        self._playwright = playwright
+        self._setup_context = setup_context
+        self._on_disconnect = on_disconnect
+        self.index = index
+        self.in_flight = 0
+        self.renders = 0
+        self.connected = False
+        self.draining = False
+        self.recycling = False
+        # True/False per recent render, for the error rate
+        self._outcomes = deque(maxlen=error_window)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._pool_size = pool_size
+        self._max_uses = max_uses
+        self._checkout_timeout = checkout_timeout
+        self._browser = None
+        self._page_pool = None
+
+    async def start(self):
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._browser.on("disconnected", self._handle_disconnect)
+        self.connected = True
+        self._page_pool = PagePool(
+            self._browser,
+            size=self._pool_size,
+            max_uses=self._max_uses,
+            checkout_timeout=self._checkout_timeout,
+            setup_context=self._setup_context,
+        )
+        await self._page_pool.start()
+
+    def _handle_disconnect(self, _browser):
+        if not self.connected:
+            return
+        self.connected = False
+        if not self.draining:
+            logger.warning(f"Browser {self.index} disconnected")
+            if self._on_disconnect:
+                self._on_disconnect(self)
+
+    @property
+    def accepting(self) -> bool:
+        return self.connected and not self.draining
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def error_samples(self) -> int:
+        return len(self._outcomes)
+
+    async def rss_bytes(self) -> Optional[int]:
+        """Combined memory of the browser and its renderer/GPU processes, None if unavailable"""
+        if not self.connected:
+            return None
+        session = await self._browser.new_browser_cdp_session()
+        try:
+            info = await session.send("SystemInfo.getProcessInfo")
+        finally:
+            await session.detach()
+        return sum(_process_rss(process["id"]) for process in info.get("processInfo", [])) or None
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a page from this browser, counting it as in flight"""
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            async with self._page_pool.page() as page:
+                yield page
+            self._outcomes.append(True)
+        except PlaywrightError:
+            # Only browser failures count towards the error rate; bad templates,
+            # oversized PDFs and pool or admission timeouts say nothing about the browser
+            self._outcomes.append(False)
+            raise
+        finally:
+            self.in_flight -= 1
+            self.renders += 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain_and_close(self, timeout: float):
+        """Stop taking renders, let in-flight ones finish (up to `timeout`), then close"""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Browser {self.index} still had {self.in_flight} renders after draining for {timeout}s")
+        await self.close()
+
+    async def close(self):
+        self.draining = True
+        if self._page_pool:
+            await self._page_pool.close()
+        if self._browser and self.connected:
+            await self._browser.close()
+        self.connected = False
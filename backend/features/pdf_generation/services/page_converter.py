@@ -0,0 +1,89 @@
+"""
+JSX/Vue conversion inside the render page, without a node process
+"""
+import asyncio
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from core.config import CONVERTER_TIMEOUT
+from .page_pool import PageStuck
+
+# Modules the converters require() from each other
+CONVERTER_DEPENDENCIES = {
+    "./template-cache": "convertors/template-cache.js",
+}
+
+CONVERTER_SCRIPTS = {
+    "jsx": ("convertors/jsx-converter.js", "advancedJsxToHtml"),
+    "vue": ("convertors/vue-converter.js", "advancedVueToHtml"),
+}
+
+# Evaluated in the page; null means the converters aren't installed in this document
+IN_PAGE_CONVERT_JS = """
+([engine, template, context, compiled]) => {
+    const converters = window.__pdfgenConverters;
+    if (!converters) return null;
+    return String(converters[engine](template, context, compiled)).trim();
+}
+"""
+
+
+def _commonjs_module(path: str) -> str:
+    """A module's source as an expression evaluating to its exports"""
+    source = Path(path).read_text(encoding="utf-8")
+    return f"""(() => {{
+        const module = {{ exports: {{}} }};
+        (function (module, exports, require) {{
+{source}
+        }})(module, module.exports, require);
+        return module.exports;
+    }})()"""
+
+
+@lru_cache(maxsize=1)
+def converter_bundle() -> str:
+    """The node converter modules wrapped in a minimal CommonJS shim for the browser"""
+    dependencies = "".join(
+        f"\n        {json.dumps(name)}: {_commonjs_module(path)},"
+        for name, path in CONVERTER_DEPENDENCIES.items()
+    )
+    converters = "".join(
+        f"\n        {engine}: {_commonjs_module(path)}.{export},"
+        for engine, (path, export) in CONVERTER_SCRIPTS.items()
+    )
+    return f"""window.__pdfgenConverters = (() => {{
+    // Node built-ins like fs are never used on the render path
+    const modules = {{}};
+    const require = (name) => modules[name] || {{}};
+    Object.assign(modules, {{{dependencies}
+    }});
+    return {{{converters}
+    }};
+}})();"""
+
+
+async def install_converters(context: BrowserContext):
+    """Define the converters in every document the context's pages load"""
+    await context.add_init_script(script=converter_bundle())
+
+
+async def convert_in_page(page: Page, engine: str, template: str, context: dict, compiled: Optional[str] = None) -> str:
+    args = [engine, template, context, compiled]
+
+    async def convert():
+        html = await page.evaluate(IN_PAGE_CONVERT_JS, args)
+        if html is None:
+            # A document the init script didn't reach, e.g. the page's first about:blank
+            await page.evaluate(converter_bundle())
+            html = await page.evaluate(IN_PAGE_CONVERT_JS, args)
+        return html
+
+    try:
+        return await asyncio.wait_for(convert(), timeout=CONVERTER_TIMEOUT)
+    except asyncio.TimeoutError:
+        # The page is left spinning; PageStuck makes the pool discard it
+        raise PageStuck(f"{engine.upper()} conversion timed out after {CONVERTER_TIMEOUT}s")
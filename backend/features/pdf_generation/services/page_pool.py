@@ -0,0 +1,142 @@
+"""
+Bounded pool of reusable Playwright pages
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import Browser, BrowserContext, Error as PlaywrightError, Page
+
+logger = logging.getLogger(__name__)
+
+
+class PagePoolTimeout(Exception):
+    """Raised when no pooled page becomes available in time"""
+
+
+class PageStuck(Exception):
+    """Raised by a render that leaves its page busy, so the page is replaced rather than reused"""
+
+
+class PooledPage:
+    """A page and the isolated browser context that owns it"""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class PagePool:
+    """Checks out pre-created pages, resets them and hands them back"""
+
+    def __init__(
+        self,
+        browser: Browser,
+        size: int,
+        max_uses: int,
+        checkout_timeout: float,
+        setup_context: Optional[Callable[[BrowserContext], Awaitable[None]]] = None,
+    ):
+        self._browser = browser
+        self._setup_context = setup_context
+        self._size = size
+        self._max_uses = max_uses
+        self._checkout_timeout = checkout_timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._live = 0
+        self._closed = False
+
+    async def start(self):
+        """Pre-create every page so the first renders don't pay for it"""
+        while self._live < self._size:
+            self._idle.put_nowait(await self._create())
+
+    async def _create(self) -> PooledPage:
+        self._live += 1
+        try:
+            context = await self._browser.new_context()
+            if self._setup_context:
+                await self._setup_context(context)
+            page = await context.new_page()
+        except Exception:
+            self._live -= 1
+            raise
+        return PooledPage(context, page)
+
+    async def _dispose(self, pooled: PooledPage):
+        self._live -= 1
+        try:
+            await pooled.context.close()
+        except Exception:
+            logger.debug("Failed to close pooled browser context", exc_info=True)
+
+    async def _reset(self, pooled: PooledPage):
+        # Navigating away drops the DOM, timers and JS globals of the last render
+        await pooled.page.evaluate(
+            "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+        )
+        await pooled.page.goto("about:blank")
+        await pooled.context.clear_cookies()
+
+    async def acquire(self) -> PooledPage:
+        if self._idle.empty() and self._live < self._size:
+            return await self._create()
+
+        try:
+            pooled = await asyncio.wait_for(self._idle.get(), timeout=self._checkout_timeout)
+        except asyncio.TimeoutError:
+            raise PagePoolTimeout(
+                f"No browser page available after {self._checkout_timeout}s"
+            )
+
+        if pooled.page.is_closed():
+            await self._dispose(pooled)
+            return await self._create()
+        return pooled
+
+    async def release(self, pooled: PooledPage, discard: bool = False):
+        pooled.uses += 1
+
+        if self._closed:
+            await self._dispose(pooled)
+            return
+
+        if not discard and pooled.uses < self._max_uses and not pooled.page.is_closed():
+            try:
+                await self._reset(pooled)
+                self._idle.put_nowait(pooled)
+                return
+            except Exception:
+                logger.warning("Failed to reset pooled page, replacing it", exc_info=True)
+
+        await self._dispose(pooled)
+        try:
+            self._idle.put_nowait(await self._create())
+        except Exception:
+            # The next acquire() will try again to fill the empty slot
+            logger.warning("Failed to replace pooled page", exc_info=True)
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a page for the duration of the block"""
+        pooled = await self.acquire()
+        # Cancelled renders may leave the page mid-script, so they discard it too
+        discard = True
+        try:
+            yield pooled.page
+            discard = False
+        except (PlaywrightError, PageStuck):
+            raise
+        except Exception:
+            # The render failed, not the page; it is reset and reused like after a success
+            discard = False
+            raise
+        finally:
+            await self.release(pooled, discard=discard)
+
+    async def close(self):
+        self._closed = True
+        while not self._idle.empty():
+            await self._dispose(self._idle.get_nowait())
@@ -0,0 +1,222 @@
+"""
+Content-addressed cache of rendered PDFs with memory and disk tiers
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from core.cache import LRUCache
+from core.config import (
+    PDF_CACHE_ENABLED,
+    PDF_CACHE_MEMORY_MAX_SIZE,
+    PDF_CACHE_MEMORY_MAX_ENTRIES,
+    PDF_CACHE_DIR,
+    PDF_CACHE_DISK_MAX_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Namespace for renders that don't belong to a saved template
+DEFAULT_NAMESPACE = "_"
+
+# A full disk tier is evicted down to this fraction of its limit, so the
+# directory isn't rescanned on every write once it fills up
+DISK_EVICT_TO = 0.9
+
+
+class PDFCache:
+    """
+    Rendered PDFs keyed by a hash of everything that affects the output.
+    Entries are grouped by namespace (the template id) so a template's
+    renders can be dropped together when it changes. The disk tier is shared
+    by every worker process: its total size is kept in a file next to the
+    entries and only changed under an exclusive lock on the directory.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        memory_max_size: int = PDF_CACHE_MEMORY_MAX_SIZE,
+        memory_max_entries: int = PDF_CACHE_MEMORY_MAX_ENTRIES,
+        disk_dir: Optional[str] = PDF_CACHE_DIR,
+        disk_max_size: int = PDF_CACHE_DISK_MAX_SIZE,
+    ):
+        self.enabled = enabled
+        self._memory = LRUCache(max_entries=memory_max_entries, max_size=memory_max_size)
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk_max_size = disk_max_size
+        # Last total seen by this process, for stats
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(**inputs) -> str:
+        """Hash the render inputs (content, engine, data, page options, ...)"""
+        payload = json.dumps(inputs, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str, namespace: Optional[str] = None) -> Optional[bytes]:
+        namespace = namespace or DEFAULT_NAMESPACE
+        pdf = self._memory.get((namespace, key))
+        if pdf is not None:
+            self.memory_hits += 1
+            return pdf
+
+        if self._disk_dir is not None:
+            pdf = await asyncio.to_thread(self._disk_read, self._disk_path(namespace, key))
+            if pdf is not None:
+                self.disk_hits += 1
+                self._memory.set((namespace, key), pdf)
+                return pdf
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, pdf: bytes, namespace: Optional[str] = None):
+        namespace = namespace or DEFAULT_NAMESPACE
+        self._memory.set((namespace, key), pdf)
+        if self._disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._disk_write, self._disk_path(namespace, key), pdf)
+            except OSError:
+                logger.warning("Failed to write PDF to the disk cache", exc_info=True)
+
+    async def invalidate(self, namespace: str):
+        """Drop every cached render in a namespace from both tiers"""
+        for entry in self._memory.keys():
+            if entry[0] == namespace:
+                self._memory.pop(entry)
+        if self._disk_dir is not None:
+            await asyncio.to_thread(self._disk_invalidate, namespace)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_size": self._memory.size,
+            "disk_size": self._disk_size,
+        }
+
+    # Disk tier, run in worker threads
+
+    def _disk_path(self, namespace: str, key: str) -> Path:
+        return self._disk_dir / namespace / f"{key}.pdf"
+
+    @contextmanager
+    def _disk_locked(self):
+        """Exclusive access to the disk tier across threads and processes"""
+        with self._disk_lock:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._disk_dir / ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _disk_files(self):
+        """(mtime, path, size) of every cached PDF, least recently used first"""
+        files = []
+        for path in self._disk_dir.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        files.sort(key=lambda item: item[0])
+        return files
+
+    def _read_usage(self) -> Optional[int]:
+        try:
+            return int((self._disk_dir / ".usage").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_usage(self, usage: int):
+        self._disk_size = max(usage, 0)
+        (self._disk_dir / ".usage").write_text(str(self._disk_size))
+
+    def _disk_evict(self) -> int:
+        """Delete the least recently used files until the tier is under its limit; returns the new total"""
+        files = self._disk_files()
+        total = sum(size for _, _, size in files)
+        if total <= self._disk_max_size:
+            return total
+        target = self._disk_max_size * DISK_EVICT_TO
+        for _, path, size in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        return total
+
+    def _disk_read(self, path: Path) -> Optional[bytes]:
+        try:
+            pdf = path.read_bytes()
+            # mtime doubles as last access time for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return pdf
+
+    def _disk_write(self, path: Path, pdf: bytes):
+        if len(pdf) > self._disk_max_size:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so other workers never read a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(pdf)
+
+        with self._disk_locked():
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            usage = self._read_usage()
+            if usage is None:
+                # First write, or the file was lost: count what's actually there
+                usage = sum(size for _, _, size in self._disk_files())
+            else:
+                usage += len(pdf) - replaced
+            if usage > self._disk_max_size:
+                # Recounted from the directory, so drift from crashed writers is corrected too
+                usage = self._disk_evict()
+            self._write_usage(usage)
+
+    def _disk_invalidate(self, namespace: str):
+        directory = self._disk_dir / namespace
+        if not directory.exists():
+            return
+        with self._disk_locked():
+            removed = 0
+            for path in directory.glob("*.pdf"):
+                try:
+                    removed += path.stat().st_size
+                except OSError:
+                    pass
+            shutil.rmtree(directory, ignore_errors=True)
+            usage = self._read_usage()
+            if usage is not None:
+                self._write_usage(usage - removed)
+
+
+pdf_cache = PDFCache(enabled=PDF_CACHE_ENABLED)
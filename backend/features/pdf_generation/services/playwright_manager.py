@@ -1,39 +1,205 @@
 from playwright.async_api import async_playwright
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 import asyncio
-from convertors.wrappers import JSXConverter, VueConverter
+import base64
+import logging
+from convertors.wrappers import JSXConverter, VueConverter, MakoConverter
+from core.config import (
+    PLAYWRIGHT_BROWSER_COUNT,
+    PLAYWRIGHT_PAGE_POOL_SIZE,
+    PLAYWRIGHT_PAGE_MAX_USES,
+    PLAYWRIGHT_PAGE_CHECKOUT_TIMEOUT,
+    PLAYWRIGHT_BROWSER_ERROR_WINDOW,
+    PLAYWRIGHT_BROWSER_DRAIN_TIMEOUT,
+    MAX_PDF_SIZE,
+    PDF_STREAM_CHUNK_SIZE,
+    PDF_CACHE_MAX_ENTRY_SIZE,
+    TEMPLATE_CONVERSION,
+    BATCH_CONVERT_CONCURRENCY,
+)
+from .admission import render_admission
+from .assets import TAILWIND_SCRIPT_URL, load_tailwind_script, serve_tailwind
+from .browser_worker import BrowserWorker
+from .page_converter import convert_in_page, install_converters
+from .pdf_cache import pdf_cache
+from .supervisor import BrowserSupervisor
+from .readiness import set_content_and_wait, swap_body_and_wait
+from .tailwind_compiler import TAILWIND_CSS_EXTRACT_JS, candidate_markup
+
+logger = logging.getLogger(__name__)
+
+
+class PDFTooLarge(Exception):
+    """Raised when a rendered PDF exceeds MAX_PDF_SIZE"""
+
 
 class PlaywrightManager:
     _instance = None
-    _browser = None
+    _instance_lock = asyncio.Lock()
+    _workers = []
+    _supervisor = None
+    _tailwind_script = None
     _initialized = False
     
-    # Tailwind CSS CDN script
-    TAILWIND_CSS = """
-    <script src="https://cdn.jsdelivr.net/npm/@tailwindcss/browser@4"></script>
+    # Tailwind CSS script, served from the bundled copy by serve_tailwind()
+    TAILWIND_CSS = f"""
+    <script src="{TAILWIND_SCRIPT_URL}"></script>
     """
 
+    # Options passed to page.pdf(); part of the render cache key
+    PDF_OPTIONS = {"format": "A4"}
+    # The same page setup expressed as CDP Page.printToPDF parameters (inches)
+    CDP_PRINT_PARAMS = {
+        "paperWidth": 8.27,
+        "paperHeight": 11.7,
+        "marginTop": 0,
+        "marginBottom": 0,
+        "marginLeft": 0,
+        "marginRight": 0,
+    }
+
+    # Throwaway document rendered on every browser before serving traffic
+    WARM_UP_HTML = '<p class="p-4 text-lg font-bold">warm-up</p>'
+
+    def __init__(self):
+        self._init_lock = asyncio.Lock()
+        # Browsers being drained after a replacement
+        self._draining = set()
+
     @classmethod
     async def get_instance(cls):
-        if not cls._instance:
-            cls._instance = cls()
-            await cls._instance.initialize()
+        if cls._instance is None:
+            # Concurrent first callers wait here instead of each launching browsers
+            async with cls._instance_lock:
+                if cls._instance is None:
+                    instance = cls()
+                    await instance.initialize()
+                    cls._instance = instance
         return cls._instance
 
+    @classmethod
+    async def shutdown(cls):
+        """Stop the browsers if they were ever started; never launches them"""
+        async with cls._instance_lock:
+            if cls._instance is not None:
+                await cls._instance.cleanup()
+                cls._instance = None
+
     async def initialize(self):
+        async with self._init_lock:
+            if not self._initialized:
+                await self._start()
+
+    async def _start(self):
+        self._playwright = await async_playwright().start()
+        self._tailwind_script = load_tailwind_script()
+        self._workers = [self._new_worker(index) for index in range(PLAYWRIGHT_BROWSER_COUNT)]
+        await asyncio.gather(*(worker.start() for worker in self._workers))
+        self._supervisor = BrowserSupervisor(self)
+        self._supervisor.start()
+        self._initialized = True
+
+    def _new_worker(self, index: int) -> BrowserWorker:
+        return BrowserWorker(
+            self._playwright,
+            index=index,
+            pool_size=PLAYWRIGHT_PAGE_POOL_SIZE,
+            max_uses=PLAYWRIGHT_PAGE_MAX_USES,
+            checkout_timeout=PLAYWRIGHT_PAGE_CHECKOUT_TIMEOUT,
+            setup_context=self._setup_context,
+            on_disconnect=lambda worker: self._supervisor and self._supervisor.wake(),
+            error_window=PLAYWRIGHT_BROWSER_ERROR_WINDOW,
+        )
+
+    @property
+    def workers(self) -> List[BrowserWorker]:
+        return list(self._workers)
+
+    async def replace_worker(self, old: BrowserWorker):
+        """Swap a browser for a freshly launched, warmed one, then drain the old one"""
+        old.recycling = True
+        new = self._new_worker(old.index)
+        try:
+            await new.start()
+            await self._warm_worker(new)
+        except Exception:
+            old.recycling = False
+            await new.close()
+            raise
+
+        if old in self._workers:
+            self._workers[self._workers.index(old)] = new
+        else:
+            # The manager was cleaned up while the replacement was starting
+            await new.close()
+        task = asyncio.create_task(old.drain_and_close(PLAYWRIGHT_BROWSER_DRAIN_TIMEOUT))
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+    async def _warm_worker(self, worker: BrowserWorker):
+        async with worker.page() as page:
+            await set_content_and_wait(page, self._wrap_html(self.WARM_UP_HTML), "html", tailwind=True)
+            await page.pdf(**self.PDF_OPTIONS)
+
+    async def warm_up(self):
+        """Render a throwaway PDF on every browser so the first real request runs hot"""
         if not self._initialized:
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=True
-            )
-            self._initialized = True
+            await self.initialize()
+
+        await asyncio.gather(*(self._warm_worker(worker) for worker in self._workers))
 
-    def _prepare_html_content(self, content: str, context: dict = None, is_jsx: bool = False, is_vue: bool = False) -> str:
+    async def _setup_context(self, context):
+        await serve_tailwind(context, self._tailwind_script)
+        if TEMPLATE_CONVERSION == "page":
+            await install_converters(context)
+
+    def _cache_key(self, content: str, engine: str, data: Optional[dict], compiled_css: Optional[str]) -> Optional[str]:
+        if not pdf_cache.enabled:
+            return None
+        return pdf_cache.make_key(
+            content=content,
+            engine=getattr(engine, "value", engine),
+            data=data,
+            compiled_css=compiled_css,
+            options=self.PDF_OPTIONS,
+        )
+
+    def _pick_worker(self) -> BrowserWorker:
+        # Least in-flight renders wins; ties go to the lowest index. Dead or
+        # draining browsers are skipped unless nothing else is left.
+        candidates = [worker for worker in self._workers if worker.accepting] or self._workers
+        return min(candidates, key=lambda worker: worker.in_flight)
+
+    async def _convert_content(
+        self,
+        content: str,
+        engine: str = "html",
+        data: Optional[dict] = None,
+        page=None,
+        compiled_template: Optional[str] = None,
+    ) -> str:
+        # With a page at hand, JSX/Vue can be converted by the browser itself
+        if page is not None and TEMPLATE_CONVERSION == "page" and engine in ("jsx", "vue"):
+            return await convert_in_page(page, getattr(engine, "value", engine), content, data or {}, compiled_template)
         # Convert JSX to HTML if needed
-        if is_jsx:
-            content = JSXConverter().convert(content, context)
-        elif is_vue:
-            content = VueConverter().convert(content, context)
+        if engine == "jsx":
+            return await JSXConverter().aconvert(content, data, compiled_template)
+        elif engine == "vue":
+            return await VueConverter().aconvert(content, data, compiled_template)
+        elif engine == "mako":
+            return await MakoConverter().aconvert(content, data, compiled_template)
+        return content
+
+    def _wrap_html(self, body: str, compiled_css: Optional[str] = None) -> str:
+        # A precompiled stylesheet replaces the in-page Tailwind JIT entirely
+        if compiled_css is not None:
+            css = compiled_css.replace("</style", "<\\/style")
+            styles = f"<style>{css}</style>"
+        else:
+            styles = f"""{self.TAILWIND_CSS}
+                <style type="text/tailwindcss">
+                
+    </style>"""
 
         # Wrap content with proper HTML structure and Tailwind
         return f"""
@@ -42,35 +208,242 @@ class PlaywrightManager:
             <head>
                 <meta charset="UTF-8" />
                 <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-                <script src="https://cdn.jsdelivr.net/npm/@tailwindcss/browser@4"></script>
-                <style type="text/tailwindcss">
-                
-    </style>
+                {styles}
             </head>
             <body>
-                {content}
+                {body}
             </body>
         </html>
         """
 
-    async def generate_pdf(self, content: str, context: dict = None, is_jsx: bool = False, is_vue: bool = False) -> bytes:
+    async def _prepare_html_content(
+        self,
+        content: str,
+        engine: str = "html",
+        data: Optional[dict] = None,
+        compiled_css: Optional[str] = None,
+        page=None,
+        compiled_template: Optional[str] = None,
+    ) -> str:
+        body = await self._convert_content(content, engine, data, page, compiled_template)
+        return self._wrap_html(body, compiled_css)
+
+    async def generate_pdf(
+        self,
+        content: str,
+        engine: str = "html",
+        data: Optional[dict] = None,
+        compiled_css: Optional[str] = None,
+        cache_namespace: Optional[str] = None,
+        compiled_template: Optional[str] = None,
+    ) -> bytes:
+        cache_key = self._cache_key(content, engine, data, compiled_css)
+        if cache_key is not None:
+            cached = await pdf_cache.get(cache_key, cache_namespace)
+            if cached is not None:
+                return cached
+
         if not self._initialized:
             await self.initialize()
             
-        page = await self._browser.new_page()
+        async with render_admission.admit():
+            async with self._pick_worker().page() as page:
+                html_content = await self._prepare_html_content(content, engine, data, compiled_css, page, compiled_template)
+                await set_content_and_wait(page, html_content, engine, tailwind=compiled_css is None)
+                pdf_bytes = await page.pdf(**self.PDF_OPTIONS)
+
+        if len(pdf_bytes) > MAX_PDF_SIZE:
+            raise PDFTooLarge(f"Generated PDF exceeds the {MAX_PDF_SIZE} byte limit")
+        if cache_key is not None:
+            await pdf_cache.set(cache_key, pdf_bytes, cache_namespace)
+        return pdf_bytes
+
+    async def generate_pdf_stream(
+        self,
+        content: str,
+        engine: str = "html",
+        data: Optional[dict] = None,
+        compiled_css: Optional[str] = None,
+        cache_namespace: Optional[str] = None,
+        compiled_template: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Like generate_pdf, but yields the PDF in chunks as Chromium produces them"""
+        cache_key = self._cache_key(content, engine, data, compiled_css)
+        if cache_key is not None:
+            cached = await pdf_cache.get(cache_key, cache_namespace)
+            if cached is not None:
+                yield cached
+                return
+
+        if not self._initialized:
+            await self.initialize()
+
+        # Small documents are kept for the cache; large ones are never held whole
+        cacheable = [] if cache_key is not None else None
+        total = 0
+        async with render_admission.admit():
+            async with self._pick_worker().page() as page:
+                html_content = await self._prepare_html_content(content, engine, data, compiled_css, page, compiled_template)
+                await set_content_and_wait(page, html_content, engine, tailwind=compiled_css is None)
+                async for data_chunk in self._print_stream(page):
+                    total += len(data_chunk)
+                    if cacheable is not None:
+                        if total <= PDF_CACHE_MAX_ENTRY_SIZE:
+                            cacheable.append(data_chunk)
+                        else:
+                            cacheable = None
+                    yield data_chunk
+
+        if cacheable is not None:
+            await pdf_cache.set(cache_key, b"".join(cacheable), cache_namespace)
+
+    async def _print_stream(self, page) -> AsyncIterator[bytes]:
+        """Print the loaded page, yielding the PDF in chunks as Chromium produces them"""
+        session = await page.context.new_cdp_session(page)
+        handle = None
+        total = 0
         try:
-            html_content = self._prepare_html_content(content, context, is_jsx, is_vue)
-            await page.set_content(html_content)
-            # Wait for Tailwind to initialize
-            await page.wait_for_load_state("networkidle")
-            pdf_bytes = await page.pdf(format="A4")
-            return pdf_bytes
+            result = await session.send(
+                "Page.printToPDF",
+                {**self.CDP_PRINT_PARAMS, "transferMode": "ReturnAsStream"},
+            )
+            handle = result["stream"]
+            while True:
+                chunk = await session.send("IO.read", {"handle": handle, "size": PDF_STREAM_CHUNK_SIZE})
+                if chunk.get("base64Encoded"):
+                    data_chunk = base64.b64decode(chunk["data"])
+                else:
+                    data_chunk = chunk["data"].encode("utf-8")
+                total += len(data_chunk)
+                if total > MAX_PDF_SIZE:
+                    raise PDFTooLarge(f"Generated PDF exceeds the {MAX_PDF_SIZE} byte limit")
+                if data_chunk:
+                    yield data_chunk
+                if chunk.get("eof"):
+                    break
         finally:
-            await page.close()
+            if handle is not None:
+                try:
+                    await session.send("IO.close", {"handle": handle})
+                except Exception:
+                    pass
+            await session.detach()
+
+    async def _convert_rows(self, content: str, engine: str, rows: List[dict], page, compiled_template: Optional[str]) -> List[str]:
+        """Convert every row, at most BATCH_CONVERT_CONCURRENCY at a time"""
+        semaphore = asyncio.Semaphore(BATCH_CONVERT_CONCURRENCY)
+
+        async def convert(row: dict) -> str:
+            async with semaphore:
+                return await self._convert_content(content, engine, row, page, compiled_template)
+
+        return await asyncio.gather(*(convert(row) for row in rows))
+
+    async def _compile_stylesheet(self, page, body: str) -> str:
+        """Load the body under the Tailwind JIT and return the stylesheet it generates"""
+        await set_content_and_wait(page, self._wrap_html(body), "html", tailwind=True)
+        css = await page.evaluate(TAILWIND_CSS_EXTRACT_JS)
+        if not css:
+            raise Exception("Tailwind did not generate a stylesheet")
+        return css
+
+    async def _batch_stylesheet(self, page, content: str, bodies: List[str]) -> Optional[str]:
+        # One stylesheet covering every row lets each row after the first reuse the loaded document
+        try:
+            return await self._compile_stylesheet(page, candidate_markup(" ".join([content, *bodies])))
+        except Exception:
+            logger.warning("Tailwind precompilation failed for batch, using the in-page JIT", exc_info=True)
+            return None
+
+    async def generate_pdf_batch(
+        self,
+        content: str,
+        engine: str = "html",
+        rows: List[dict] = (),
+        compiled_css: Optional[str] = None,
+        compiled_template: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Render one PDF per data row, all on a single warm page"""
+        if not self._initialized:
+            await self.initialize()
+
+        async with render_admission.admit():
+            async with self._pick_worker().page() as page:
+                bodies = await self._convert_rows(content, engine, rows, page, compiled_template)
+                # Plain HTML is printed once, so only templates need a shared stylesheet
+                if compiled_css is None and engine != "html":
+                    compiled_css = await self._batch_stylesheet(page, content, bodies)
+
+                loaded = False
+                static_pdf = None
+                for index, body in enumerate(bodies, start=1):
+                    # Plain HTML ignores its data, so it only needs rendering once
+                    if static_pdf is not None:
+                        yield static_pdf
+                        continue
+
+                    # innerHTML doesn't run scripts, so documents with them get a full reload
+                    if loaded and compiled_css is not None and "<script" not in body.lower():
+                        await swap_body_and_wait(page, body, engine)
+                    else:
+                        html_content = self._wrap_html(body, compiled_css)
+                        await set_content_and_wait(page, html_content, engine, tailwind=compiled_css is None)
+                        loaded = True
+
+                    pdf_bytes = await page.pdf(**self.PDF_OPTIONS)
+                    if len(pdf_bytes) > MAX_PDF_SIZE:
+                        raise PDFTooLarge(f"Generated PDF for row {index} exceeds the {MAX_PDF_SIZE} byte limit")
+                    if engine == "html":
+                        static_pdf = pdf_bytes
+                    yield pdf_bytes
+
+    async def generate_merged_pdf(
+        self,
+        content: str,
+        engine: str = "html",
+        rows: List[dict] = (),
+        compiled_css: Optional[str] = None,
+        compiled_template: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Render every data row into one document, one row per page break, streamed in chunks"""
+        if not self._initialized:
+            await self.initialize()
+
+        # Every row is in the one document, so without a stored stylesheet the JIT covers them all
+        async with render_admission.admit():
+            async with self._pick_worker().page() as page:
+                bodies = await self._convert_rows(content, engine, rows, page, compiled_template)
+                sections = [f'<section style="break-after: page;">{body}</section>' for body in bodies[:-1]]
+                if bodies:
+                    sections.append(f"<section>{bodies[-1]}</section>")
+
+                html_content = self._wrap_html("".join(sections), compiled_css)
+                # Only the document is needed while it prints
+                del bodies, sections
+                await set_content_and_wait(page, html_content, engine, tailwind=compiled_css is None)
+                async for chunk in self._print_stream(page):
+                    yield chunk
+
+    async def compile_tailwind_css(self, content: str, engine: str = "html", data: Optional[dict] = None) -> str:
+        """Run Tailwind once over a template and return the stylesheet it generates"""
+        if not self._initialized:
+            await self.initialize()
+
+        async with render_admission.admit():
+            async with self._pick_worker().page() as page:
+                body = await self._convert_content(content, engine, data, page) + candidate_markup(content)
+                return await self._compile_stylesheet(page, body)
 
     async def cleanup(self):
-        if self._browser:
-            await self._browser.close()
+        if self._supervisor:
+            await self._supervisor.stop()
+            self._supervisor = None
+        await asyncio.gather(
+            *(worker.close() for worker in self._workers),
+            *self._draining,
+            return_exceptions=True
+        )
+        self._workers = []
         if hasattr(self, '_playwright'):
             await self._playwright.stop()
         self._initialized = False 
@@ -0,0 +1,86 @@
+"""
+Render readiness protocol, used instead of waiting for network idle
+"""
+import logging
+
+from playwright.async_api import Page
+
+from core.config import RENDER_READY_TIMEOUTS, PLAYWRIGHT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Resolves true once Tailwind has emitted its stylesheet (when the JIT is in
+# use), every linked stylesheet, web font and image has loaded or failed.
+# Resolves false if that takes longer than the fallback timeout.
+RENDER_READY_JS = """
+async ({ tailwind, timeout }) => {
+    const tailwindReady = () => new Promise(resolve => {
+        const hasSheet = () => Array.from(document.head.querySelectorAll('style:not([type])'))
+            .some(style => style.textContent.length > 0);
+        if (hasSheet()) return resolve();
+        const observer = new MutationObserver(() => {
+            if (hasSheet()) {
+                observer.disconnect();
+                resolve();
+            }
+        });
+        observer.observe(document.head, { childList: true, subtree: true, characterData: true });
+    });
+
+    // domcontentloaded doesn't wait for <link rel="stylesheet">; a link whose
+    // sheet is still null hasn't fired load or error yet
+    const stylesheetsReady = () => Promise.all(
+        Array.from(document.querySelectorAll('link[rel~="stylesheet"]'))
+            .filter(link => !link.sheet)
+            .map(link => new Promise(resolve => {
+                link.addEventListener('load', resolve, { once: true });
+                link.addEventListener('error', resolve, { once: true });
+            }))
+    );
+
+    const imagesReady = () => Promise.all(
+        Array.from(document.images)
+            .filter(img => !img.complete)
+            .map(img => new Promise(resolve => {
+                img.addEventListener('load', resolve, { once: true });
+                img.addEventListener('error', resolve, { once: true });
+            }))
+    );
+
+    const ready = (async () => {
+        if (tailwind) await tailwindReady();
+        // Before fonts, since @font-face rules can come from linked sheets
+        await stylesheetsReady();
+        await document.fonts.ready;
+        await imagesReady();
+        // Two frames so styles applied by the steps above are laid out
+        await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+        return true;
+    })();
+    const fallback = new Promise(resolve => setTimeout(() => resolve(false), timeout));
+    return Promise.race([ready, fallback]);
+}
+"""
+
+
+def ready_timeout(engine: str) -> int:
+    """Fallback timeout in milliseconds for the given engine"""
+    return RENDER_READY_TIMEOUTS.get(str(getattr(engine, "value", engine)), PLAYWRIGHT_TIMEOUT)
+
+
+async def set_content_and_wait(page: Page, html_content: str, engine: str, tailwind: bool):
+    """Load the document and wait until it is ready to print"""
+    timeout = ready_timeout(engine)
+    await page.set_content(html_content, wait_until="domcontentloaded", timeout=PLAYWRIGHT_TIMEOUT)
+    ready = await page.evaluate(RENDER_READY_JS, {"tailwind": tailwind, "timeout": timeout})
+    if not ready:
+        logger.warning(f"Render readiness not signalled within {timeout}ms for {engine} content, printing anyway")
+
+
+async def swap_body_and_wait(page: Page, body: str, engine: str):
+    """Replace the body of an already loaded document and wait until it is ready to print"""
+    timeout = ready_timeout(engine)
+    await page.evaluate("html => { document.body.innerHTML = html; }", body)
+    ready = await page.evaluate(RENDER_READY_JS, {"tailwind": False, "timeout": timeout})
+    if not ready:
+        logger.warning(f"Render readiness not signalled within {timeout}ms for {engine} content, printing anyway")
@@ -0,0 +1,89 @@
+"""
+Browser health supervision and recycling
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from core.config import (
+    PLAYWRIGHT_SUPERVISOR_INTERVAL,
+    PLAYWRIGHT_BROWSER_MAX_RENDERS,
+    PLAYWRIGHT_BROWSER_MAX_RSS,
+    PLAYWRIGHT_BROWSER_MAX_ERROR_RATE,
+    PLAYWRIGHT_BROWSER_ERROR_WINDOW,
+)
+from .browser_worker import BrowserWorker
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserSupervisor:
+    """Periodically checks every browser and has the manager replace unhealthy ones"""
+
+    def __init__(self, manager, interval: float = PLAYWRIGHT_SUPERVISOR_INTERVAL):
+        self._manager = manager
+        self._interval = interval
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def wake(self):
+        """Run a check now, e.g. because a browser disconnected"""
+        self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Browser supervision check failed")
+
+    async def check(self):
+        for worker in self._manager.workers:
+            if worker.recycling:
+                continue
+            reason = await self._recycle_reason(worker)
+            if reason is None:
+                continue
+            logger.warning(f"Recycling browser {worker.index}: {reason}")
+            try:
+                await self._manager.replace_worker(worker)
+            except Exception:
+                logger.exception(f"Failed to replace browser {worker.index}")
+
+    async def _recycle_reason(self, worker: BrowserWorker) -> Optional[str]:
+        if not worker.connected:
+            return "disconnected"
+        if PLAYWRIGHT_BROWSER_MAX_RENDERS and worker.renders >= PLAYWRIGHT_BROWSER_MAX_RENDERS:
+            return f"{worker.renders} renders"
+        if (
+            worker.error_samples >= PLAYWRIGHT_BROWSER_ERROR_WINDOW
+            and worker.error_rate > PLAYWRIGHT_BROWSER_MAX_ERROR_RATE
+        ):
+            return f"error rate {worker.error_rate:.0%}"
+        if PLAYWRIGHT_BROWSER_MAX_RSS:
+            try:
+                rss = await worker.rss_bytes()
+            except Exception:
+                logger.debug(f"Could not read memory of browser {worker.index}", exc_info=True)
+                rss = None
+            if rss is not None and rss > PLAYWRIGHT_BROWSER_MAX_RSS:
+                return f"RSS {rss // (1024 * 1024)}MB"
+        return None
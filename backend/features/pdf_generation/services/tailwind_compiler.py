@@ -0,0 +1,54 @@
+"""
+Ahead-of-time Tailwind CSS compilation for saved templates
+"""
+import hashlib
+import html
+import re
+from typing import Optional
+
+# Anything between whitespace, quotes and markup delimiters could be a class
+# name. Tailwind silently ignores candidates it doesn't recognise, so this
+# errs on the side of including too much, like Tailwind's own source scanner.
+_CANDIDATE_PATTERN = re.compile(r"[^\s'\"`<>{}]+")
+_MAX_CANDIDATE_LENGTH = 120
+
+# Reads the stylesheet the Tailwind browser build appends to <head>
+TAILWIND_CSS_EXTRACT_JS = """
+() => Array.from(document.head.querySelectorAll('style:not([type])'))
+    .map(style => style.textContent)
+    .join('\\n')
+"""
+
+
+def tailwind_source_hash(content: str) -> str:
+    """Hash a template's source to key its compiled stylesheet"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def candidate_markup(content: str) -> str:
+    """
+    Hidden element listing every class candidate in the template source,
+    so classes only produced for some data sets are compiled as well
+    """
+    candidates = {
+        token for token in _CANDIDATE_PATTERN.findall(content)
+        if len(token) <= _MAX_CANDIDATE_LENGTH
+    }
+    classes = html.escape(" ".join(sorted(candidates)), quote=True)
+    return f'<div hidden class="{classes}"></div>'
+
+
+def compiled_css_for(template, *data: Optional[dict]) -> Optional[str]:
+    """
+    Return the template's stored stylesheet if it still matches its content
+    and every data set the render uses is the one it was compiled with.
+    Classes that only appear in other data would be missing from it, so those
+    renders keep the in-page JIT.
+    """
+    if not template.compiled_css or not template.content:
+        return None
+    if template.compiled_css_hash != tailwind_source_hash(template.content):
+        return None
+    if any(row != template.data for row in data):
+        return None
+    return template.compiled_css
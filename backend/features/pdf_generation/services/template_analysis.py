@@ -0,0 +1,99 @@
+"""
+Save-time template analysis
+
+Saving a template compiles it once for its engine and stores the generated
+render code alongside the data paths it reads. Renders hand the stored code
+to the converter instead of compiling the template again, and requests whose
+data lacks a top-level key the template requires are rejected before reaching
+Chromium. JSX and Vue keys the template tests before use (`discount && ...`,
+`v-if="showHeader"`) are optional; Mako renders with strict_undefined, so
+every name it reads is required.
+"""
+import hashlib
+import logging
+from typing import Any, List, Optional
+
+import mako
+
+from convertors.wrappers import JSXConverter, MakoConverter, VueConverter
+
+logger = logging.getLogger(__name__)
+
+# Part of the content hash, so artifacts from an older code generator are
+# never loaded; bump it whenever the generated code changes shape
+ARTIFACT_FORMAT = f"2/mako-{mako.__version__}"
+
+ANALYZERS = {
+    "jsx": JSXConverter,
+    "vue": VueConverter,
+    "mako": MakoConverter,
+}
+
+
+class TemplateDataMissing(Exception):
+    """Raised when render data lacks keys the template references"""
+
+    def __init__(self, missing: List[str], row: Optional[int] = None):
+        self.missing = missing
+        self.row = row
+        where = f" in row {row}" if row is not None else ""
+        super().__init__(f"Template data{where} is missing: {', '.join(missing)}")
+
+
+def _engine_name(engine) -> str:
+    return str(getattr(engine, "value", engine))
+
+
+def template_content_hash(engine, content: str) -> str:
+    """Hash keying a template's stored artifact to its engine and source"""
+    source = f"{ARTIFACT_FORMAT}\0{_engine_name(engine)}\0{content}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+async def analyze_template(template):
+    """Compile the template and record its render code and required data paths"""
+    engine = _engine_name(template.engine)
+    template.content_hash = template_content_hash(engine, template.content or "")
+    template.compiled_template = None
+    template.variables = []
+
+    analyzer = ANALYZERS.get(engine)
+    if analyzer is None or not template.content:
+        return
+    try:
+        analysis = await analyzer().aanalyze(template.content)
+    except Exception:
+        # Renders compile from source and report the error there
+        logger.warning(f"Template analysis failed for template {template.id}", exc_info=True)
+        template.content_hash = None
+        return
+    template.compiled_template = analysis["compiled"]
+    template.variables = analysis["variables"]
+
+
+def _is_current(template) -> bool:
+    if not template.content_hash or not template.content:
+        return False
+    return template.content_hash == template_content_hash(template.engine, template.content)
+
+
+def compiled_template_for(template) -> Optional[str]:
+    """Return the template's stored render code if it still matches its content"""
+    if not _is_current(template):
+        return None
+    return template.compiled_template
+
+
+def missing_variables(template, data: Any) -> List[str]:
+    """Top-level keys the template requires that `data` doesn't provide"""
+    if not _is_current(template) or not template.variables:
+        return []
+    required = {path.split(".", 1)[0] for path in template.variables}
+    provided = data.keys() if isinstance(data, dict) else ()
+    return sorted(required.difference(provided))
+
+
+def check_template_data(template, data: Any, row: Optional[int] = None):
+    missing = missing_variables(template, data)
+    if missing:
+        raise TemplateDataMissing(missing, row)
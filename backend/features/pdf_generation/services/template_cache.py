@@ -0,0 +1,91 @@
+"""
+Per-process cache of saved template rows on the render path
+
+Generate endpoints look templates up by (user_id, template_id) on every
+call. Rows are kept here for a short TTL and dropped in every worker when
+the template is updated or deleted.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+import models
+from core.cache import TTLCache
+from core.config import TEMPLATE_CACHE_MAX_ENTRIES, TEMPLATE_CACHE_TTL
+from core.pubsub import pubsub
+
+CHANNEL = "templates"
+
+
+@dataclass(frozen=True)
+class CachedTemplate:
+    """The columns a render needs, detached from any session"""
+
+    id: str
+    name: str
+    engine: models.TemplatingEngineEnum
+    content: Optional[str]
+    data: Optional[Any]
+    compiled_css: Optional[str]
+    compiled_css_hash: Optional[str]
+    content_hash: Optional[str]
+    compiled_template: Optional[str]
+    variables: Optional[List[str]]
+    user_id: int
+
+    @classmethod
+    def from_model(cls, template: models.Template) -> "CachedTemplate":
+        return cls(**{name: getattr(template, name) for name in cls.__dataclass_fields__})
+
+
+class TemplateCache:
+    def __init__(self, ttl: float = TEMPLATE_CACHE_TTL, max_entries: int = TEMPLATE_CACHE_MAX_ENTRIES):
+        self.enabled = ttl > 0
+        self._entries = TTLCache(ttl, max_entries=max_entries)
+        # Bumped on every invalidation, so a row read before one isn't cached after it
+        self._generation = itertools.count()
+        self._current = next(self._generation)
+        self.hits = 0
+        self.misses = 0
+        pubsub.subscribe(CHANNEL, self._on_invalidate)
+
+    async def get(self, db: AsyncSession, user_id: int, template_id: str) -> Optional[CachedTemplate]:
+        """The user's template, or None if it doesn't exist"""
+        key = (user_id, template_id)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        generation = self._current
+        result = await db.execute(
+            select(models.Template)
+            .where(models.Template.id == template_id)
+            .where(models.Template.user_id == user_id)
+        )
+        template = result.scalars().first()
+        if template is None:
+            return None
+
+        cached = CachedTemplate.from_model(template)
+        if self.enabled and generation == self._current:
+            self._entries.set(key, cached)
+        return cached
+
+    def invalidate(self, user_id: int, template_id: str):
+        """Drop the template here and in the other worker processes"""
+        pubsub.publish(CHANNEL, {"user_id": user_id, "template_id": template_id})
+
+    def _on_invalidate(self, message: dict):
+        self._current = next(self._generation)
+        self._entries.pop((message.get("user_id"), message.get("template_id")))
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+template_cache = TemplateCache()
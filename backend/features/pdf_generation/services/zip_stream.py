@@ -0,0 +1,41 @@
+"""
+Streaming ZIP archives built from async sources
+"""
+import io
+import zipfile
+from typing import AsyncIterator, Tuple
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(files: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive chunk by chunk as each (name, content) pair arrives"""
+    buffer = _ChunkBuffer()
+    # PDFs are already compressed, so entries are stored as-is
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, content in files:
+            archive.writestr(name, content)
+            yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,257 @@
+"""
+Render job worker - pulls queued jobs from the database and renders them
+
+Run from the backend directory:
+    python -m features.pdf_generation.worker --processes 2 --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.future import select
+
+import models
+from core.config import (
+    RENDER_JOB_RESULT_DIR,
+    RENDER_JOB_WORKER_PROCESSES,
+    RENDER_JOB_WORKER_CONCURRENCY,
+    RENDER_JOB_POLL_INTERVAL,
+    RENDER_JOB_STALE_AFTER,
+    RENDER_JOB_MAX_ATTEMPTS,
+    RENDER_JOB_RETRY_DELAY,
+    RENDER_JOB_RETENTION,
+)
+from convertors.daemon import converter_pool, mako_pool
+from core.database import async_session
+from features.pdf_generation.services.admission import RenderOverloaded
+from features.pdf_generation.services.playwright_manager import PlaywrightManager
+
+logger = logging.getLogger(__name__)
+
+Job = models.RenderJob
+Status = models.RenderJobStatusEnum
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def requeue_stale_jobs():
+    """Hand jobs whose worker died mid-render back to the queue, or fail them after too many attempts"""
+    cutoff = _now() - timedelta(seconds=RENDER_JOB_STALE_AFTER)
+    stale = (Job.status == Status.RUNNING, Job.started_at < cutoff)
+    async with async_session() as db:
+        await db.execute(
+            update(Job)
+            .where(*stale, Job.attempts < RENDER_JOB_MAX_ATTEMPTS)
+            .values(status=Status.QUEUED, started_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= RENDER_JOB_MAX_ATTEMPTS)
+            .values(status=Status.FAILED, error="Worker stopped responding", finished_at=_now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+async def delete_expired_jobs(batch_size: int = 500) -> int:
+    """Delete finished jobs older than RENDER_JOB_RETENTION along with their result files"""
+    if RENDER_JOB_RETENTION <= 0:
+        return 0
+    cutoff = _now() - timedelta(seconds=RENDER_JOB_RETENTION)
+    deleted = 0
+    async with async_session() as db:
+        while True:
+            result = await db.execute(
+                select(Job.id, Job.result_path)
+                .where(Job.status.in_((Status.DONE, Status.FAILED)), Job.finished_at < cutoff)
+                .limit(batch_size)
+            )
+            expired = result.all()
+            if not expired:
+                return deleted
+            # Files first: a row without its file is harmless, a file without its row is never cleaned up
+            for _, result_path in expired:
+                if result_path:
+                    Path(result_path).unlink(missing_ok=True)
+            await db.execute(
+                delete(Job)
+                .where(Job.id.in_([job_id for job_id, _ in expired]))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            deleted += len(expired)
+
+
+async def claim_job() -> Optional[models.RenderJob]:
+    """Atomically move the oldest claimable queued job to running and return it"""
+    async with async_session() as db:
+        while True:
+            result = await db.execute(
+                select(Job.id)
+                .where(Job.status == Status.QUEUED)
+                .where(or_(Job.available_at.is_(None), Job.available_at <= _now()))
+                .order_by(Job.created_at)
+                .limit(1)
+            )
+            job_id = result.scalars().first()
+            if job_id is None:
+                return None
+
+            # Only one worker's UPDATE can match while the job is still queued
+            claimed = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == Status.QUEUED)
+                .values(status=Status.RUNNING, started_at=_now(), attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if claimed.rowcount == 1:
+                return await db.get(Job, job_id)
+
+
+async def render_job(job: models.RenderJob):
+    result_dir = Path(RENDER_JOB_RESULT_DIR)
+    result_dir.mkdir(parents=True, exist_ok=True)
+    path = result_dir / f"{job.id}.pdf"
+    tmp_path = result_dir / f"{job.id}.pdf.tmp"
+
+    playwright_manager = await PlaywrightManager.get_instance()
+    try:
+        with open(tmp_path, "wb") as result_file:
+            async for chunk in playwright_manager.generate_pdf_stream(
+                content=job.content,
+                engine=job.engine,
+                data=job.data,
+                compiled_css=job.compiled_css,
+                cache_namespace=job.template_id,
+                compiled_template=job.compiled_template
+            ):
+                result_file.write(chunk)
+        os.replace(tmp_path, path)
+        values = {"status": Status.DONE, "result_path": str(path), "error": None, "finished_at": _now()}
+    except RenderOverloaded:
+        # Not the job's fault; put it back, out of reach until the load has had time to drain
+        logger.warning(f"Render job {job.id} shed by admission control, requeueing in {RENDER_JOB_RETRY_DELAY}s")
+        tmp_path.unlink(missing_ok=True)
+        values = {
+            "status": Status.QUEUED,
+            "started_at": None,
+            "attempts": Job.attempts - 1,
+            "available_at": _now() + timedelta(seconds=RENDER_JOB_RETRY_DELAY),
+        }
+    except Exception as e:
+        logger.exception(f"Render job {job.id} failed")
+        tmp_path.unlink(missing_ok=True)
+        values = {"status": Status.FAILED, "error": str(e), "finished_at": _now()}
+
+    async with async_session() as db:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+async def _process_jobs(stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            job = await claim_job()
+        except Exception:
+            logger.exception("Failed to claim a render job")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=RENDER_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        await render_job(job)
+
+
+async def _sweep_stale_jobs(stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            await requeue_stale_jobs()
+        except Exception:
+            logger.exception("Failed to requeue stale render jobs")
+        try:
+            await delete_expired_jobs()
+        except Exception:
+            logger.exception("Failed to delete expired render jobs")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=RENDER_JOB_STALE_AFTER / 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(concurrency: int = RENDER_JOB_WORKER_CONCURRENCY):
+    """Render jobs until SIGINT/SIGTERM, `concurrency` at a time"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    playwright_manager = await PlaywrightManager.get_instance()
+    await playwright_manager.warm_up()
+    logger.info(f"Render worker {os.getpid()} started with concurrency {concurrency}")
+    try:
+        await asyncio.gather(
+            _sweep_stale_jobs(stop),
+            *(_process_jobs(stop) for _ in range(concurrency))
+        )
+    finally:
+        await PlaywrightManager.shutdown()
+        await asyncio.gather(converter_pool.aclose(), mako_pool.aclose())
+
+
+def _run_process(concurrency: int):
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render queued PDF jobs")
+    parser.add_argument("--processes", type=int, default=RENDER_JOB_WORKER_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=RENDER_JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency)
+        return
+
+    processes = [
+        multiprocessing.Process(target=_run_process, args=(args.concurrency,), name=f"render-worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Treat SIGTERM like Ctrl+C so the workers get shut down with us
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,7 @@ class TemplatingEngineEnum(str, Enum):
     JSX = "jsx"
     HTML = "html"
     VUE = "vue"
+    MAKO = "mako"
 
 
 class Template(Base):
@@ -48,6 +49,13 @@ class Template(Base):
     engine = Column(SQLEnum(TemplatingEngineEnum), default=TemplatingEngineEnum.HTML)
     content = Column(Text)
     data = Column(JSON)
+    # Tailwind stylesheet compiled at save time, keyed by a hash of `content`
+    compiled_css = Column(Text, nullable=True)
+    compiled_css_hash = Column(String(64), nullable=True)
+    # Render code and referenced data paths from save-time analysis, keyed by `content_hash`
+    content_hash = Column(String(64), nullable=True)
+    compiled_template = Column(Text, nullable=True)
+    variables = Column(JSON, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -70,6 +78,38 @@ class ApiKey(Base):
     user = relationship("User", back_populates="api_keys")
 
 
+class RenderJobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class RenderJob(Base):
+    __tablename__ = "render_jobs"
+
+    id = Column(String(21), primary_key=True, default=lambda: generate(), index=True)
+    status = Column(SQLEnum(RenderJobStatusEnum), default=RenderJobStatusEnum.QUEUED, nullable=False, index=True)
+    # Snapshot of what to render, taken at submission time
+    template_id = Column(String(10), ForeignKey("templates.id", ondelete="set null"), nullable=True)
+    engine = Column(String(10), nullable=False)
+    content = Column(Text, nullable=False)
+    data = Column(JSON)
+    compiled_css = Column(Text, nullable=True)
+    compiled_template = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    result_path = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # Jobs shed under load wait until then before they can be claimed again
+    available_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="cascade"), nullable=False)
+
+
 '''
 For Future
 class TemplateStats(Base):
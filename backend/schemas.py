@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List, Union
 from fastapi_users import schemas
 from enum import Enum
+from core.config import BATCH_MAX_ROWS
 
 
 # API Key Schemas (defined early to avoid forward reference issues)
@@ -97,6 +98,7 @@ class TemplatingEngineEnum(str, Enum):
     JSX = "jsx"
     HTML = "html"
     VUE = "vue"
+    MAKO = "mako"
 
 class TemplateBase(BaseModel):
     id: Optional[str] = None
@@ -116,6 +118,7 @@ class TemplateUpdate(BaseModel):
 
 class Template(TemplateBase):
     #user_id: int
+    variables: Optional[List[str]] = None  # Data paths the template requires; ones it tests first are optional
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -128,8 +131,46 @@ class PDFRequest(BaseModel):
     content: Optional[str] = None
     is_jsx: Optional[bool] = None  # Default to false for backward compatibility
     is_vue: Optional[bool] = None  # Default to false for backward compatibility
+    is_mako: Optional[bool] = None
     data: Optional[dict] = None
 
+class BatchOutputEnum(str, Enum):
+    ZIP = "zip"
+    MERGED = "merged"
+
+class BatchPDFRequest(BaseModel):
+    data: List[Dict[str, Any]]
+    output: BatchOutputEnum = BatchOutputEnum.ZIP
+
+    @field_validator('data')
+    @classmethod
+    def check_batch_size(cls, v):
+        if not v:
+            raise ValueError('At least one data row is required')
+        if len(v) > BATCH_MAX_ROWS:
+            raise ValueError(f'A batch can contain at most {BATCH_MAX_ROWS} rows')
+        return v
+
+class RenderJobStatusEnum(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class RenderJobRead(BaseModel):
+    id: str
+    status: RenderJobStatusEnum
+    template_id: Optional[str] = None
+    engine: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class GuestUserResponse(BaseModel):
     id: int
     email: str
@@ -0,0 +1,96 @@
+"""
+Test setup: isolated settings, applied before any app module reads them
+
+Run from the backend directory:
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+TEST_DIR = Path(tempfile.mkdtemp(prefix="pdfgen-tests-"))
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DIR / 'test.db'}",
+    "PUBSUB_ENABLED": "false",
+    "PLAYWRIGHT_EAGER_START": "false",
+    # Every render reaches the (fake) browser unless a test brings its own cache
+    "PDF_CACHE_ENABLED": "false",
+    "PDF_CACHE_DIR": str(TEST_DIR / "pdf-cache"),
+    "MAKO_MODULE_DIR": str(TEST_DIR / "mako"),
+    "RENDER_JOB_RESULT_DIR": str(TEST_DIR / "render-jobs"),
+    "CONVERTER_POOL_SIZE": "2",
+})
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on a freshly created schema"""
+    from core.database import Base, async_session, engine
+    import models  # noqa: F401  (registers the tables)
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_session() as session:
+        yield session
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user(db):
+    import models
+
+    user = models.User(email="owner@example.com", hashed_password="x", is_active=True, is_verified=True)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """A render admission of its own, so no semaphore outlives the test's event loop"""
+    from features.pdf_generation.services import playwright_manager
+    from features.pdf_generation.services.admission import RenderAdmission
+
+    admission = RenderAdmission(max_in_flight=8, max_queue=16, deadline_ms=5000)
+    monkeypatch.setattr(playwright_manager, "render_admission", admission)
+    return admission
+
+
+@pytest.fixture
+async def manager(admission, monkeypatch):
+    """The app's PlaywrightManager, backed by a fake browser"""
+    from features.pdf_generation.services.playwright_manager import PlaywrightManager
+    from tests.fakes import fake_manager
+
+    manager = await fake_manager()
+    monkeypatch.setattr(PlaywrightManager, "_instance", manager)
+    yield manager
+    await manager.cleanup()
+
+
+@pytest.fixture
+async def client(user, manager):
+    """An API client signed in as `user`"""
+    import httpx
+    from app import app
+    from core.auth import current_active_user
+
+    app.dependency_overrides[current_active_user] = lambda: user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
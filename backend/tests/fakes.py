@@ -0,0 +1,190 @@
+"""
+In-memory stand-ins for the Playwright objects the render path uses
+
+They record what was done to them and produce a fake PDF from the loaded
+document, so the pooling, batching and streaming code can be exercised
+without a Chromium install.
+"""
+import asyncio
+import base64
+from typing import Callable, Dict, List, Optional
+
+
+def default_pdf(html: Optional[str]) -> bytes:
+    return b"%PDF-fake\n" + (html or "").encode("utf-8")
+
+
+class FakeCDPSession:
+    def __init__(self, page: "FakePage"):
+        self._page = page
+        self._stream = b""
+        self.detached = False
+
+    async def send(self, method: str, params: Optional[dict] = None) -> dict:
+        params = params or {}
+        if method == "Page.printToPDF":
+            self._stream = await self._page.pdf()
+            return {"stream": "stream-1"}
+        if method == "IO.read":
+            chunk, self._stream = self._stream[:params["size"]], self._stream[params["size"]:]
+            return {"data": base64.b64encode(chunk).decode("ascii"), "base64Encoded": True, "eof": not self._stream}
+        if method == "IO.close":
+            return {}
+        if method == "SystemInfo.getProcessInfo":
+            return {"processInfo": []}
+        raise NotImplementedError(method)
+
+    async def detach(self):
+        self.detached = True
+
+
+class FakePage:
+    def __init__(self, context: "FakeContext"):
+        self.context = context
+        self.html: Optional[str] = None
+        self.url = "about:blank"
+        self.closed = False
+        self.resets = 0
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def evaluate(self, script: str, arg=None):
+        from features.pdf_generation.services.tailwind_compiler import TAILWIND_CSS_EXTRACT_JS
+
+        self.context.browser.check()
+        if script == TAILWIND_CSS_EXTRACT_JS:
+            return self.context.browser.stylesheet
+        if "document.body.innerHTML" in script:
+            self.html = f"<body>{arg}</body>"
+            return None
+        if "localStorage.clear" in script:
+            self.resets += 1
+            return None
+        # The render readiness check
+        return True
+
+    async def goto(self, url: str):
+        self.context.browser.check()
+        self.url = url
+        self.html = None
+
+    async def set_content(self, html: str, wait_until: str = None, timeout: float = None):
+        self.context.browser.check()
+        self.context.browser.loaded.append(html)
+        self.html = html
+
+    async def pdf(self, **options) -> bytes:
+        self.context.browser.check()
+        await asyncio.sleep(self.context.browser.render_delay)
+        self.context.browser.printed.append(self.html)
+        return self.context.browser.pdf_for(self.html)
+
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+        self.pages: List[FakePage] = []
+        self.routes: Dict[str, Callable] = {}
+        self.init_scripts: List[str] = []
+        self.closed = False
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def clear_cookies(self):
+        pass
+
+    async def route(self, url: str, handler: Callable):
+        self.routes[url] = handler
+
+    async def add_init_script(self, script: str = None):
+        self.init_scripts.append(script)
+
+    async def new_cdp_session(self, page: FakePage) -> FakeCDPSession:
+        return FakeCDPSession(page)
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            page.closed = True
+
+
+class FakeBrowser:
+    def __init__(
+        self,
+        pdf_for: Callable[[Optional[str]], bytes] = default_pdf,
+        render_delay: float = 0,
+        stylesheet: str = ".p-4{padding:1rem}",
+    ):
+        self.pdf_for = pdf_for
+        self.render_delay = render_delay
+        # What Tailwind's browser build would have generated
+        self.stylesheet = stylesheet
+        self.contexts: List[FakeContext] = []
+        # Documents loaded into its pages, and those printed, in order
+        self.loaded: List[str] = []
+        self.printed: List[Optional[str]] = []
+        self.closed = False
+        self.failure: Optional[Exception] = None
+        self._handlers: Dict[str, List[Callable]] = {}
+
+    def check(self):
+        """Raise the failure set by the test, as a crashed browser would on every call"""
+        if self.failure is not None:
+            raise self.failure
+
+    def on(self, event: str, handler: Callable):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def disconnect(self):
+        for handler in self._handlers.get("disconnected", []):
+            handler(self)
+
+    async def new_context(self) -> FakeContext:
+        self.check()
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def new_browser_cdp_session(self) -> FakeCDPSession:
+        return FakeCDPSession(None)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self, **browser_options):
+        self.browser_options = browser_options
+        self.launched: List[FakeBrowser] = []
+
+    async def launch(self, headless: bool = True) -> FakeBrowser:
+        browser = FakeBrowser(**self.browser_options)
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self, **browser_options):
+        self.chromium = FakeChromium(**browser_options)
+
+    async def stop(self):
+        pass
+
+
+async def fake_manager(browsers: int = 1, **browser_options):
+    """A started PlaywrightManager whose browsers are FakeBrowsers"""
+    from features.pdf_generation.services.playwright_manager import PlaywrightManager
+    from features.pdf_generation.services.supervisor import BrowserSupervisor
+
+    manager = PlaywrightManager()
+    manager._playwright = FakePlaywright(**browser_options)
+    manager._tailwind_script = b"/* tailwind */"
+    manager._workers = [manager._new_worker(index) for index in range(browsers)]
+    await asyncio.gather(*(worker.start() for worker in manager._workers))
+    manager._supervisor = BrowserSupervisor(manager)
+    manager._initialized = True
+    return manager
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from core.config import RENDER_RETRY_AFTER
+from features.pdf_generation.services import playwright_manager
+from features.pdf_generation.services.admission import RenderAdmission, RenderOverloaded
+
+pytestmark = pytest.mark.anyio
+
+
+async def hold(admission: RenderAdmission, release: asyncio.Event):
+    async with admission.admit():
+        await release.wait()
+
+
+async def settle(admission: RenderAdmission, in_flight: int, waiting: int):
+    """Let the background renders reach their slot or the queue"""
+    for _ in range(100):
+        if (admission.in_flight, admission.waiting) == (in_flight, waiting):
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError(admission.stats())
+
+
+async def test_renders_within_the_limit_are_admitted():
+    admission = RenderAdmission(max_in_flight=2, max_queue=0, deadline_ms=1000)
+    async with admission.admit():
+        async with admission.admit():
+            assert admission.stats()["in_flight"] == 2
+    assert admission.stats() == {"in_flight": 0, "waiting": 0, "rejected": 0, "max_in_flight": 2, "max_queue": 0}
+
+
+async def test_render_beyond_the_queue_is_rejected_immediately():
+    admission = RenderAdmission(max_in_flight=1, max_queue=1, deadline_ms=5000)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(admission, release))
+    queued = asyncio.create_task(hold(admission, release))
+    await settle(admission, in_flight=1, waiting=1)
+
+    with pytest.raises(RenderOverloaded, match="queue is full"):
+        async with admission.admit():
+            pass
+    assert admission.rejected == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert admission.in_flight == 0
+
+
+async def test_render_waiting_past_the_deadline_is_rejected():
+    admission = RenderAdmission(max_in_flight=1, max_queue=5, deadline_ms=20)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(admission, release))
+    await settle(admission, in_flight=1, waiting=0)
+
+    with pytest.raises(RenderOverloaded, match="Timed out") as error:
+        async with admission.admit():
+            pass
+    assert error.value.retry_after == RENDER_RETRY_AFTER
+    assert admission.waiting == 0
+
+    release.set()
+    await running
+
+
+async def test_saturated_render_path_answers_503(client, monkeypatch):
+    admission = RenderAdmission(max_in_flight=1, max_queue=0, deadline_ms=1000)
+    monkeypatch.setattr(playwright_manager, "render_admission", admission)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(admission, release))
+    await settle(admission, in_flight=1, waiting=0)
+
+    response = await client.post("/api/v1/generate-pdf", json={"content": "<p>shed</p>"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(RENDER_RETRY_AFTER)
+    assert "try again later" in response.json()["detail"]
+
+    release.set()
+    await running
+    response = await client.post("/api/v1/generate-pdf", json={"content": "<p>shed</p>"})
+    assert response.status_code == 200
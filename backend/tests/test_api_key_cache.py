@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+from core.api_key_cache import ApiKeyCache, CachedApiKey, api_key_cache
+from core.database import async_session
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_key(client) -> dict:
+    response = await client.post("/api/v1/api-keys", json={"name": "ci"})
+    assert response.status_code == 201
+    return response.json()
+
+
+async def external_templates(client, key: str):
+    return await client.get("/api/v1/external/templates", headers={"Authorization": f"Bearer {key}"})
+
+
+async def last_used(key_id: int):
+    async with async_session() as db:
+        return (await db.get(models.ApiKey, key_id)).last_used
+
+
+async def test_validated_key_is_served_from_memory(client):
+    api_key = await create_key(client)
+    assert (await external_templates(client, api_key["key"])).status_code == 200
+    assert api_key_cache.get(api_key["key"]) is not None
+
+    # The key row is no longer read while the entry is fresh
+    async with async_session() as db:
+        row = await db.get(models.ApiKey, api_key["id"])
+        row.key = "moved-elsewhere"
+        await db.commit()
+    assert (await external_templates(client, api_key["key"])).status_code == 200
+
+
+async def test_unknown_key_is_rejected(client):
+    response = await external_templates(client, "not-a-key")
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("revoke", ["deactivate", "delete"])
+async def test_revoked_key_stops_working_immediately(client, revoke):
+    api_key = await create_key(client)
+    assert (await external_templates(client, api_key["key"])).status_code == 200
+
+    if revoke == "deactivate":
+        response = await client.put(f"/api/v1/api-keys/{api_key['id']}", json={"is_active": False})
+        assert response.status_code == 200
+    else:
+        assert (await client.delete(f"/api/v1/api-keys/{api_key['id']}")).status_code == 204
+
+    assert api_key_cache.get(api_key["key"]) is None
+    assert (await external_templates(client, api_key["key"])).status_code == 401
+
+
+async def test_last_used_is_written_in_batches(client):
+    api_key = await create_key(client)
+    await external_templates(client, api_key["key"])
+    await external_templates(client, api_key["key"])
+    assert await last_used(api_key["id"]) is None
+
+    await api_key_cache.flush()
+    assert await last_used(api_key["id"]) is not None
+
+
+async def test_failed_flush_keeps_the_timestamps(db, monkeypatch):
+    from core import api_key_cache as module
+
+    cache = ApiKeyCache(ttl=60)
+    cache.touch(1)
+
+    def broken_session():
+        raise OSError("database is down")
+
+    monkeypatch.setattr(module, "async_session", broken_session)
+    with pytest.raises(OSError):
+        await cache.flush()
+    assert 1 in cache._last_used
+
+
+async def test_revoking_a_user_drops_all_their_keys(user):
+    cache = ApiKeyCache(ttl=60)
+    cache.set("key-1", CachedApiKey(1, None, user), cache.generation)
+    cache.set("key-2", CachedApiKey(2, None, user), cache.generation)
+    cache.revoke_user(user.id)
+    assert cache.get("key-1") is None and cache.get("key-2") is None
+
+
+async def test_key_read_before_a_revocation_is_not_cached(user):
+    cache = ApiKeyCache(ttl=60)
+    generation = cache.generation
+    cache.revoke_key("key-1")
+    cache.set("key-1", CachedApiKey(1, None, user), generation)
+    assert cache.get("key-1") is None
+
+
+def test_cached_key_expires():
+    entry = CachedApiKey(1, datetime.now() - timedelta(seconds=1), None)
+    assert entry.expired
+    assert not CachedApiKey(1, None, None).expired
@@ -0,0 +1,55 @@
+import pytest
+
+from features.pdf_generation.services.assets import TAILWIND_SCRIPT_URL, load_tailwind_script, serve_tailwind
+from tests.fakes import FakeBrowser, fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRoute:
+    def __init__(self):
+        self.fulfilled = None
+
+    async def fulfill(self, **response):
+        self.fulfilled = response
+
+
+def test_load_tailwind_script(tmp_path):
+    script = tmp_path / "tailwind.js"
+    script.write_bytes(b"console.log('tailwind')")
+    assert load_tailwind_script(str(script)) == b"console.log('tailwind')"
+
+
+def test_missing_tailwind_build_falls_back_to_the_cdn(tmp_path):
+    assert load_tailwind_script(str(tmp_path / "missing.js")) is None
+
+
+async def test_tailwind_requests_are_answered_from_memory():
+    context = await FakeBrowser().new_context()
+    await serve_tailwind(context, b"/* bundled */")
+
+    route = FakeRoute()
+    await context.routes[TAILWIND_SCRIPT_URL](route)
+    assert route.fulfilled["status"] == 200
+    assert route.fulfilled["body"] == b"/* bundled */"
+    assert route.fulfilled["content_type"].startswith("application/javascript")
+
+
+async def test_nothing_is_intercepted_without_a_bundled_build():
+    context = await FakeBrowser().new_context()
+    await serve_tailwind(context, None)
+    assert context.routes == {}
+
+
+async def test_every_pooled_context_serves_tailwind():
+    manager = await fake_manager(browsers=2)
+    contexts = [context for browser in manager._playwright.chromium.launched for context in browser.contexts]
+    assert contexts
+    assert all(TAILWIND_SCRIPT_URL in context.routes for context in contexts)
+    await manager.cleanup()
+
+
+def test_rendered_documents_reference_the_intercepted_url():
+    from features.pdf_generation.services.playwright_manager import PlaywrightManager
+
+    assert TAILWIND_SCRIPT_URL in PlaywrightManager()._wrap_html("<p>x</p>")
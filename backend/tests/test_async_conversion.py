@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from convertors.daemon import ConverterPool
+from convertors.wrappers import JSXConverter
+
+pytestmark = pytest.mark.anyio
+
+# Busy-waits inside the node process for about 300ms
+SLOW_TEMPLATE = "<p>{(() => { const end = Date.now() + 300; while (Date.now() < end) {} return 'done'; })()}</p>"
+
+
+@pytest.fixture
+def pool():
+    pool = ConverterPool(size=2, timeout=5)
+    yield pool
+    pool.close()
+
+
+async def test_event_loop_keeps_running_during_a_conversion(pool):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    html = await JSXConverter(pool).aconvert(SLOW_TEMPLATE)
+    task.cancel()
+    assert html == "<p>done</p>"
+    assert ticks >= 10
+
+
+async def test_conversions_run_in_parallel_up_to_the_pool_size(pool):
+    # Start both processes so only the conversions themselves are timed
+    await asyncio.gather(pool.aconvert("jsx", "<p/>"), pool.aconvert("jsx", "<p/>"))
+    started = time.monotonic()
+    results = await asyncio.gather(*(JSXConverter(pool).aconvert(SLOW_TEMPLATE) for _ in range(2)))
+    assert results == ["<p>done</p>"] * 2
+    assert time.monotonic() - started < 0.55
+
+
+async def test_conversion_errors_surface_to_the_caller():
+    pool = ConverterPool(size=1, timeout=0.1)
+    try:
+        with pytest.raises(Exception, match="JSX conversion failed: Conversion timed out"):
+            await JSXConverter(pool).aconvert(SLOW_TEMPLATE)
+    finally:
+        await pool.aclose()
@@ -0,0 +1,144 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from pydantic import ValidationError
+
+import schemas
+from core.config import BATCH_MAX_ROWS
+from features.pdf_generation.services import playwright_manager
+from features.pdf_generation.services.assets import TAILWIND_SCRIPT_URL
+from features.pdf_generation.services.playwright_manager import PDFTooLarge
+from features.pdf_generation.services.zip_stream import stream_zip
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+async def collect(chunks) -> list:
+    return [chunk async for chunk in chunks]
+
+
+def test_batch_needs_between_one_and_the_maximum_rows():
+    assert schemas.BatchPDFRequest(data=[{}]).output == schemas.BatchOutputEnum.ZIP
+    with pytest.raises(ValidationError):
+        schemas.BatchPDFRequest(data=[])
+    with pytest.raises(ValidationError):
+        schemas.BatchPDFRequest(data=[{}] * (BATCH_MAX_ROWS + 1))
+
+
+async def test_zip_is_streamed_entry_by_entry():
+    async def files():
+        for index in range(3):
+            yield f"document-{index}.pdf", f"%PDF-{index}".encode()
+
+    chunks = await collect(stream_zip(files()))
+    assert len(chunks) > 1
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["document-0.pdf", "document-1.pdf", "document-2.pdf"]
+        assert archive.read("document-2.pdf") == b"%PDF-2"
+
+
+async def test_batch_renders_one_pdf_per_row_on_one_page(admission):
+    manager = await fake_manager()
+    rows = [{"name": name} for name in ("a", "b", "c")]
+    pdfs = await collect(manager.generate_pdf_batch("<p>${name}</p>", "mako", rows, compiled_css=""))
+
+    assert [pdf.split(b"<p>")[1][:1] for pdf in pdfs] == [b"a", b"b", b"c"]
+    browser = manager._playwright.chromium.launched[0]
+    # The first row loads the document, the rest only swap its body
+    assert len(browser.loaded) == 1
+    await manager.cleanup()
+
+
+async def test_batch_stylesheet_covers_classes_from_every_row(admission):
+    manager = await fake_manager(stylesheet=".text-red-600{}.text-green-600{}")
+    rows = [{"tone": "text-red-600"}, {"tone": "text-green-600"}]
+    pdfs = await collect(manager.generate_pdf_batch("<p class='${tone}'>x</p>", "mako", rows))
+
+    browser = manager._playwright.chromium.launched[0]
+    stylesheet_source, first_row = browser.loaded
+    # The class only the second row uses is compiled up front with the first
+    assert "text-red-600" in stylesheet_source and "text-green-600" in stylesheet_source
+    assert "<style>.text-red-600{}.text-green-600{}</style>" in first_row
+    assert b"text-green-600" in pdfs[1]
+    await manager.cleanup()
+
+
+async def test_batch_falls_back_to_the_jit_when_precompilation_fails(admission):
+    manager = await fake_manager(stylesheet="")
+    rows = [{"tone": "text-red-600"}, {"tone": "text-green-600"}]
+    pdfs = await collect(manager.generate_pdf_batch("<p class='${tone}'>x</p>", "mako", rows))
+
+    browser = manager._playwright.chromium.launched[0]
+    # Every row is loaded in full under the JIT instead of swapped
+    assert len(pdfs) == 2 and len(browser.loaded) == 3
+    assert all(TAILWIND_SCRIPT_URL in html for html in browser.loaded[1:])
+    assert "text-green-600" in browser.loaded[-1]
+    await manager.cleanup()
+
+
+async def test_plain_html_is_rendered_once_per_batch(admission):
+    manager = await fake_manager()
+    pdfs = await collect(manager.generate_pdf_batch("<p>static</p>", "html", [{}, {}, {}], compiled_css=""))
+    assert len(set(pdfs)) == 1 and len(pdfs) == 3
+    assert len(manager._playwright.chromium.launched[0].printed) == 1
+    await manager.cleanup()
+
+
+async def test_oversized_row_fails_the_batch(admission, monkeypatch):
+    monkeypatch.setattr(playwright_manager, "MAX_PDF_SIZE", 200)
+    manager = await fake_manager(pdf_for=lambda html: b"%PDF-" + b"x" * (500 if "oversized" in html else 10))
+    rows = [{"text": "short"}, {"text": "oversized"}]
+    batch = manager.generate_pdf_batch("<p>${text}</p>", "mako", rows, compiled_css="")
+
+    assert (await batch.__anext__()).startswith(b"%PDF")
+    with pytest.raises(PDFTooLarge, match="row 2"):
+        await batch.__anext__()
+    await manager.cleanup()
+
+
+async def test_row_conversion_is_bounded(monkeypatch):
+    monkeypatch.setattr(playwright_manager, "BATCH_CONVERT_CONCURRENCY", 2)
+    manager = playwright_manager.PlaywrightManager()
+    running = peak = 0
+
+    async def convert(content, engine, data, page, compiled_template):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return f"<p>{data['n']}</p>"
+
+    monkeypatch.setattr(manager, "_convert_content", convert)
+    bodies = await manager._convert_rows("", "jsx", [{"n": n} for n in range(6)], None, None)
+    assert bodies == [f"<p>{n}</p>" for n in range(6)]
+    assert peak == 2
+
+
+async def test_merged_pdf_is_streamed_as_one_document(admission, monkeypatch):
+    monkeypatch.setattr(playwright_manager, "PDF_STREAM_CHUNK_SIZE", 16)
+    manager = await fake_manager()
+    chunks = await collect(manager.generate_merged_pdf("<p>${n}</p>", "mako", [{"n": 1}, {"n": 2}], compiled_css=""))
+
+    assert len(chunks) > 1
+    pdf = b"".join(chunks)
+    assert pdf.startswith(b"%PDF")
+    assert pdf.count(b"<section") == 2
+    assert b'<section style="break-after: page;"><p>1</p>' in pdf
+    await manager.cleanup()
+
+
+async def test_merged_pdf_is_limited_as_a_whole(admission, monkeypatch):
+    monkeypatch.setattr(playwright_manager, "PDF_STREAM_CHUNK_SIZE", 64)
+    monkeypatch.setattr(playwright_manager, "MAX_PDF_SIZE", 1000)
+    # Each page adds 300 bytes to the document
+    manager = await fake_manager(pdf_for=lambda html: b"%PDF-" + b"x" * 300 * html.count("<section"))
+
+    pdf = b"".join(await collect(manager.generate_merged_pdf("<p>${n}</p>", "mako", [{"n": 1}] * 3, compiled_css="")))
+    assert len(pdf) < 1000
+    with pytest.raises(PDFTooLarge):
+        await collect(manager.generate_merged_pdf("<p>${n}</p>", "mako", [{"n": 1}] * 4, compiled_css=""))
+    await manager.cleanup()
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_manager_starts_every_browser():
+    manager = await fake_manager(browsers=3)
+    assert len(manager._playwright.chromium.launched) == 3
+    assert [worker.index for worker in manager.workers] == [0, 1, 2]
+    await manager.cleanup()
+
+
+async def test_least_busy_browser_is_picked():
+    manager = await fake_manager(browsers=2)
+    first, second = manager.workers
+    first.in_flight = 2
+    assert manager._pick_worker() is second
+    second.in_flight = 3
+    assert manager._pick_worker() is first
+    await manager.cleanup()
+
+
+async def test_draining_and_disconnected_browsers_are_skipped():
+    manager = await fake_manager(browsers=3)
+    first, second, third = manager.workers
+    first.draining = True
+    second.connected = False
+    third.in_flight = 5
+    assert manager._pick_worker() is third
+
+    # With nothing accepting, the least busy browser still gets the render
+    third.draining = True
+    assert manager._pick_worker() is first
+    await manager.cleanup()
+
+
+async def test_concurrent_renders_spread_across_browsers(admission):
+    manager = await fake_manager(browsers=2, render_delay=0.05)
+    pdfs = await asyncio.gather(*(manager.generate_pdf(f"<p>spread {i}</p>") for i in range(4)))
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+    assert [len(browser.printed) for browser in manager._playwright.chromium.launched] == [2, 2]
+    await manager.cleanup()
@@ -0,0 +1,71 @@
+import pytest
+
+from convertors.daemon import ConverterError, ConverterPool
+
+
+@pytest.fixture
+def pool():
+    pool = ConverterPool(size=1, timeout=2)
+    yield pool
+    pool.close()
+
+
+def test_process_is_reused_between_conversions(pool):
+    assert pool.convert("jsx", "<p>{name}</p>", {"name": "one"}) == "<p>one</p>"
+    first, = pool._processes
+    assert pool.convert("vue", "<p>{{ name }}</p>", {"name": "two"}) == "<p>two</p>"
+    assert pool._processes == {first}
+
+
+def test_template_error_keeps_the_process(pool):
+    with pytest.raises(ConverterError, match="Unknown engine"):
+        pool.convert("svelte", "<p/>")
+    first, = pool._processes
+    assert first.alive
+    assert pool.convert("jsx", "<p>ok</p>") == "<p>ok</p>"
+    assert pool._processes == {first}
+
+
+def test_runaway_template_is_killed_and_replaced():
+    pool = ConverterPool(size=1, timeout=0.5)
+    try:
+        with pytest.raises(ConverterError, match="timed out"):
+            pool.convert("jsx", "<p>{(() => { while (true) {} })()}</p>")
+        assert not pool._processes
+        assert pool.convert("jsx", "<p>after</p>") == "<p>after</p>"
+    finally:
+        pool.close()
+
+
+def test_crashed_process_is_replaced(pool):
+    pool.convert("jsx", "<p/>")
+    first, = pool._processes
+    first.kill()
+    assert pool.convert("jsx", "<p>again</p>") == "<p>again</p>"
+    assert first not in pool._processes
+
+
+def test_analyze_returns_render_code_and_paths(pool):
+    analysis = pool.analyze("jsx", "<p>{customer.name}</p>")
+    assert analysis["compiled"]
+    assert analysis["variables"] == ["customer.name"]
+
+
+def test_close_stops_every_process():
+    pool = ConverterPool(size=2, timeout=2)
+    first = pool._checkout()
+    second = pool._checkout()
+    pool._checkin(first)
+    pool._checkin(second)
+    pool.close(timeout=2)
+    assert not first.alive and not second.alive
+    assert pool._started == 0
+
+
+@pytest.mark.anyio
+async def test_aclose_stops_every_process():
+    pool = ConverterPool(size=1, timeout=2)
+    assert await pool.aconvert("jsx", "<p>{n}</p>", {"n": 1}) == "<p>1</p>"
+    process, = pool._processes
+    await pool.aclose()
+    assert not process.alive
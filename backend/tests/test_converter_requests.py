@@ -0,0 +1,47 @@
+import io
+import json
+
+import pytest
+
+from convertors.daemon import NODE_COMMAND, ConverterPool, ConverterProcess
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ConverterPool(size=1, timeout=10)
+    yield pool
+    pool.close()
+
+
+def test_request_is_written_as_one_json_line():
+    process = ConverterProcess.__new__(ConverterProcess)
+    stdin = io.StringIO()
+    process._process = type("Process", (), {"stdin": stdin})()
+    fields = {"engine": "jsx", "template": "<p>\n\"quoted\"</p>", "context": {"name": "Zoë"}}
+
+    process._write_request(7, fields)
+
+    line = stdin.getvalue()
+    assert line.endswith("\n") and line.count("\n") == 1
+    assert json.loads(line) == {"id": 7, **fields}
+
+
+def test_template_and_data_stay_off_the_command_line(pool):
+    pool.convert("jsx", "<p>{secret}</p>", {"secret": "s3cret"})
+    process, = pool._processes
+    assert process._process.args == NODE_COMMAND
+
+
+def test_special_characters_round_trip(pool):
+    text = "line one\nline two\t\"quotes\" 'apostrophes' \\ backslash — Zoë 漢字 🎉 </script>"
+    html = pool.convert("vue", "<p>{{ text }}</p>", {"text": text})
+    assert "Zoë 漢字 🎉" in html
+    assert "line one\nline two" in html
+
+
+def test_context_larger_than_an_argument_list_fits(pool):
+    # Far beyond what a single argv entry may hold on Linux (128KB)
+    rows = [{"name": f"item {index}", "note": "x" * 100} for index in range(5000)]
+    html = pool.convert("jsx", "<ul>{rows.map((row) => <li>{row.name}</li>)}</ul>", {"rows": rows})
+    assert html.count("<li>") == 5000
+    assert "<li>item 4999</li>" in html
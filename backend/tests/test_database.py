@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+
+from core import database
+from core.config import DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_STATEMENT_CACHE_SIZE, SQLITE_BUSY_TIMEOUT
+
+pytestmark = pytest.mark.anyio
+
+
+async def pragma(session, name: str):
+    return (await session.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+async def test_sqlite_connections_are_tuned(db):
+    assert database.SQLALCHEMY_DATABASE_URL.startswith("sqlite+aiosqlite://")
+    assert (await pragma(db, "journal_mode")).lower() == "wal"
+    # NORMAL
+    assert await pragma(db, "synchronous") == 1
+    assert await pragma(db, "busy_timeout") == SQLITE_BUSY_TIMEOUT
+
+
+def test_sqlite_gets_no_pool_settings():
+    assert database._engine_options() == {"connect_args": {"check_same_thread": False}}
+
+
+def test_postgres_is_pooled_with_a_statement_cache(monkeypatch):
+    monkeypatch.setattr(database, "backend", "postgresql")
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", "postgresql+asyncpg://app@db/app")
+    options = database._engine_options()
+    assert options["pool_size"] == DB_POOL_SIZE
+    assert options["max_overflow"] == DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+def test_other_postgres_drivers_keep_their_own_arguments(monkeypatch):
+    monkeypatch.setattr(database, "backend", "postgresql")
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", "postgresql+psycopg://app@db/app")
+    assert "connect_args" not in database._engine_options()
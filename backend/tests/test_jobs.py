@@ -0,0 +1,129 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.future import select
+
+import models
+from core.database import async_session
+from features.pdf_generation import worker
+from features.pdf_generation.services.admission import RenderOverloaded
+
+pytestmark = pytest.mark.anyio
+
+Status = models.RenderJobStatusEnum
+
+
+async def add_job(db, user, **values) -> models.RenderJob:
+    job = models.RenderJob(engine="html", content="<p>job</p>", user_id=user.id, **values)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def reload(job: models.RenderJob) -> models.RenderJob:
+    async with async_session() as session:
+        return await session.get(models.RenderJob, job.id)
+
+
+async def test_each_job_is_claimed_exactly_once(db, user):
+    jobs = [await add_job(db, user) for _ in range(3)]
+
+    claimed = await asyncio.gather(*(worker.claim_job() for _ in range(8)))
+    claimed_ids = [job.id for job in claimed if job is not None]
+    assert sorted(claimed_ids) == sorted(job.id for job in jobs)
+
+    for job in jobs:
+        job = await reload(job)
+        assert job.status == Status.RUNNING
+        assert job.attempts == 1
+        assert job.started_at is not None
+    assert await worker.claim_job() is None
+
+
+async def test_stale_jobs_are_requeued_until_out_of_attempts(db, user, monkeypatch):
+    monkeypatch.setattr(worker, "RENDER_JOB_MAX_ATTEMPTS", 2)
+    long_ago = worker._now() - timedelta(seconds=worker.RENDER_JOB_STALE_AFTER * 2)
+    retry = await add_job(db, user, status=Status.RUNNING, started_at=long_ago, attempts=1)
+    exhausted = await add_job(db, user, status=Status.RUNNING, started_at=long_ago, attempts=2)
+    fresh = await add_job(db, user, status=Status.RUNNING, started_at=worker._now(), attempts=1)
+
+    await worker.requeue_stale_jobs()
+
+    assert (await reload(retry)).status == Status.QUEUED
+    exhausted = await reload(exhausted)
+    assert exhausted.status == Status.FAILED
+    assert exhausted.error == "Worker stopped responding"
+    assert (await reload(fresh)).status == Status.RUNNING
+
+
+async def test_job_is_rendered_to_a_file(db, user, manager):
+    await add_job(db, user)
+    job = await worker.claim_job()
+    await worker.render_job(job)
+
+    job = await reload(job)
+    assert job.status == Status.DONE
+    assert Path(job.result_path).read_bytes().startswith(b"%PDF")
+
+
+async def test_shed_job_goes_back_to_the_queue(db, user, manager, monkeypatch):
+    def overloaded(**render):
+        raise RenderOverloaded("busy", retry_after=1)
+
+    monkeypatch.setattr(manager, "generate_pdf_stream", overloaded)
+    await add_job(db, user)
+    job = await worker.claim_job()
+    await worker.render_job(job)
+
+    job = await reload(job)
+    assert job.status == Status.QUEUED
+    assert job.attempts == 0
+    # Backed off instead of being claimed straight back into the overloaded browser
+    assert await worker.claim_job() is None
+
+    now = worker._now
+    monkeypatch.setattr(worker, "_now", lambda: now() + timedelta(seconds=worker.RENDER_JOB_RETRY_DELAY + 1))
+    assert (await worker.claim_job()).id == job.id
+
+
+async def test_finished_jobs_expire_with_their_files(db, user, tmp_path, monkeypatch):
+    monkeypatch.setattr(worker, "RENDER_JOB_RETENTION", 3600)
+    expired_at = worker._now() - timedelta(hours=2)
+    result = tmp_path / "old.pdf"
+    result.write_bytes(b"%PDF-old")
+    old_done = await add_job(db, user, status=Status.DONE, finished_at=expired_at, result_path=str(result))
+    old_failed = await add_job(db, user, status=Status.FAILED, finished_at=expired_at)
+    recent = await add_job(db, user, status=Status.DONE, finished_at=worker._now())
+    queued = await add_job(db, user)
+
+    assert await worker.delete_expired_jobs(batch_size=1) == 2
+
+    assert not result.exists()
+    assert await reload(old_done) is None
+    assert await reload(old_failed) is None
+    assert await reload(recent) is not None
+    assert await reload(queued) is not None
+
+
+async def test_zero_retention_keeps_every_job(db, user, monkeypatch):
+    monkeypatch.setattr(worker, "RENDER_JOB_RETENTION", 0)
+    await add_job(db, user, status=Status.DONE, finished_at=worker._now() - timedelta(days=365))
+    assert await worker.delete_expired_jobs() == 0
+
+
+async def test_job_api_round_trip(client, db):
+    response = await client.post("/api/v1/jobs", json={"content": "<p>queued</p>"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "queued"
+
+    assert (await client.get(f"/api/v1/jobs/{job_id}/result")).status_code == 409
+
+    await worker.render_job(await worker.claim_job())
+    assert (await client.get(f"/api/v1/jobs/{job_id}")).json()["status"] == "done"
+    result = await client.get(f"/api/v1/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert b"<p>queued</p>" in result.content
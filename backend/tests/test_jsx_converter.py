@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from convertors.daemon import ConverterPool
+from tests.test_vue_converter import CONTEXT
+
+# Output of the regex-based converter this replaced, which the parser must keep
+BASELINE = [
+    ('<div className="p-4"><h1>{title}</h1></div>', '<div class="p-4"><h1>Invoice #42</h1></div>'),
+    ("<div><p>{customer.name}</p><p>{customer.address}</p></div>", "<div><p>Acme Corp</p><p>123 Main St</p></div>"),
+    ("<p>{paid ? 'Paid' : 'Due'}</p>", "<p>Due</p>"),
+    ("<div>{paid && <span>Paid in full</span>}</div>", "<div></div>"),
+    ("<p>Total: {total.toFixed(2)}</p>", "<p>Total: 1219.00</p>"),
+    ("<p>{tags.join(', ')}</p>", "<p>a, b, c</p>"),
+    (
+        '<div className="flex justify-between"><span>{customer.name.toUpperCase()}</span><span>{note}</span></div>',
+        '<div class="flex justify-between"><span>ACME CORP</span><span>Thanks & welcome</span></div>',
+    ),
+    ('<>\n  <h1 className="text-2xl">{title}</h1>\n  <p>{customer.name}</p>\n</>', '<h1 class="text-2xl">Invoice #42</h1>\n  <p>Acme Corp</p>'),
+    ("<div>{items.length} items</div>", "<div>2 items</div>"),
+    ("<p>{missing}</p>", "<p></p>"),
+]
+
+# Templates the regex converter got wrong: any expression containing braces or JSX was cut short
+FIXED = [
+    # Was "<ul>: $</li>`)}</ul>"
+    ("<ul>{items.map(item => `<li>${item.item}: ${item.price}</li>`)}</ul>", "<ul><li>Surf Board: $1,000</li><li>Board Wax: $75</li></ul>"),
+    # Was "<ul> x </li>)}</ul>"
+    (
+        '<ul>{items.map((item) => <li className="row">{item.item} x {item.quantity}</li>)}</ul>',
+        '<ul><li class="row">Surf Board x 1</li><li class="row">Board Wax x 2</li></ul>',
+    ),
+    # Was "<p></p>"
+    ("<p>{total > 1000 ? <b>Large order</b> : <i>Small order</i>}</p>", "<p><b>Large order</b></p>"),
+    # Was "<table><tbody></td><td></td></tr>)}</tbody></table>"
+    (
+        "<table><tbody>{items.map((item, index) => <tr><td>{index + 1}</td><td>{item.item}</td></tr>)}</tbody></table>",
+        "<table><tbody><tr><td>1</td><td>Surf Board</td></tr><tr><td>2</td><td>Board Wax</td></tr></tbody></table>",
+    ),
+]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ConverterPool(size=1, timeout=30)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.parametrize("template, expected", BASELINE + FIXED)
+def test_output(pool, template, expected):
+    assert pool.convert("jsx", template, CONTEXT) == expected
+
+
+def test_long_expression_converts_in_linear_time(pool):
+    timings = []
+    for count in (2000, 16000):
+        # One expression with many nested elements, the case that used to be quadratic
+        template = "<div>{[" + ", ".join(["<b>{total}</b>"] * count) + "]}</div>"
+        started = time.monotonic()
+        html = pool.convert("jsx", template, CONTEXT)
+        timings.append(time.monotonic() - started)
+        assert html.count("<b>1219</b>") == count
+    assert timings[1] < timings[0] * 8 * 3 + 0.5
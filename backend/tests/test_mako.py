@@ -0,0 +1,110 @@
+import pytest
+
+from convertors.daemon import MAKO_COMMAND, ConverterPool, _mako_env
+from convertors.wrappers import MakoConverter
+
+
+@pytest.fixture(scope="module")
+def mako():
+    pool = ConverterPool(size=1, timeout=5, command=MAKO_COMMAND, env=_mako_env(), cwd="/")
+    yield MakoConverter(pool)
+    pool.close()
+
+
+def test_expressions_and_control_lines(mako):
+    template = """<h1>${title}</h1>
+% for item in items:
+<li>${loop.index}: ${item['name']}</li>
+% endfor
+% if paid:
+<p>Paid</p>
+% else:
+<p>Due ${total}</p>
+% endif
+<% subtotal = sum(item['price'] for item in items) %><p>${subtotal}</p>"""
+    context = {"title": "Invoice", "items": [{"name": "a", "price": 2}, {"name": "b", "price": 3}], "paid": False, "total": 5}
+    assert mako.convert(template, context) == "<h1>Invoice</h1>\n<li>0: a</li>\n<li>1: b</li>\n<p>Due 5</p>\n<p>5</p>"
+
+
+def test_output_is_escaped_unless_marked_raw(mako):
+    context = {"note": "<script>alert(1)</script>"}
+    assert mako.convert("${note}", context) == "&lt;script&gt;alert(1)&lt;/script&gt;"
+    assert mako.convert("${note | n}", context) == "<script>alert(1)</script>"
+
+
+def test_missing_variable_is_an_error(mako):
+    with pytest.raises(Exception, match="Mako conversion failed"):
+        mako.convert("<p>${customer}</p>", {})
+
+
+@pytest.mark.parametrize("template", [
+    "<%! import os %>${os.getcwd()}",
+    "<% import os %>${os.getcwd()}",
+    "${open('/etc/passwd').read()}",
+    "${__import__('os').getcwd()}",
+    "${().__class__.__base__.__subclasses__()}",
+    "${[x for x in ()].__class__}",
+    "${(x for x in [1]).gi_frame.f_globals}",
+    "${getattr(title, '__class__')}",
+    "${self.module}",
+    "${context.get('self').module.runtime.sys.modules['os'].popen('id').read()}",
+    "${'{0.__globals__[os].environ}'.format(context.get('open'))}",
+    "${'{0.__class__}'.format(title)}",
+    "${'{x.__class__}'.format_map({'x': title})}",
+    "${context.get('open')('/etc/passwd')}",
+    "${(lambda: 1)()}",
+    "<% def f(): pass %>${f()}",
+    "<%include file=\"/etc/passwd\"/>",
+    "<%namespace file=\"/etc/passwd\" import=\"*\"/>",
+    "<%def name=\"x()\">x</%def>${x()}",
+    "${title | __import__}",
+    "% if False:\n% elif open('/etc/passwd'):\n% endif",
+    "% try:\n% except title.__class__ as e:\n% endtry",
+])
+def test_templates_cannot_escape_the_sandbox(mako, template):
+    with pytest.raises(Exception, match="Mako conversion failed"):
+        mako.convert(template, {"title": "x"})
+
+
+def test_blocked_builtins_stay_blocked_through_the_data(mako):
+    # A data key can't smuggle a real builtin back in
+    with pytest.raises(Exception, match="'open' is not allowed"):
+        mako.convert("${open}", {"open": "yes"})
+    with pytest.raises(Exception, match="'context' is not allowed"):
+        mako.convert("${context['open']}", {"open": "yes"})
+
+
+def test_runaway_template_is_killed():
+    pool = ConverterPool(size=1, timeout=0.5, command=MAKO_COMMAND, env=_mako_env(), cwd="/")
+    try:
+        with pytest.raises(Exception, match="timed out"):
+            MakoConverter(pool).convert("% while True:\n% endwhile", {})
+        # The next render gets a fresh process
+        assert MakoConverter(pool).convert("${n}", {"n": 1}) == "1"
+    finally:
+        pool.close()
+
+
+def test_memory_is_limited():
+    env = {**_mako_env(), "MAKO_SANDBOX_MEMORY": str(256 * 1024 * 1024)}
+    pool = ConverterPool(size=1, timeout=5, command=MAKO_COMMAND, env=env, cwd="/")
+    try:
+        with pytest.raises(Exception, match="memory limit"):
+            MakoConverter(pool).convert("${len('x' * (1024 ** 3))}", {})
+    finally:
+        pool.close()
+
+
+def test_daemon_gets_none_of_the_app_settings():
+    env = _mako_env()
+    assert "DATABASE_URL" not in env
+    assert set(env) <= {"PATH", "MAKO_MODULE_DIR", "MAKO_TEMPLATE_CACHE_SIZE", "MAKO_SANDBOX_MEMORY"}
+
+
+@pytest.mark.anyio
+async def test_saved_module_renders_like_the_source(mako):
+    template = "% for name in names:\n<b>${name}</b>\n% endfor"
+    analysis = await mako.aanalyze(template)
+    assert analysis["variables"] == ["names"]
+    context = {"names": ["a", "b"]}
+    assert mako.convert(template + "\n", context, analysis["compiled"]) == mako.convert(template, context)
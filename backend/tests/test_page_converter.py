@@ -0,0 +1,88 @@
+import asyncio
+import json
+import subprocess
+
+import pytest
+
+from convertors.daemon import ConverterPool
+from features.pdf_generation.services import page_converter
+from features.pdf_generation.services.page_converter import (
+    IN_PAGE_CONVERT_JS,
+    convert_in_page,
+    converter_bundle,
+    install_converters,
+)
+from features.pdf_generation.services.page_pool import PageStuck
+from tests.fakes import FakeBrowser
+
+TEMPLATES = [
+    ("jsx", "<div className=\"p-4\"><h1>{title}</h1>{items.map((item) => <li>{item}</li>)}</div>", {"title": "Invoice", "items": ["a", "b"]}),
+    ("jsx", "<p>{total > 10 ? <b>big</b> : 'small'}</p>", {"total": 12}),
+    ("vue", "<ul><li v-for=\"item in items\" :class=\"item.kind\">{{ item.name }}</li></ul>", {"items": [{"name": "x", "kind": "k"}]}),
+    ("vue", "<p v-if=\"paid\">Paid</p><p v-else>Due {{ amount }}</p>", {"paid": False, "amount": 5}),
+]
+
+# Runs the bundle the way a page would: no require, module or process, only window
+IN_BROWSER_SCRIPT = """
+const vm = require('vm');
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const sandbox = { window: {} };
+vm.createContext(sandbox);
+vm.runInContext(input.bundle, sandbox);
+const convert = vm.runInContext('(' + input.convert + ')', sandbox);
+process.stdout.write(JSON.stringify(input.templates.map((args) => convert(args))));
+"""
+
+
+def convert_in_browser_sandbox(templates) -> list:
+    request = {"bundle": converter_bundle(), "convert": IN_PAGE_CONVERT_JS, "templates": [[*args, None] for args in templates]}
+    result = subprocess.run(["node", "-e", IN_BROWSER_SCRIPT], input=json.dumps(request), capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_bundle_converts_like_the_node_daemon():
+    pool = ConverterPool(size=1, timeout=10)
+    try:
+        expected = [pool.convert(engine, template, context) for engine, template, context in TEMPLATES]
+    finally:
+        pool.close()
+    assert convert_in_browser_sandbox(TEMPLATES) == expected
+
+
+@pytest.mark.anyio
+async def test_converters_are_installed_in_every_document():
+    context = await FakeBrowser().new_context()
+    await install_converters(context)
+    assert context.init_scripts == [converter_bundle()]
+
+
+class ScriptedPage:
+    """Answers the in-page conversion like a document without (then with) the converters"""
+
+    def __init__(self, installed: bool = False, delay: float = 0):
+        self.installed = installed
+        self.delay = delay
+        self.scripts = []
+
+    async def evaluate(self, script, arg=None):
+        self.scripts.append(script)
+        await asyncio.sleep(self.delay)
+        if script == converter_bundle():
+            self.installed = True
+            return None
+        return f"<p>{arg[0]}</p>" if self.installed else None
+
+
+@pytest.mark.anyio
+async def test_converters_are_installed_into_a_document_that_missed_them():
+    page = ScriptedPage()
+    assert await convert_in_page(page, "jsx", "<p/>", {}) == "<p>jsx</p>"
+    assert page.scripts == [IN_PAGE_CONVERT_JS, converter_bundle(), IN_PAGE_CONVERT_JS]
+
+
+@pytest.mark.anyio
+async def test_stuck_conversion_gives_up_the_page(monkeypatch):
+    monkeypatch.setattr(page_converter, "CONVERTER_TIMEOUT", 0.05)
+    with pytest.raises(PageStuck):
+        await convert_in_page(ScriptedPage(installed=True, delay=1), "vue", "<p/>", {})
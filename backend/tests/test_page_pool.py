@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+from features.pdf_generation.services.page_pool import PagePool, PagePoolTimeout, PageStuck
+from tests.fakes import FakeBrowser
+
+pytestmark = pytest.mark.anyio
+
+
+async def started_pool(size: int = 2, max_uses: int = 100, checkout_timeout: float = 1) -> PagePool:
+    pool = PagePool(FakeBrowser(), size=size, max_uses=max_uses, checkout_timeout=checkout_timeout)
+    await pool.start()
+    return pool
+
+
+async def test_start_creates_every_page_up_front():
+    pool = await started_pool(size=3)
+    assert len(pool._browser.contexts) == 3
+
+
+async def test_page_is_reset_and_reused():
+    pool = await started_pool(size=1)
+    async with pool.page() as first:
+        await first.set_content("<p>one</p>")
+    async with pool.page() as second:
+        assert second is first
+        assert second.html is None
+        assert second.url == "about:blank"
+        assert second.resets == 1
+
+
+async def test_application_error_keeps_the_page():
+    pool = await started_pool(size=1)
+    with pytest.raises(ValueError):
+        async with pool.page() as first:
+            raise ValueError("bad template")
+    async with pool.page() as second:
+        assert second is first
+    assert not first.context.closed
+
+
+@pytest.mark.parametrize("error", [PlaywrightError("Target closed"), PageStuck("conversion timed out")])
+async def test_browser_error_replaces_the_page(error):
+    pool = await started_pool(size=1)
+    with pytest.raises(type(error)):
+        async with pool.page() as first:
+            raise error
+    assert first.context.closed
+    async with pool.page() as second:
+        assert second is not first
+
+
+async def test_cancelled_render_replaces_the_page():
+    pool = await started_pool(size=1)
+    checked_out = asyncio.Event()
+    pages = []
+
+    async def render():
+        async with pool.page() as page:
+            pages.append(page)
+            checked_out.set()
+            await asyncio.sleep(10)
+
+    task = asyncio.create_task(render())
+    await checked_out.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert pages[0].context.closed
+
+
+async def test_page_is_recycled_after_max_uses():
+    pool = await started_pool(size=1, max_uses=2)
+    async with pool.page() as first:
+        pass
+    async with pool.page() as again:
+        assert again is first
+    async with pool.page() as third:
+        assert third is not first
+    assert first.context.closed
+
+
+async def test_checkout_times_out_when_every_page_is_busy():
+    pool = await started_pool(size=1, checkout_timeout=0.05)
+    async with pool.page():
+        with pytest.raises(PagePoolTimeout):
+            async with pool.page():
+                pass
+
+
+async def test_close_disposes_idle_pages():
+    pool = await started_pool(size=2)
+    await pool.close()
+    assert all(context.closed for context in pool._browser.contexts)
@@ -0,0 +1,85 @@
+import pytest
+
+from features.pdf_generation.services import playwright_manager
+from features.pdf_generation.services.pdf_cache import PDFCache
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+def test_key_covers_every_input_in_any_order():
+    key = PDFCache.make_key(content="<p/>", engine="html", data={"a": 1, "b": 2})
+    assert key == PDFCache.make_key(data={"b": 2, "a": 1}, engine="html", content="<p/>")
+    assert key != PDFCache.make_key(content="<p/>", engine="html", data={"a": 1, "b": 3})
+
+
+async def test_memory_hit(tmp_path):
+    cache = PDFCache(disk_dir=None)
+    assert await cache.get("key") is None
+    await cache.set("key", b"%PDF-1")
+    assert await cache.get("key") == b"%PDF-1"
+    assert (cache.memory_hits, cache.misses) == (1, 1)
+
+
+async def test_disk_tier_is_shared_between_processes(tmp_path):
+    await PDFCache(disk_dir=str(tmp_path)).set("key", b"%PDF-1", namespace="7")
+
+    other = PDFCache(disk_dir=str(tmp_path))
+    assert await other.get("key", namespace="7") == b"%PDF-1"
+    assert other.disk_hits == 1
+    # Promoted to memory on the way out
+    assert await other.get("key", namespace="7") == b"%PDF-1"
+    assert other.memory_hits == 1
+
+
+async def test_invalidate_drops_only_that_namespace(tmp_path):
+    cache = PDFCache(disk_dir=str(tmp_path))
+    await cache.set("key", b"%PDF-old", namespace="7")
+    await cache.set("key", b"%PDF-other", namespace="8")
+
+    await cache.invalidate("7")
+
+    assert await cache.get("key", namespace="7") is None
+    assert await PDFCache(disk_dir=str(tmp_path)).get("key", namespace="7") is None
+    assert await cache.get("key", namespace="8") == b"%PDF-other"
+
+
+async def test_disk_limit_is_shared_by_every_writer(tmp_path):
+    first = PDFCache(disk_dir=str(tmp_path), disk_max_size=1000)
+    second = PDFCache(disk_dir=str(tmp_path), disk_max_size=1000)
+    for index in range(10):
+        writer = first if index % 2 else second
+        await writer.set(f"key-{index}", b"x" * 300)
+
+    files = list(tmp_path.glob("*/*.pdf"))
+    on_disk = sum(path.stat().st_size for path in files)
+    assert on_disk <= 1000
+    assert int((tmp_path / ".usage").read_text()) == on_disk
+    # The newest entry survived eviction
+    assert (tmp_path / "_" / "key-9.pdf").exists()
+
+
+async def test_oversized_pdf_is_kept_off_disk(tmp_path):
+    cache = PDFCache(disk_dir=str(tmp_path), disk_max_size=10)
+    await cache.set("key", b"x" * 11)
+    assert not list(tmp_path.glob("*/*.pdf"))
+
+
+async def test_repeated_render_is_served_from_the_cache(tmp_path, monkeypatch, admission):
+    monkeypatch.setattr(playwright_manager, "pdf_cache", PDFCache(disk_dir=str(tmp_path)))
+    manager = await fake_manager()
+    browser = manager._playwright.chromium.launched[0]
+
+    first = await manager.generate_pdf("<p>cached</p>", data={"n": 1}, cache_namespace="7")
+    second = await manager.generate_pdf("<p>cached</p>", data={"n": 1}, cache_namespace="7")
+    assert first == second
+    assert len(browser.printed) == 1
+
+    # Different data is a different document
+    await manager.generate_pdf("<p>cached</p>", data={"n": 2}, cache_namespace="7")
+    assert len(browser.printed) == 2
+
+    await playwright_manager.pdf_cache.invalidate("7")
+    await manager.generate_pdf("<p>cached</p>", data={"n": 1}, cache_namespace="7")
+    assert len(browser.printed) == 3
+    await manager.cleanup()
@@ -0,0 +1,118 @@
+import logging
+
+import pytest
+
+from core.config import PLAYWRIGHT_TIMEOUT, RENDER_READY_TIMEOUTS
+from features.pdf_generation.services.readiness import (
+    RENDER_READY_JS,
+    ready_timeout,
+    set_content_and_wait,
+    swap_body_and_wait,
+)
+from models import TemplatingEngineEnum
+from tests.test_template_cache_js import run_node
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingPage:
+    def __init__(self, ready=True):
+        self.ready = ready
+        self.set_content_calls = []
+        self.evaluations = []
+
+    async def set_content(self, html, **options):
+        self.set_content_calls.append((html, options))
+
+    async def evaluate(self, script, arg=None):
+        self.evaluations.append((script, arg))
+        return self.ready if script == RENDER_READY_JS else None
+
+
+def test_timeouts_follow_the_engine():
+    assert ready_timeout("jsx") == RENDER_READY_TIMEOUTS["jsx"]
+    assert ready_timeout(TemplatingEngineEnum.VUE) == RENDER_READY_TIMEOUTS["vue"]
+    assert ready_timeout("unknown") == PLAYWRIGHT_TIMEOUT
+
+
+async def test_waits_for_the_ready_signal_instead_of_network_idle():
+    page = RecordingPage()
+    await set_content_and_wait(page, "<p>x</p>", "html", tailwind=True)
+
+    (html, options), = page.set_content_calls
+    assert html == "<p>x</p>"
+    assert options["wait_until"] == "domcontentloaded"
+    (script, arg), = page.evaluations
+    assert script == RENDER_READY_JS
+    assert arg == {"tailwind": True, "timeout": ready_timeout("html")}
+
+
+async def test_body_swap_skips_waiting_for_tailwind():
+    page = RecordingPage()
+    await swap_body_and_wait(page, "<p>row</p>", "jsx")
+    (swap, body), (script, arg) = page.evaluations
+    assert body == "<p>row</p>"
+    assert script == RENDER_READY_JS
+    assert arg["tailwind"] is False
+
+
+async def test_missed_signal_prints_anyway_with_a_warning(caplog):
+    page = RecordingPage(ready=False)
+    with caplog.at_level(logging.WARNING):
+        await set_content_and_wait(page, "<p>x</p>", "vue", tailwind=False)
+    assert "printing anyway" in caplog.text
+
+
+# A document with one <link rel="stylesheet"> that is still loading, just
+# enough DOM for RENDER_READY_JS to run in node
+FAKE_DOCUMENT_JS = """
+class Link {
+    constructor(sheet) { this.sheet = sheet; this.listeners = {}; }
+    addEventListener(event, listener) { (this.listeners[event] ||= []).push(listener); }
+    fire(event) { this.sheet = event === 'load' ? {} : null; (this.listeners[event] || []).forEach(listener => listener()); }
+}
+const link = new Link(null);
+const loaded = new Link({});
+global.document = {
+    head: { querySelectorAll: () => [] },
+    querySelectorAll: selector => selector === 'link[rel~="stylesheet"]' ? [link, loaded] : [],
+    fonts: { ready: Promise.resolve() },
+    images: [],
+};
+global.requestAnimationFrame = callback => setTimeout(callback, 0);
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+"""
+
+
+def run_ready_js(script: str):
+    return run_node(FAKE_DOCUMENT_JS + f"const renderReady = {RENDER_READY_JS};\n" + script)
+
+
+def test_ready_waits_for_a_pending_stylesheet():
+    result = run_ready_js("""
+        (async () => {
+            let ready;
+            renderReady({ tailwind: false, timeout: 500 }).then(value => { ready = value; });
+            await sleep(50);
+            const beforeLoad = ready;
+            link.fire('load');
+            await sleep(50);
+            console.log(JSON.stringify({ beforeLoad: beforeLoad ?? null, afterLoad: ready }));
+        })();
+    """)
+    assert result == {"beforeLoad": None, "afterLoad": True}
+
+
+def test_failed_stylesheet_does_not_block_printing():
+    result = run_ready_js("""
+        (async () => {
+            const ready = renderReady({ tailwind: false, timeout: 500 });
+            link.fire('error');
+            console.log(JSON.stringify(await ready));
+        })();
+    """)
+    assert result is True
+
+
+def test_stylesheet_that_never_loads_falls_back_to_the_timeout():
+    assert run_ready_js("renderReady({ tailwind: false, timeout: 50 }).then(ready => console.log(JSON.stringify(ready)));") is False
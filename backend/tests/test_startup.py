@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from features.pdf_generation.services.playwright_manager import PlaywrightManager
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def no_instance(monkeypatch):
+    monkeypatch.setattr(PlaywrightManager, "_instance", None)
+    monkeypatch.setattr(PlaywrightManager, "_instance_lock", asyncio.Lock())
+
+
+async def test_concurrent_first_callers_share_one_instance(no_instance, monkeypatch):
+    starts = []
+
+    async def start(self):
+        starts.append(self)
+        await asyncio.sleep(0.01)
+        self._initialized = True
+
+    monkeypatch.setattr(PlaywrightManager, "_start", start)
+    instances = await asyncio.gather(*(PlaywrightManager.get_instance() for _ in range(5)))
+    assert len(set(map(id, instances))) == 1
+    assert len(starts) == 1
+
+
+async def test_shutdown_never_launches_browsers(no_instance, monkeypatch):
+    async def start(self):
+        raise AssertionError("browsers were launched")
+
+    monkeypatch.setattr(PlaywrightManager, "_start", start)
+    await PlaywrightManager.shutdown()
+    assert PlaywrightManager._instance is None
+
+
+async def test_shutdown_stops_a_started_instance(no_instance):
+    manager = await fake_manager()
+    PlaywrightManager._instance = manager
+    await PlaywrightManager.shutdown()
+    assert PlaywrightManager._instance is None
+    assert all(browser.closed for browser in manager._playwright.chromium.launched)
+
+
+async def test_warm_up_renders_on_every_browser():
+    manager = await fake_manager(browsers=2)
+    await manager.warm_up()
+    for browser in manager._playwright.chromium.launched:
+        assert len(browser.printed) == 1
+        assert PlaywrightManager.WARM_UP_HTML in browser.printed[0]
+    await manager.cleanup()
@@ -0,0 +1,64 @@
+import pytest
+
+from api.streaming import streaming_pdf_response
+from features.pdf_generation.services import playwright_manager
+from features.pdf_generation.services.playwright_manager import PDFTooLarge
+
+pytestmark = pytest.mark.anyio
+
+
+async def body_of(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def test_chunks_are_passed_through():
+    async def stream():
+        yield b"%PDF-"
+        yield b"rest"
+
+    response = await streaming_pdf_response(stream(), "report.pdf")
+    assert response.headers["content-disposition"] == "attachment; filename=report.pdf"
+    assert response.media_type == "application/pdf"
+    assert await body_of(response) == b"%PDF-rest"
+
+
+async def test_failure_before_the_first_chunk_is_raised():
+    async def stream():
+        raise PDFTooLarge("too big")
+        yield b""
+
+    with pytest.raises(PDFTooLarge):
+        await streaming_pdf_response(stream(), "report.pdf")
+
+
+async def test_stream_is_closed_when_the_client_goes_away():
+    closed = []
+
+    async def stream():
+        try:
+            yield b"one"
+            yield b"two"
+        finally:
+            closed.append(True)
+
+    response = await streaming_pdf_response(stream(), "report.pdf")
+    body = response.body_iterator
+    assert await body.__anext__() == b"one"
+    await body.aclose()
+    assert closed == [True]
+
+
+async def test_pdf_is_streamed_from_the_api(client, monkeypatch):
+    monkeypatch.setattr(playwright_manager, "PDF_STREAM_CHUNK_SIZE", 8)
+    response = await client.post("/api/v1/generate-pdf", json={"content": "<p>streamed</p>"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    assert b"<p>streamed</p>" in response.content
+
+
+async def test_oversized_pdf_is_rejected_as_unprocessable(client, monkeypatch):
+    monkeypatch.setattr(playwright_manager, "MAX_PDF_SIZE", 100)
+    response = await client.post("/api/v1/generate-pdf", json={"content": "<p>too big</p>"})
+    assert response.status_code == 422
+    assert "byte limit" in response.json()["detail"]
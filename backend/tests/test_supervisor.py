@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+from features.pdf_generation.services import supervisor
+from features.pdf_generation.services.supervisor import BrowserSupervisor
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+async def render(worker, error: Exception = None):
+    if error is None:
+        async with worker.page():
+            return
+    with pytest.raises(type(error)):
+        async with worker.page():
+            raise error
+
+
+async def test_only_browser_errors_count_towards_the_error_rate():
+    manager = await fake_manager()
+    worker, = manager.workers
+    await render(worker)
+    await render(worker, ValueError("bad template"))
+    await render(worker, PlaywrightError("Target crashed"))
+    await render(worker)
+
+    # Application errors say nothing about the browser either way
+    assert worker.error_samples == 3
+    assert worker.error_rate == pytest.approx(1 / 3)
+    assert worker.renders == 4
+    assert worker.in_flight == 0
+    await manager.cleanup()
+
+
+async def test_healthy_browser_is_kept():
+    manager = await fake_manager()
+    assert await manager._supervisor._recycle_reason(manager.workers[0]) is None
+    await manager.cleanup()
+
+
+async def test_recycle_reasons(monkeypatch):
+    monkeypatch.setattr(supervisor, "PLAYWRIGHT_BROWSER_MAX_RENDERS", 3)
+    monkeypatch.setattr(supervisor, "PLAYWRIGHT_BROWSER_ERROR_WINDOW", 4)
+    monkeypatch.setattr(supervisor, "PLAYWRIGHT_BROWSER_MAX_ERROR_RATE", 0.5)
+    manager = await fake_manager(browsers=3)
+    worn, failing, gone = manager.workers
+    for _ in range(3):
+        await render(worn)
+    for error in (PlaywrightError("crash"),) * 3:
+        await render(failing, error)
+    # Too few samples for the rate to mean anything yet
+    assert await manager._supervisor._recycle_reason(failing) == "3 renders"
+    monkeypatch.setattr(supervisor, "PLAYWRIGHT_BROWSER_MAX_RENDERS", 0)
+    await render(failing, PlaywrightError("crash"))
+    gone.connected = False
+
+    reasons = [await manager._supervisor._recycle_reason(worker) for worker in manager.workers]
+    assert reasons == [None, "error rate 100%", "disconnected"]
+    await manager.cleanup()
+
+
+async def test_replaced_browser_is_warmed_and_the_old_one_drained():
+    manager = await fake_manager(browsers=2)
+    old = manager.workers[1]
+    await manager.replace_worker(old)
+
+    new = manager.workers[1]
+    assert new is not old and new.index == 1
+    chromium = manager._playwright.chromium
+    assert len(chromium.launched) == 3
+    assert len(chromium.launched[2].printed) == 1
+    await asyncio.gather(*manager._draining)
+    assert not old.connected
+    assert chromium.launched[1].closed
+    await manager.cleanup()
+
+
+async def test_failed_replacement_keeps_the_old_browser():
+    manager = await fake_manager()
+    old, = manager.workers
+
+    async def launch(headless=True):
+        raise PlaywrightError("launch failed")
+
+    manager._playwright.chromium.launch = launch
+    with pytest.raises(PlaywrightError):
+        await manager.replace_worker(old)
+    assert manager.workers == [old]
+    assert not old.recycling
+    await manager.cleanup()
+
+
+async def test_disconnect_wakes_the_supervisor():
+    manager = await fake_manager()
+    manager._supervisor = BrowserSupervisor(manager, interval=60)
+    manager._supervisor.start()
+    old, = manager.workers
+
+    manager._playwright.chromium.launched[0].disconnect()
+    for _ in range(100):
+        if manager.workers[0] is not old:
+            break
+        await asyncio.sleep(0.01)
+    assert manager.workers[0] is not old
+    await manager.cleanup()
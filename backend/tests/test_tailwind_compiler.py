@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from features.pdf_generation.services.assets import TAILWIND_SCRIPT_URL
+from features.pdf_generation.services.playwright_manager import PlaywrightManager
+from features.pdf_generation.services.tailwind_compiler import candidate_markup, compiled_css_for, tailwind_source_hash
+from tests.fakes import fake_manager
+
+pytestmark = pytest.mark.anyio
+
+
+def template(content, compiled_css=None, compiled_css_hash=None, data=None):
+    return SimpleNamespace(content=content, compiled_css=compiled_css, compiled_css_hash=compiled_css_hash, data=data)
+
+
+def test_source_hash_follows_the_content():
+    assert tailwind_source_hash("<p class='p-4'/>") == tailwind_source_hash("<p class='p-4'/>")
+    assert tailwind_source_hash("<p class='p-4'/>") != tailwind_source_hash("<p class='p-2'/>")
+
+
+def test_candidate_markup_lists_classes_from_every_branch():
+    markup = candidate_markup('<p className={ok ? "text-green-600" : "text-red-600"}>x</p>')
+    assert markup.startswith("<div hidden")
+    assert "text-green-600" in markup
+    assert "text-red-600" in markup
+
+
+def test_candidate_markup_escapes_and_skips_overlong_tokens():
+    markup = candidate_markup('<p class="a&b">' + "x" * 500 + "</p>")
+    assert "a&amp;b" in markup
+    assert "x" * 500 not in markup
+
+
+def test_stored_stylesheet_is_used_only_while_current():
+    content = "<p class='p-4'>x</p>"
+    current = template(content, ".p-4{}", tailwind_source_hash(content))
+    assert compiled_css_for(current) == ".p-4{}"
+    assert compiled_css_for(template(content + " ", ".p-4{}", tailwind_source_hash(content))) is None
+    assert compiled_css_for(template(content)) is None
+
+
+def test_stored_stylesheet_is_used_only_for_the_data_it_was_compiled_with():
+    content = "<p class='${tone}'>x</p>"
+    current = template(content, ".text-red-600{}", tailwind_source_hash(content), data={"tone": "text-red-600"})
+    assert compiled_css_for(current, {"tone": "text-red-600"}) == ".text-red-600{}"
+    # text-green-600 was never compiled, so the JIT has to render it
+    assert compiled_css_for(current, {"tone": "text-green-600"}) is None
+    assert compiled_css_for(current, {"tone": "text-red-600"}, {"tone": "text-green-600"}) is None
+
+
+def test_precompiled_stylesheet_replaces_the_jit():
+    html = PlaywrightManager()._wrap_html("<p>x</p>", compiled_css=".a{}</style><script>")
+    assert TAILWIND_SCRIPT_URL not in html
+    assert "<style>.a{}<\\/style><script></style>" in html
+
+
+async def test_compile_runs_tailwind_over_every_class_candidate(admission):
+    manager = await fake_manager(stylesheet=".p-4{padding:1rem}")
+    css = await manager.compile_tailwind_css('<p className={big ? "p-8" : "p-4"}>{label}</p>', "jsx", {"big": False, "label": "x"})
+    assert css == ".p-4{padding:1rem}"
+    assert "p-8" in manager._playwright.chromium.launched[0].loaded[-1]
+    await manager.cleanup()
+
+
+async def test_compile_fails_without_a_stylesheet(admission):
+    manager = await fake_manager(stylesheet="")
+    with pytest.raises(Exception, match="did not generate a stylesheet"):
+        await manager.compile_tailwind_css("<p class='p-4'>x</p>")
+    await manager.cleanup()
+
+
+async def test_render_with_other_data_keeps_the_jit(client, manager):
+    response = await client.post("/api/v1/templates", json={
+        "name": "badge", "engine": "mako", "content": "<p class='${tone}'>x</p>", "data": {"tone": "text-red-600"},
+    })
+    template = response.json()
+    browser = manager._playwright.chromium.launched[0]
+
+    await client.post(f"/api/v1/templates/{template['id']}/generate", json={"data": {"tone": "text-red-600"}})
+    assert TAILWIND_SCRIPT_URL not in browser.loaded[-1]
+
+    await client.post(f"/api/v1/templates/{template['id']}/generate", json={"data": {"tone": "text-green-600"}})
+    assert TAILWIND_SCRIPT_URL in browser.loaded[-1]
+    assert "text-green-600" in browser.loaded[-1]
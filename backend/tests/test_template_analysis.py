@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import pytest
+
+from features.pdf_generation.services.template_analysis import (
+    TemplateDataMissing,
+    analyze_template,
+    check_template_data,
+    compiled_template_for,
+    missing_variables,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def new_template(engine: str, content: str) -> SimpleNamespace:
+    return SimpleNamespace(id="t1", engine=engine, content=content)
+
+
+async def analyzed(engine: str, content: str) -> SimpleNamespace:
+    template = new_template(engine, content)
+    await analyze_template(template)
+    return template
+
+
+async def test_jsx_keys_tested_before_use_are_optional():
+    template = await analyzed("jsx", (
+        "<div><h1>{customer.name}</h1>"
+        "{discount && <p>{discount.amount}</p>}"
+        "{note ? <p>{note}</p> : null}"
+        "{footer?.text}"
+        "{items.map((item) => <li>{item.name}</li>)}</div>"
+    ))
+    assert template.compiled_template
+    assert {path.split(".")[0] for path in template.variables} == {"customer", "items"}
+
+
+async def test_vue_keys_tested_before_use_are_optional():
+    template = await analyzed("vue", (
+        '<div><h1>{{ title }}</h1><header v-if="showHeader">{{ showHeader.text }}</header>'
+        '<li v-for="item in items">{{ item.name }}</li></div>'
+    ))
+    assert {path.split(".")[0] for path in template.variables} == {"title", "items"}
+
+
+async def test_every_mako_name_is_required():
+    template = await analyzed("mako", "% if discount:\n${discount}\n% endif\n% for item in items:\n${item}\n% endfor")
+    assert template.variables == ["discount", "items"]
+
+
+async def test_html_needs_no_data():
+    template = await analyzed("html", "<p>{{ not a template }}</p>")
+    assert template.variables == []
+    assert compiled_template_for(template) is None
+
+
+async def test_stored_code_is_dropped_when_the_content_changes():
+    template = await analyzed("jsx", "<p>{name}</p>")
+    assert compiled_template_for(template) == template.compiled_template
+    assert missing_variables(template, {}) == ["name"]
+
+    template.content = "<p>{other}</p>"
+    assert compiled_template_for(template) is None
+    # Stale analysis never rejects a render
+    assert missing_variables(template, {}) == []
+
+
+async def test_template_that_fails_to_compile_is_left_to_the_render():
+    template = await analyzed("mako", "<%! import os %>")
+    assert template.content_hash is None
+    assert compiled_template_for(template) is None
+
+
+async def test_missing_keys_are_reported():
+    template = await analyzed("jsx", "<p>{customer.name} {total}</p>")
+    check_template_data(template, {"customer": {}, "total": 1})
+    with pytest.raises(TemplateDataMissing) as error:
+        check_template_data(template, {"customer": {}}, row=3)
+    assert error.value.missing == ["total"]
+    assert error.value.row == 3
+    assert str(error.value) == "Template data in row 3 is missing: total"
+
+
+async def create_template(client, engine: str, content: str, **fields) -> dict:
+    response = await client.post("/api/v1/templates", json={"name": "invoice", "engine": engine, "content": content, **fields})
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_render_with_missing_data_is_rejected(client, manager):
+    template = await create_template(client, "jsx", "<p>{customer.name}: {total}</p>")
+    assert template["variables"] == ["customer.name", "total"]
+
+    response = await client.post(f"/api/v1/templates/{template['id']}/generate", json={"data": {"customer": {"name": "Ada"}}})
+    assert response.status_code == 422
+    assert response.json()["missing"] == ["total"]
+    # Never reached the browser
+    assert not manager._playwright.chromium.launched[0].printed
+
+    response = await client.post(
+        f"/api/v1/templates/{template['id']}/generate",
+        json={"data": {"customer": {"name": "Ada"}, "total": 5}},
+    )
+    assert response.status_code == 200
+    assert b"<p>Ada: 5</p>" in response.content
+
+
+async def test_batch_names_the_row_with_missing_data(client):
+    template = await create_template(client, "mako", "<p>${name}</p>")
+    response = await client.post(
+        f"/api/v1/templates/{template['id']}/generate-batch",
+        json={"data": [{"name": "a"}, {}], "output": "merged"},
+    )
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Template data in row 2 is missing: name", "missing": ["name"], "row": 2}
+
+
+async def test_job_with_missing_data_is_rejected(client):
+    template = await create_template(client, "vue", "<p>{{ total }}</p>")
+    response = await client.post("/api/v1/jobs", json={"template_id": template["id"], "data": {"other": 1}})
+    assert response.status_code == 422
+    assert response.json()["missing"] == ["total"]
+
+
+async def test_external_render_uses_the_callers_data(client, manager):
+    template = await create_template(client, "jsx", "<p>{total}</p>")
+    key = (await client.post("/api/v1/api-keys", json={"name": "ci"})).json()["key"]
+    headers = {"Authorization": f"Bearer {key}"}
+
+    response = await client.post("/api/v1/external/generate-pdf", json={"template_id": template["id"], "data": {"total": 5}}, headers=headers)
+    assert response.status_code == 200
+    assert b"<p>5</p>" in response.content
+
+    # Without data of its own the template's data is checked like anywhere else
+    response = await client.post("/api/v1/external/generate-pdf", json={"template_id": template["id"]}, headers=headers)
+    assert response.status_code == 422
+    assert response.json()["missing"] == ["total"]
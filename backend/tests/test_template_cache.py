@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import models
+from api.v1 import templates
+from core.pubsub import PubSub
+from features.pdf_generation.services import playwright_manager
+from features.pdf_generation.services.pdf_cache import PDFCache
+from features.pdf_generation.services.template_cache import CHANNEL, TemplateCache, template_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_template(db, user, content: str = "<p>cached</p>") -> models.Template:
+    template = models.Template(id="tpl0000001", name="cached", engine="html", content=content, user_id=user.id)
+    db.add(template)
+    await db.commit()
+    return template
+
+
+async def test_second_lookup_is_a_hit(db, user):
+    cache = TemplateCache(ttl=60)
+    await add_template(db, user)
+
+    first = await cache.get(db, user.id, "tpl0000001")
+    second = await cache.get(db, user.id, "tpl0000001")
+    assert second is first
+    assert first.content == "<p>cached</p>"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_templates_are_scoped_to_their_owner(db, user):
+    cache = TemplateCache(ttl=60)
+    await add_template(db, user)
+    assert await cache.get(db, user.id + 1, "tpl0000001") is None
+
+
+async def test_invalidation_drops_the_row(db, user):
+    cache = TemplateCache(ttl=60)
+    template = await add_template(db, user)
+    await cache.get(db, user.id, template.id)
+
+    template.content = "<p>changed</p>"
+    await db.commit()
+    cache.invalidate(user.id, template.id)
+
+    assert (await cache.get(db, user.id, template.id)).content == "<p>changed</p>"
+    assert cache.misses == 2
+
+
+async def test_row_read_before_an_invalidation_is_not_cached(db, user):
+    cache = TemplateCache(ttl=60)
+    template = await add_template(db, user)
+    execute = db.execute
+
+    async def execute_then_invalidate(statement):
+        result = await execute(statement)
+        # Another request updates the template while this one is reading it
+        cache.invalidate(user.id, template.id)
+        return result
+
+    db.execute = execute_then_invalidate
+    await cache.get(db, user.id, template.id)
+    db.execute = execute
+    await cache.get(db, user.id, template.id)
+    assert cache.hits == 0
+
+
+async def test_zero_ttl_disables_caching(db, user):
+    cache = TemplateCache(ttl=0)
+    await add_template(db, user)
+    await cache.get(db, user.id, "tpl0000001")
+    await cache.get(db, user.id, "tpl0000001")
+    assert cache.hits == 0
+
+
+def test_invalidations_from_other_workers_are_applied():
+    bus = PubSub(enabled=False)
+    received = []
+    bus.subscribe(CHANNEL, received.append)
+    message = {"user_id": 1, "template_id": "tpl0000001"}
+
+    bus._receive(json.dumps({"sender": "other-worker", "channel": CHANNEL, "message": message}).encode())
+    # Our own messages come back over multicast too; they were already applied locally
+    bus._receive(json.dumps({"sender": bus._sender_id, "channel": CHANNEL, "message": message}).encode())
+    bus._receive(b"not json")
+    assert received == [message]
+
+
+async def test_update_and_delete_reach_every_cache(client, manager, monkeypatch, tmp_path):
+    pdf_cache = PDFCache(disk_dir=str(tmp_path))
+    monkeypatch.setattr(playwright_manager, "pdf_cache", pdf_cache)
+    monkeypatch.setattr(templates, "pdf_cache", pdf_cache)
+    browser = manager._playwright.chromium.launched[0]
+    response = await client.post("/api/v1/templates", json={"name": "cached", "engine": "html", "content": "<p>first</p>"})
+    template_id = response.json()["id"]
+    generate = f"/api/v1/templates/{template_id}/generate"
+
+    assert b"<p>first</p>" in (await client.post(generate, json={})).content
+    hits = template_cache.hits
+    assert b"<p>first</p>" in (await client.post(generate, json={})).content
+    assert template_cache.hits == hits + 1
+    printed = len(browser.printed)
+    assert printed == 1
+    assert (tmp_path / template_id).exists()
+
+    response = await client.put(f"/api/v1/templates/{template_id}", json={"content": "<p>second</p>"})
+    assert response.status_code == 200
+    assert b"<p>second</p>" in (await client.post(generate, json={})).content
+    assert len(browser.printed) == printed + 1
+    assert len(list((tmp_path / template_id).glob("*.pdf"))) == 1
+
+    assert (await client.delete(f"/api/v1/templates/{template_id}")).status_code == 204
+    assert (await client.post(generate, json={})).status_code == 404
+    assert not (tmp_path / template_id).exists()
@@ -0,0 +1,77 @@
+import json
+import subprocess
+
+from tests.conftest import BACKEND_DIR
+
+
+def run_node(script: str):
+    """Run a script next to the converters and return the JSON it prints"""
+    result = subprocess.run(
+        ["node", "-e", script], cwd=BACKEND_DIR / "convertors", capture_output=True, text=True, timeout=30
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_template_is_compiled_once():
+    result = run_node("""
+        const { TemplateCache } = require('./template-cache');
+        let compiles = 0;
+        const cache = new TemplateCache((source) => { compiles++; return (ctx) => source + ctx.n; }, null);
+        const out = [1, 2, 3].map((n) => cache.get('<p>', null)({ n }));
+        console.log(JSON.stringify({ compiles, out }));
+    """)
+    assert result == {"compiles": 1, "out": ["<p>1", "<p>2", "<p>3"]}
+
+
+def test_least_recently_used_template_is_evicted():
+    result = run_node("""
+        const { TemplateCache } = require('./template-cache');
+        const compiled = [];
+        const cache = new TemplateCache((source) => { compiled.push(source); return () => source; }, null, 2);
+        for (const source of ['a', 'b', 'a', 'c', 'a', 'b']) cache.get(source);
+        console.log(JSON.stringify({ compiled, cached: [...cache.entries.values()].map((entry) => entry.source) }));
+    """)
+    # 'b' was least recently used when 'c' arrived, so only it had to be compiled again
+    assert result == {"compiled": ["a", "b", "c", "b"], "cached": ["a", "b"]}
+
+
+def test_saved_render_code_skips_compiling():
+    result = run_node("""
+        const { TemplateCache } = require('./template-cache');
+        const loaded = [];
+        const cache = new TemplateCache(() => { throw new Error('compiled'); }, (code) => { loaded.push(code); return () => code; });
+        const first = cache.get('<p>', 'saved code')();
+        const again = cache.get('<p>', 'saved code')();
+        console.log(JSON.stringify({ loaded, first, again }));
+    """)
+    assert result == {"loaded": ["saved code"], "first": "saved code", "again": "saved code"}
+
+
+def test_converters_render_the_same_from_saved_code():
+    result = run_node("""
+        const jsx = require('./jsx-converter');
+        const vue = require('./vue-converter');
+        const context = { customer: { name: 'Ada' }, items: ['a', 'b'] };
+        const jsxTemplate = '<div><p>{customer.name}</p>{items.map((item) => <i>{item}</i>)}</div>';
+        const vueTemplate = '<div><p>{{ customer.name }}</p><i v-for="item in items">{{ item }}</i></div>';
+        // Fresh templates, so each path compiles or loads its own copy
+        console.log(JSON.stringify({
+            jsx: [jsx.advancedJsxToHtml(jsxTemplate + ' ', context, jsx.generateJsx(jsxTemplate + ' ')), jsx.advancedJsxToHtml(jsxTemplate, context)],
+            vue: [vue.advancedVueToHtml(vueTemplate + ' ', context, vue.generateVue(vueTemplate + ' ')), vue.advancedVueToHtml(vueTemplate, context)],
+        }));
+    """)
+    for from_code, compiled in result.values():
+        assert from_code.strip() == compiled.strip()
+        assert "<p>Ada</p>" in compiled
+
+
+def test_guarded_expression_renders_its_fallback():
+    result = run_node("""
+        const { createRender, guardedExpression } = require('./template-cache');
+        console.warn = () => {};
+        const failing = createRender('return ' + guardedExpression('missing.name', 'n/a', 'missing.name') + ';');
+        const broken = guardedExpression('(', '', '(');
+        console.log(JSON.stringify({ failing: failing({}), broken }));
+    """)
+    assert result == {"failing": "n/a", "broken": '""'}
@@ -0,0 +1,69 @@
+import httpx
+import pytest
+from fastapi_users.db import SQLAlchemyUserDatabase
+
+import models
+from core.auth import UserManager, get_jwt_strategy
+from core.database import async_session
+from core.user_cache import UserCache, user_cache
+from schemas import UserUpdate
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def api(db):
+    """An API client going through the real JWT authentication"""
+    from app import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def sign_in(user) -> dict:
+    token = await get_jwt_strategy().write_token(user)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_user_behind_a_token_is_cached_until_updated(api, user):
+    headers = await sign_in(user)
+    assert (await api.get("/api/v1/me", headers=headers)).status_code == 200
+    assert user_cache._entries.get(user.id) is not None
+
+    async with async_session() as session:
+        manager = UserManager(SQLAlchemyUserDatabase(session, models.User))
+        await manager.update(UserUpdate(first_name="Ada"), await manager.get(user.id))
+    assert user_cache._entries.get(user.id) is None
+    assert (await api.get("/api/v1/me", headers=headers)).json()["first_name"] == "Ada"
+
+
+async def test_token_is_still_verified_for_cached_users(api, user):
+    headers = await sign_in(user)
+    assert (await api.get("/api/v1/me", headers=headers)).status_code == 200
+    forged = {"Authorization": headers["Authorization"][:-2] + "xx"}
+    assert (await api.get("/api/v1/me", headers=forged)).status_code == 401
+
+
+async def test_inactive_users_are_never_cached(user):
+    cache = UserCache(ttl=60)
+    user.is_active = False
+    cache.set(user, cache.generation)
+    assert cache._entries.get(user.id) is None
+
+
+async def test_user_read_before_an_invalidation_is_not_cached(user):
+    cache = UserCache(ttl=60)
+    generation = cache.generation
+    cache.invalidate(user.id)
+    cache.set(user, generation)
+    assert cache._entries.get(user.id) is None
+
+
+async def test_each_session_gets_its_own_instance(db, user):
+    cache = UserCache(ttl=60)
+    cache.set(user, cache.generation)
+    async with async_session() as session:
+        cached = await cache.get(session, user.id)
+        assert cached is not user
+        assert cached.email == user.email
+        assert cached in session
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from convertors.daemon import ConverterPool
+
+CONTEXT = {
+    "title": "Invoice #42",
+    "customer": {"name": "Acme Corp", "address": "123 Main St"},
+    "paid": False,
+    "total": 1219,
+    "items": [
+        {"item": "Surf Board", "price": "$1,000", "quantity": 1},
+        {"item": "Board Wax", "price": "$75", "quantity": 2},
+    ],
+    "tags": ["a", "b", "c"],
+    "note": "Thanks & welcome",
+}
+
+# Output of the regex-based converter these replaced, which the parser must keep
+BASELINE = [
+    ('<div class="p-4"><h1>{{ title }}</h1></div>', '<div class="p-4"><h1>Invoice #42</h1></div>'),
+    ("<div><p>{{ customer.name }}</p><p>{{ customer.address }}</p></div>", "<div><p>Acme Corp</p><p>123 Main St</p></div>"),
+    (
+        '<ul><li v-for="item in items">{{ item.item }}: {{ item.price }}</li></ul>',
+        "<ul><li>Surf Board: $1,000</li><li>Board Wax: $75</li></ul>",
+    ),
+    ('<p v-if="total > 1000">Large</p>', "<p>Large</p>"),
+    (
+        '<span v-for="tag in tags" class="tag">{{ tag }}</span>',
+        '<span class="tag">a</span><span class="tag">b</span><span class="tag">c</span>',
+    ),
+    ("<p>{{ tags.join(', ') }}</p>", "<p>a, b, c</p>"),
+    ("<p>{{ total.toFixed(2) }}</p>", "<p>1219.00</p>"),
+    (
+        '<table><tbody><tr v-for="item in items"><td>{{ item.item }}</td><td>{{ item.quantity }}</td></tr></tbody></table>',
+        "<table><tbody><tr><td>Surf Board</td><td>1</td></tr><tr><td>Board Wax</td><td>2</td></tr></tbody></table>",
+    ),
+    (
+        '<div class="flex"><span>{{ customer.name.toUpperCase() }}</span><span>{{ note }}</span></div>',
+        '<div class="flex"><span>ACME CORP</span><span>Thanks & welcome</span></div>',
+    ),
+    (
+        '<div>\n  <h1 class="text-2xl">{{ title }}</h1>\n  <p>{{ items.length }} items</p>\n</div>',
+        '<div>\n  <h1 class="text-2xl">Invoice #42</h1>\n  <p>2 items</p>\n</div>',
+    ),
+    ("<p>{{ missing }}</p>", "<p></p>"),
+]
+
+# Templates the regex converter got wrong
+FIXED = [
+    # Was "<ul><li> </li><li> </li></ul>": the index form of v-for lost both variables
+    ('<ul><li v-for="(item, index) in items">{{ index }} {{ item.item }}</li></ul>', "<ul><li>0 Surf Board</li><li>1 Board Wax</li></ul>"),
+    # Was '<p v-else>Due 1219</p>': v-else was left in the output
+    ('<p v-if="paid">Paid</p><p v-else>Due {{ total }}</p>', "<p>Due 1219</p>"),
+]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ConverterPool(size=1, timeout=10)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.parametrize("template, expected", BASELINE + FIXED)
+def test_output(pool, template, expected):
+    assert pool.convert("vue", template, CONTEXT) == expected
+
+
+def test_large_template_converts_in_linear_time(pool):
+    row = '<tr v-for="item in items"><td>{{ item.item }}</td><td :class="item.price">{{ item.quantity }}</td></tr>'
+    timings = []
+    for count in (200, 1600):
+        template = f"<table>{row * count}</table>"
+        started = time.monotonic()
+        html = pool.convert("vue", template, CONTEXT)
+        timings.append(time.monotonic() - started)
+        assert html.count("<tr>") == 2 * count
+    # Eight times the template well within eight times the time (plus start-up slack)
+    assert timings[1] < timings[0] * 8 * 3 + 0.5